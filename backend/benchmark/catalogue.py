@@ -0,0 +1,138 @@
+from django.db.models import Count
+from django.urls import reverse
+from forum.models import Topic
+from main.models import Board, Society, Committee
+
+SIZES = 'sizes { name url }'
+NAME = 'firstName lastName'
+
+TOPIC_DATA = 'id title isAuthor isUpvoted upvotesCount answersCount createdAt'
+
+# Operations of the Vue app, with the fragments of frontend/src/graphql inlined
+QUERIES = {
+    'headerBoardList': 'query boards { boards { edges { node { name slug } } } }',
+    'homeCarousel': f'query homeCarousel {{ homeCarousel {{ name: title photos {{ edges {{ node {{ title image '
+                    f'{{ {SIZES} }} }} }} }} }} }}',
+    'boardData': f'''query boards($slugText: String!) {{
+        boards(slug: $slugText) {{ edges {{ node {{
+            name description slug cover {{ {SIZES} }}
+            societySet {{ edges {{ node {{ name slug cover {{ {SIZES} }} }} }} }}
+            committeeSet {{ edges {{ node {{ name slug cover {{ {SIZES} }} }} }} }}
+            upcomingEvents {{ edges {{ node {{ name date location }} }} }}
+            pastNews {{ edges {{ node {{ title date }} }} }}
+        }} }} }}
+    }}''',
+    'societyData': f'''query societies($slugText: String!) {{
+        societies(slug: $slugText) {{ edges {{ node {{
+            name slug stype description cover {{ {SIZES} }}
+            secretary {{ user {{ {NAME} }} avatar {{ {SIZES} }} }}
+            jointSecretaryOne {{ user {{ {NAME} }} }}
+            activitySet {{ edges {{ node {{ name description customHtml }} }} }}
+        }} }} }}
+    }}''',
+    'committeeData': f'''query committees($slugText: String!) {{
+        committees(slug: $slugText) {{ edges {{ node {{
+            name slug ctype description cover {{ {SIZES} }}
+            activitySet {{ edges {{ node {{ name description customHtml }} }} }}
+        }} }} }}
+    }}''',
+    'forumTopics': f'''query Search($query: String, $first: Int, $after: String) {{
+        nodes(query: $query, nodeType: TOPIC, first: $first, after: $after) {{
+            pageInfo {{ endCursor hasNextPage }}
+            edges {{ node {{ ... on TopicNode {{
+                slug {TOPIC_DATA}
+                author {{ user {{ {NAME} }} avatar {{ {SIZES} }} year prog branch }}
+                answerSet(first: 1) {{ edges {{ node {{ createdAt content author {{ user {{ {NAME} }} }} }} }} }}
+            }} }} }}
+        }}
+    }}''',
+    'topic': f'''query topic($slug: String!) {{
+        topic(slug: $slug) {{ edges {{ node {{
+            content tags {TOPIC_DATA}
+            author {{ user {{ {NAME} }} avatar {{ {SIZES} }} }}
+            answerSet {{ edges {{ node {{
+                id content upvotesCount isAuthor isUpvoted createdAt
+                author {{ user {{ {NAME} }} avatar {{ {SIZES} }} }}
+            }} }} }}
+        }} }} }}
+    }}''',
+    'searchUserProfiles': f'''query Search($query: String!) {{
+        nodes(query: $query, nodeType: USER_PROFILE) {{ edges {{ node {{ ... on UserProfileNode {{
+            roll user {{ {NAME} }} skills avatar {{ {SIZES} }}
+        }} }} }} }}
+    }}''',
+    'viewerProfile': f'''query viewerProfile {{
+        viewer {{ username {NAME} email userprofile {{ roll phone branch prog year avatar {{ {SIZES} }} }} }}
+    }}''',
+}
+
+
+class Operation(object):
+    """
+    A request to replay. ``path`` and ``variables`` may be callables, they are resolved once the data has been
+    seeded, before measuring, so operations can point at existing slugs.
+    """
+
+    def __init__(self, name, path=None, query=None, variables=None, private=False, login=False):
+        self.name = name
+        self.path = path
+        self.query = query
+        self.variables = variables or {}
+        self.private = private
+        self.login = login or private
+
+    def resolve(self):
+        """Returns a function sending the request with a test client."""
+        if self.query is None:
+            path = self.path() if callable(self.path) else self.path
+            return lambda client: client.get(path)
+        data = {'query': QUERIES[self.query], 'operationName': None,
+                'variables': self.variables() if callable(self.variables) else self.variables}
+        path = '/pgraphql' if self.private else '/graphql'
+        return lambda client: client.post(path, data, content_type='application/json')
+
+
+def busiest_topic():
+    return Topic.objects.annotate(answers=Count('answer')).order_by('-answers').values_list('slug', flat=True)[0]
+
+
+def first_slug(model):
+    return model.objects.order_by('pk').values_list('slug', flat=True)[0]
+
+
+def search_term():
+    # the first word of a title, so the search matches a realistic share of topics
+    return Topic.objects.order_by('pk').values_list('title', flat=True)[0].split()[0]
+
+
+OPERATIONS = [
+    Operation('home', lambda: reverse('main:index')),
+    # the server rendered board and society pages answer 500 (they read Society.ctype and core_members, which no
+    # longer exist), the Vue app's queries for them are measured below
+    Operation('committee', lambda: reverse('main:committee-detail', kwargs={'slug': first_slug(Committee)})),
+    Operation('forum-index', lambda: reverse('forum:index'), login=True),
+    Operation('forum-search', lambda: f'{reverse("forum:index")}?q={search_term()}', login=True),
+    Operation('forum-detail', lambda: reverse('forum:detail', kwargs={'slug': busiest_topic()}), login=True),
+    Operation('konnekt-search', lambda: f'{reverse("konnekt:search")}?q=a', login=True),
+    Operation('graphql-header-boards', query='headerBoardList'),
+    Operation('graphql-home-carousel', query='homeCarousel'),
+    Operation('graphql-board', query='boardData', variables=lambda: {'slugText': first_slug(Board)}),
+    Operation('graphql-society', query='societyData', variables=lambda: {'slugText': first_slug(Society)}),
+    Operation('graphql-committee', query='committeeData', variables=lambda: {'slugText': first_slug(Committee)}),
+    Operation('pgraphql-forum-topics', query='forumTopics', variables={'first': 10}, private=True),
+    Operation('pgraphql-forum-search', query='forumTopics', variables=lambda: {'query': search_term(), 'first': 10},
+              private=True),
+    Operation('pgraphql-topic', query='topic', variables=lambda: {'slug': busiest_topic()}, private=True),
+    Operation('pgraphql-search-profiles', query='searchUserProfiles', variables={'query': 'a'}, private=True),
+    Operation('pgraphql-viewer', query='viewerProfile', private=True),
+]
+
+# Volumes generated with loadtest_fixtures, each scale adds to the previous one
+SCALES = {
+    'small': {'profiles': 200, 'topics': 1000, 'answers': 4000, 'topic_upvotes': 2000, 'answer_upvotes': 8000,
+              'photos': 100},
+    'medium': {'profiles': 2000, 'topics': 10000, 'answers': 40000, 'topic_upvotes': 20000,
+               'answer_upvotes': 80000, 'photos': 500},
+    'large': {'profiles': 50000, 'topics': 200000, 'answers': 1000000, 'topic_upvotes': 200000,
+              'answer_upvotes': 1000000, 'photos': 5000},
+}
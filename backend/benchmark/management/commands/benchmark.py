@@ -0,0 +1,132 @@
+import json
+import platform
+import subprocess
+import tempfile
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+from benchmark.catalogue import OPERATIONS, SCALES
+from benchmark.measure import compare, measure, succeeded
+from gymkhana_sac.db.pool import pool_stats
+from oauth.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = 'Seeds a throwaway database at several scales and measures a catalogue of views and GraphQL operations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', nargs='+', choices=SCALES, default=['small'], dest='scales')
+        parser.add_argument('--operation', action='append', dest='operations',
+                            help='only run the named operation (repeatable)')
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='write the JSON results to this file instead of stdout')
+        parser.add_argument('--baseline', help='JSON results of an earlier run to check for regressions')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='allowed latency increase over the baseline, as a fraction')
+
+    def handle(self, *args, **options):
+        operations = [operation for operation in OPERATIONS
+                      if not options['operations'] or operation.name in options['operations']]
+        if not operations:
+            raise CommandError('No operation matches ' + ', '.join(options['operations']))
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as baseline_file:
+                baseline = json.load(baseline_file)
+        # measured against a test database and a temporary media root, so local data is never touched
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with tempfile.TemporaryDirectory() as media_root, override_settings(
+                    ROOT_URLCONF='benchmark.urls', MEDIA_ROOT=media_root,
+                    ALLOWED_HOSTS=settings.ALLOWED_HOSTS + ['testserver']):
+                results = self.run(operations, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        report = {'meta': self.meta(options), 'results': results, 'failed': self.failed, 'database': self.database}
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(output + '\n')
+        else:
+            self.stdout.write(output)
+        if baseline is not None:
+            regressions = compare(baseline, report, options['threshold'])
+            for regression in regressions:
+                self.stderr.write(regression)
+            if regressions:
+                raise CommandError(f'{len(regressions)} regressions against {options["baseline"]}')
+        if self.failed:
+            raise CommandError('Operations answering with an error: ' + ', '.join(
+                f'{scale} {name} ({status})'
+                for scale, failed in self.failed.items() for name, status in failed.items()))
+
+    def run(self, operations, options):
+        results = {}
+        # connections opened and pool statistics per scale, to compare connection settings
+        self.database = {}
+        # statuses of the operations answering with an error, per scale
+        self.failed = {}
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            if not getattr(connection, 'reused_connection', False):
+                opened.append(connection.alias)
+
+        generated = dict.fromkeys(SCALES['small'], 0)
+        with override_settings(DEBUG=True):
+            call_command('createfixture', stdout=self.stderr)
+        for scale in sorted(options['scales'], key=list(SCALES).index):
+            self.stderr.write(f'Seeding {scale} scale')
+            with override_settings(DEBUG=True):
+                # scales add up, so only the difference to what is already there is generated
+                call_command('loadtest_fixtures', seed=options['seed'], stdout=self.stderr, **{
+                    kind: max(count - generated[kind], 0) for kind, count in SCALES[scale].items()})
+            generated = dict(SCALES[scale])
+            client = Client(raise_request_exception=False)
+            client.force_login(UserProfile.objects.order_by('-pk').first().user)
+            results[scale] = {}
+            del opened[:]
+            connection_created.connect(count_connection)
+            try:
+                for operation in operations:
+                    result = measure(operation.resolve(), client, options['iterations'], options['warmup'])
+                    if not succeeded(result['status']):
+                        # baselines are not built on error responses
+                        self.failed.setdefault(scale, {})[operation.name] = result['status']
+                        self.stderr.write(f'{scale} {operation.name}: status {result["status"]}, not measured')
+                        continue
+                    results[scale][operation.name] = result
+                    self.stderr.write(f'{scale} {operation.name}: p50 {result["p50"]:.1f}ms, '
+                                      f'{result["queries"]} queries, status {result["status"]}')
+            finally:
+                connection_created.disconnect(count_connection)
+            self.database[scale] = {'connections_opened': len(opened), 'pools': pool_stats()}
+        return results
+
+    @staticmethod
+    def meta(options):
+        try:
+            commit = subprocess.run(['git', 'rev-parse', 'HEAD'], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    universal_newlines=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'commit': commit,
+            'timestamp': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            'pool_size': connection.settings_dict.get('POOL_SIZE', 0),
+            'iterations': options['iterations'],
+            'scales': {scale: SCALES[scale] for scale in options['scales']},
+        }
@@ -0,0 +1,106 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.backends.utils import CursorWrapper
+from django.test.utils import CaptureQueriesContext
+
+PERCENTILES = (50, 90, 95, 99)
+# Metrics compared against the baseline, query and row counts are exact so any increase is a regression
+LATENCY_METRICS = ('p50', 'p95')
+COUNT_METRICS = ('queries', 'rows')
+
+
+def succeeded(status):
+    """Whether a response status is worth measuring, timings of errors say nothing about the view"""
+    return 200 <= status < 400
+
+
+def percentile(values, q):
+    """Linear interpolation between the closest ranks, like numpy's default."""
+    values = sorted(values)
+    if not values:
+        return None
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+@contextmanager
+def count_rows():
+    """Counts the rows fetched through Django cursors while the block runs."""
+    counter = {'rows': 0}
+
+    def counting(method, size=None):
+        def fetch(self, *args):
+            rows = getattr(self.cursor, method)(*args)
+            counter['rows'] += (1 if rows is not None else 0) if size == 1 else len(rows)
+            return rows
+        return fetch
+
+    CursorWrapper.fetchone = counting('fetchone', size=1)
+    CursorWrapper.fetchmany = counting('fetchmany')
+    CursorWrapper.fetchall = counting('fetchall')
+    try:
+        yield counter
+    finally:
+        del CursorWrapper.fetchone, CursorWrapper.fetchmany, CursorWrapper.fetchall
+
+
+def measure(send, client, iterations=20, warmup=2):
+    """
+    Times ``iterations`` requests after ``warmup`` untimed ones, then replays the request once more with
+    queries, fetched rows and allocations traced, since tracing would distort the timings.
+    """
+    for _ in range(warmup):
+        send(client)
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = send(client)
+        timings.append((time.perf_counter() - started) * 1000)
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries, count_rows() as rows:
+            send(client)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    result = {f'p{q}': round(percentile(timings, q), 3) for q in PERCENTILES}
+    result.update({
+        'mean': round(sum(timings) / len(timings), 3),
+        'min': round(min(timings), 3),
+        'max': round(max(timings), 3),
+        'status': response.status_code,
+        'queries': len(queries),
+        'rows': rows['rows'],
+        'peak_memory_kb': round(peak / 1024, 1),
+    })
+    return result
+
+
+def compare(baseline, current, threshold=0.2, min_delta=1.0):
+    """
+    Lists the regressions of ``current`` against ``baseline`` results: a failing or changed status, latencies more
+    than ``threshold`` (a fraction) and ``min_delta`` milliseconds slower, or more queries or fetched rows. A view
+    that starts failing usually runs fewer queries, faster, so its other metrics are not compared.
+    """
+    regressions = []
+    for scale, operations in current['results'].items():
+        for name, result in operations.items():
+            before = baseline.get('results', {}).get(scale, {}).get(name)
+            if not succeeded(result['status']) or (before and result['status'] != before['status']):
+                regressions.append(f'{scale} {name}: status {before["status"] if before else None} -> '
+                                   f'{result["status"]}')
+                continue
+            if not before:
+                continue
+            for metric in LATENCY_METRICS:
+                if result[metric] > before[metric] * (1 + threshold) and result[metric] - before[metric] > min_delta:
+                    regressions.append(f'{scale} {name}: {metric} {before[metric]:.1f}ms -> {result[metric]:.1f}ms')
+            for metric in COUNT_METRICS:
+                if result[metric] > before[metric]:
+                    regressions.append(f'{scale} {name}: {metric} {before[metric]} -> {result[metric]}')
+    return regressions
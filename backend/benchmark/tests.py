@@ -0,0 +1,59 @@
+from django.db.backends.utils import CursorWrapper
+from django.test import TestCase, Client, override_settings
+from benchmark.catalogue import OPERATIONS
+from benchmark.measure import percentile, measure, compare, count_rows
+from main.models import Board
+
+
+class MeasureTestCase(TestCase):
+    def test_percentile(self):
+        """Percentiles interpolate between the closest ranks"""
+        self.assertEqual(percentile([4, 1, 3, 2], 50), 2.5)
+        self.assertEqual(percentile([1, 2, 3, 4, 5], 90), 4.6)
+        self.assertEqual(percentile([7], 99), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def test_count_rows(self):
+        """Fetched rows are counted and the cursor is restored afterwards"""
+        Board.objects.create(name='board', year='2000')
+        Board.objects.create(name='board', year='2001')
+        with count_rows() as rows:
+            list(Board.objects.all())
+            Board.objects.first()
+        self.assertEqual(rows['rows'], 3)
+        self.assertFalse(hasattr(CursorWrapper, 'fetchmany'))
+
+    @override_settings(ROOT_URLCONF='benchmark.urls')
+    def test_measure(self):
+        """Measuring an operation records latencies, queries, rows and memory"""
+        Board.objects.create(name='board', year='2000')
+        operation = next(operation for operation in OPERATIONS if operation.name == 'graphql-header-boards')
+        result = measure(operation.resolve(), Client(), iterations=5, warmup=1)
+        self.assertEqual(result['status'], 200)
+        # the connection fetches the boards without counting them
+        self.assertEqual((result['queries'], result['rows']), (1, 1))
+        self.assertLessEqual(result['min'], result['p50'])
+        self.assertLessEqual(result['p50'], result['p99'])
+        self.assertGreater(result['peak_memory_kb'], 0)
+
+    def test_compare_status(self):
+        """A changed or failing status is a regression, whatever the other metrics"""
+        before = {'status': 200, 'p50': 10.0, 'p95': 20.0, 'queries': 5, 'rows': 10}
+        baseline = {'results': {'small': {'home': before, 'board': dict(before, status=302)}}}
+        current = {'results': {'small': {'home': dict(before, status=500, p50=1.0, queries=1),
+                                         'board': dict(before, status=200), 'new': dict(before, status=404)}}}
+        self.assertEqual(compare(baseline, current), [
+            'small home: status 200 -> 500',
+            'small board: status 302 -> 200',
+            'small new: status None -> 404',
+        ])
+
+    def test_compare(self):
+        """Slower latencies beyond the threshold and any extra query are regressions"""
+        before = {'status': 200, 'p50': 10.0, 'p95': 20.0, 'queries': 5, 'rows': 10}
+        baseline = {'results': {'small': {'home': before}}}
+        current = {'results': {'small': {'home': dict(before, p50=11.0, p95=30.0, queries=6), 'new': before}}}
+        self.assertEqual(compare(baseline, current, threshold=0.2), [
+            'small home: p95 20.0ms -> 30.0ms',
+            'small home: queries 5 -> 6',
+        ])
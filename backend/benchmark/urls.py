@@ -0,0 +1,13 @@
+from django.conf.urls import url, include
+from gymkhana_sac.urls import urlpatterns as project_urlpatterns
+
+# The server rendered apps are not mounted in the project urlconf, which serves the Vue app instead.
+# The benchmark mounts them in front of it so both generations of pages can be measured.
+urlpatterns = [
+    url(r'^main/', include('main.urls', namespace='main')),
+    url(r'^forum/', include('forum.urls', namespace='forum')),
+    url(r'^api/forum/', include('forum.api.urls', namespace='forum_api')),
+    url(r'^konnekt/', include('konnekt.urls', namespace='konnekt')),
+    url(r'^oauth/', include('oauth.urls', namespace='oauth')),
+    url(r'^festivals/', include('festivals.urls', namespace='festivals')),
+] + project_urlpatterns
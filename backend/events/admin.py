@@ -1,11 +1,14 @@
 from django.contrib import admin
+from gymkhana_sac.admin import SelectRelatedAdminMixin
 from .models import Event
 
 
-class EventAdmin(admin.ModelAdmin):
+class EventAdmin(SelectRelatedAdminMixin, admin.ModelAdmin):
     date_hierarchy = 'date'
     list_display = ('name', 'society', 'committee', 'date', 'location')
     list_filter = ('date',)
+    list_select_related = ('society__board', 'committee__board')
+    autocomplete_fields = ('society', 'committee')
 
     class Meta:
         model = Event
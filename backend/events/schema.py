@@ -3,9 +3,12 @@ from graphene import relay
 from graphene_django import DjangoObjectType
 
 from events.models import Event
+from gymkhana_sac.cache_control import cache_hint
+from gymkhana_sac.optimizer import QueryOptimizerMixin
 
 
-class EventNode(DjangoObjectType):
+@cache_hint(max_age=60)
+class EventNode(QueryOptimizerMixin, DjangoObjectType):
     class Meta:
         model = Event
         fields = '__all__'
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from gymkhana_sac.admin import SelectRelatedInlineMixin
 from .models import Event, EventCategory, Festival, SocialLink
 
 
@@ -17,10 +18,10 @@ class FestivalAdmin(admin.ModelAdmin):
         model = Festival
 
 
-class EventInLine(admin.StackedInline):
+class EventInLine(SelectRelatedInlineMixin, admin.StackedInline):
     model = Event
     prepopulated_fields = {"slug": ("name",)}
-    filter_horizontal = ('organizers',)
+    autocomplete_fields = ('organizers',)
 
 
 class EventCategoryAdmin(admin.ModelAdmin):
@@ -28,6 +29,7 @@ class EventCategoryAdmin(admin.ModelAdmin):
     prepopulated_fields = {"slug": ("name",)}
     list_display = ('name', 'festival')
     list_filter = ('festival__name',)
+    list_select_related = ('festival',)
 
     class Meta:
         model = EventCategory
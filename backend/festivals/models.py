@@ -6,14 +6,18 @@ from versatileimagefield.fields import VersatileImageField
 from ckeditor_uploader.fields import RichTextUploadingField
 from main.models import Board
 from oauth.models import UserProfile
+from gymkhana_sac.richtext import RichTextModel
+from gymkhana_sac.slugs import UniqueSlugMixin
 
 
-class Festival(models.Model):
+class Festival(UniqueSlugMixin, RichTextModel):
+    rich_text_field = 'about'
     name = models.CharField(max_length=32)
     tag_line = models.CharField(max_length=128, blank=True, null=True)
     photo = VersatileImageField(upload_to='festival')
     about = RichTextUploadingField(blank=True, null=True)
-    slug = models.SlugField(unique=True, help_text="This will be used as URL. /festivals/slug")
+    slug = models.SlugField(unique=True, blank=True,
+                            help_text="This will be used as URL. /festivals/slug (generated when left blank)")
     board = models.ManyToManyField(Board, blank=True)
     link = models.URLField(help_text='Override default generated URL (useful for festival having separate website)',
                            blank=True, null=True, default=None)
@@ -38,11 +42,12 @@ class Festival(models.Model):
         return self.link if self.link else reverse('festivals:detail', kwargs={'slug': self.slug})
 
 
-class EventCategory(models.Model):
+class EventCategory(UniqueSlugMixin, RichTextModel):
+    rich_text_field = 'about'
     name = models.CharField(max_length=128)
     festival = models.ForeignKey(Festival, on_delete=models.CASCADE)
     cover = VersatileImageField(upload_to='festival_event_category', blank=True)
-    slug = models.SlugField(unique=True)
+    slug = models.SlugField(unique=True, blank=True)
     about = RichTextUploadingField()
 
     def __str__(self):
@@ -54,10 +59,10 @@ class EventCategory(models.Model):
         verbose_name_plural = 'Festival Event Categories'
 
 
-class Event(models.Model):
+class Event(UniqueSlugMixin, models.Model):
     event_category = models.ForeignKey(EventCategory, on_delete=models.CASCADE)
     name = models.CharField(max_length=64)
-    slug = models.SlugField(unique=True)
+    slug = models.SlugField(unique=True, blank=True)
     unique_id = models.CharField(unique=True, max_length=8)
     about = RichTextUploadingField(verbose_name='About', blank=True, null=True)
     pdf = models.FileField(upload_to='pdf', null=True, blank=True)
@@ -1,11 +1,15 @@
 from graphene import relay, Field
 from graphene_django import DjangoObjectType
 from festivals.models import Festival, EventCategory, Event
+from gymkhana_sac.cache_control import cache_hint
+from gymkhana_sac.optimizer import QueryOptimizerMixin, hints
+from gymkhana_sac.pagination import CountableConnection
 from gymkhana_sac.utils import build_image_types
 from main.schema import ImageType
 
 
-class FestivalNode(DjangoObjectType):
+@cache_hint(max_age=600)
+class FestivalNode(QueryOptimizerMixin, DjangoObjectType):
     photo = Field(ImageType)
 
     class Meta:
@@ -13,12 +17,15 @@ class FestivalNode(DjangoObjectType):
         fields = '__all__'
         filter_fields = ('slug',)
         interfaces = (relay.Node,)
+        connection_class = CountableConnection
 
+    @hints(only=('photo',))
     def resolve_photo(self, info):
         return ImageType(sizes=build_image_types(info.context, self.photo, 'festival'))
 
 
-class EventCategoryNode(DjangoObjectType):
+@cache_hint(max_age=600)
+class EventCategoryNode(QueryOptimizerMixin, DjangoObjectType):
     cover = Field(ImageType)
 
     class Meta:
@@ -27,11 +34,13 @@ class EventCategoryNode(DjangoObjectType):
         filter_fields = ('slug',)
         interfaces = (relay.Node,)
 
+    @hints(only=('cover',))
     def resolve_cover(self, info):
         return ImageType(sizes=build_image_types(info.context, self.cover, 'festival'))
 
 
-class EventFestivalNode(DjangoObjectType):
+@cache_hint(max_age=300)
+class EventFestivalNode(QueryOptimizerMixin, DjangoObjectType):
     cover = Field(ImageType)
 
     class Meta:
@@ -40,5 +49,6 @@ class EventFestivalNode(DjangoObjectType):
         filter_fields = ('slug', 'published', 'unique_id',)
         interfaces = (relay.Node,)
 
+    @hints(only=('cover',))
     def resolve_cover(self, info):
         return ImageType(sizes=build_image_types(info.context, self.cover, 'festival'))
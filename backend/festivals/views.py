@@ -2,10 +2,11 @@ from django.views.generic import DetailView
 from django.shortcuts import render
 from django.conf import settings
 from .models import Festival
+from gymkhana_sac.db.replicas import ReplicaReadMixin
 from main.views import MaintenanceAndNavigationMixin
 
 
-class FestivalView(MaintenanceAndNavigationMixin, DetailView):
+class FestivalView(ReplicaReadMixin, MaintenanceAndNavigationMixin, DetailView):
     template_name = 'festivals/index.html'
     model = Festival
 
@@ -13,6 +13,7 @@ from fixture.sackeypeoplefixture import SackeypeopleFactory
 import random
 from main.models import UserProfile
 from django.db.utils import IntegrityError
+from gymkhana_sac.slugs import bulk_create_with_slugs
 
 
 class Command(BaseCommand):
@@ -36,6 +37,7 @@ class Command(BaseCommand):
         self.create_objects(AnswerFactory, 20, m2m=True)
         self.create_objects(TopicFactory, 5, m2m=True)
         self.create_objects(SackeypeopleFactory, 1)
+        self.bulk_create_objects(TopicFactory, 20, author=UserProfile.objects.all())
 
     @staticmethod
     def create_objects(klass=None, object_count=5, m2m=False):
@@ -57,3 +59,16 @@ class Command(BaseCommand):
                     pass
         else:
             raise ValueError("klass argument cannot be null")
+
+    @staticmethod
+    def bulk_create_objects(klass=None, object_count=5, **related):
+        """
+        Builds unsaved objects and inserts them with bulk_create, allocating their slugs in batches.
+        Each keyword argument is a queryset of existing rows to pick the related object from.
+        """
+        if klass is None:
+            raise ValueError("klass argument cannot be null")
+        related = {name: list(choices) for name, choices in related.items()}
+        objs = [klass.build(slug='', **{name: random.choice(choices) for name, choices in related.items()})
+                for i in range(object_count)]
+        return bulk_create_with_slugs(klass._meta.get_model_class(), objs)
@@ -0,0 +1,315 @@
+import csv
+import multiprocessing
+import random
+import time
+from datetime import timedelta
+from io import BytesIO, StringIO
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.text import slugify
+from faker import Faker
+from PIL import Image
+from fixture.topicfixture import TAG
+from fixture.userfixture import COLOUR, SKILL
+from gymkhana_sac.richtext import process_rich_text
+
+PASSWORD = UNUSABLE_PASSWORD_PREFIX + 'loadtest'
+IMAGE_COUNT = 8
+COPY_NULL = r'\N'
+
+
+def chunk_random(plan, kind, start):
+    """Every chunk gets its own generator derived from the seed, so output does not depend on the workers."""
+    rng = random.Random(f'{plan["seed"]}:{kind}:{start}')
+    fake = Faker()
+    fake.seed_instance(rng.getrandbits(32))
+    return rng, fake
+
+
+def spread(plan, kind, index):
+    """Creation time of the ``index``-th new row of ``kind``, spread evenly over the last ``days`` days."""
+    count = max(plan['counts'][kind], 1)
+    return plan['now'] - timedelta(days=plan['days']) * (1 - (index - plan['starts'][kind]) / count)
+
+
+def rich_text_columns(html):
+    rich_text = process_rich_text(html)
+    return [rich_text.html, rich_text.text, rich_text.excerpt, rich_text.images]
+
+
+def generate_profiles(plan, start, count):
+    rng, fake = chunk_random(plan, 'profiles', start)
+    offset = plan['starts']['users'] - plan['starts']['profiles']
+    users, profiles = [], []
+    for pk in range(start, start + count):
+        first_name, last_name = fake.first_name(), fake.last_name()
+        users.append([pk + offset, PASSWORD, False, f'loadtest_{pk}', first_name, last_name,
+                      f'loadtest_{pk}@iitj.ac.in', False, True, spread(plan, 'profiles', pk)])
+        profiles.append([pk, pk + offset, True, rng.choice('MF'), f'LT{pk:08d}',
+                         fake.date_of_birth(minimum_age=17, maximum_age=30), rng.choice(['BT', 'MT', 'MSc', 'PhD']),
+                         rng.choice('12345'), str(rng.randint(6000000000, 9999999999)), '', '', fake.city(),
+                         rng.choice(['CSE', 'EE', 'ME']), ','.join(rng.sample(SKILL, 3)), fake.sentence(nb_words=8)])
+    return [
+        ('auth.User', ('id', 'password', 'is_superuser', 'username', 'first_name', 'last_name', 'email', 'is_staff',
+                       'is_active', 'date_joined'), users),
+        ('oauth.UserProfile', ('id', 'user_id', 'email_confirmed', 'gender', 'roll', 'dob', 'prog', 'year', 'phone',
+                               'avatar', 'cover', 'hometown', 'branch', 'skills', 'about'), profiles),
+    ]
+
+
+def generate_topics(plan, start, count):
+    rng, fake = chunk_random(plan, 'topics', start)
+    topics = []
+    for pk in range(start, start + count):
+        title = fake.sentence(nb_words=rng.randint(4, 10))
+        content = ''.join(f'<p>{paragraph}</p>' for paragraph in fake.paragraphs(nb=rng.randint(1, 4)))
+        topics.append([pk, rng.choice(plan['profiles']), rng.choice('QFSI'), title,
+                       ','.join(rng.sample(TAG, 3)), spread(plan, 'topics', pk), f'{slugify(title)[:38]}-lt{pk}',
+                       *rich_text_columns(content)])
+    return [('forum.Topic', ('id', 'author_id', 'category', 'title', 'tags', 'created_at', 'slug', 'content',
+                             'plain_text', 'excerpt', 'images'), topics)]
+
+
+def generate_answers(plan, start, count):
+    rng, fake = chunk_random(plan, 'answers', start)
+    answers = []
+    for pk in range(start, start + count):
+        topic = rng.choice(plan['topics'])
+        if plan['counts']['topics']:
+            created_at = spread(plan, 'topics', topic) + timedelta(seconds=rng.randint(60, 7 * 24 * 3600))
+        else:
+            created_at = spread(plan, 'answers', pk)
+        content = ''.join(f'<p>{paragraph}</p>' for paragraph in fake.paragraphs(nb=rng.randint(1, 3)))
+        answers.append([pk, topic, rng.choice(plan['profiles']), min(created_at, plan['now']),
+                        *rich_text_columns(content)])
+    return [('forum.Answer', ('id', 'topic_id', 'author_id', 'created_at', 'content', 'plain_text', 'excerpt',
+                              'images'), answers)]
+
+
+def generate_upvotes(kind, target, plan, start, count):
+    """
+    The ``n``-th upvote goes to target ``n % targets`` from the profile ``n // targets`` places after a per target
+    offset, so pairs never repeat and no chunk has to know what the others generated.
+    """
+    targets, profiles = plan[f'{target}s'], plan['profiles']
+    upvotes = []
+    for n in range(start, start + count):
+        index = n % len(targets)
+        offset = random.Random(f'{plan["seed"]}:{kind}:{index}').randrange(len(profiles))
+        upvotes.append([targets[index], profiles[(n // len(targets) + offset) % len(profiles)]])
+    return [(f'forum.{target.title()}_upvotes', (f'{target}_id', 'userprofile_id'), upvotes)]
+
+
+def generate_topic_upvotes(plan, start, count):
+    return generate_upvotes('topic_upvotes', 'topic', plan, start, count)
+
+
+def generate_answer_upvotes(plan, start, count):
+    return generate_upvotes('answer_upvotes', 'answer', plan, start, count)
+
+
+def generate_photos(plan, start, count):
+    rng, fake = chunk_random(plan, 'photos', start)
+    photos, sites = [], []
+    for pk in range(start, start + count):
+        title = f'{fake.sentence(nb_words=3)[:-1]} {pk}'
+        photos.append([pk, plan['images'][pk % len(plan['images'])], 'center', 0, title, slugify(title),
+                       fake.sentence(nb_words=12), spread(plan, 'photos', pk), True])
+        sites.append([pk, settings.SITE_ID])
+    return [
+        ('photologue.Photo', ('id', 'image', 'crop_from', 'view_count', 'title', 'slug', 'caption', 'date_added',
+                              'is_public'), photos),
+        ('photologue.Photo_sites', ('photo_id', 'site_id'), sites),
+    ]
+
+
+def generate_galleries(plan, start, count):
+    rng, fake = chunk_random(plan, 'galleries', start)
+    galleries, sites, photos = [], [], []
+    size = plan['photos_per_gallery']
+    for pk in range(start, start + count):
+        title = f'{fake.sentence(nb_words=3)[:-1]} {pk}'
+        galleries.append([pk, spread(plan, 'galleries', pk), title, slugify(title), fake.paragraph(), True])
+        sites.append([pk, settings.SITE_ID])
+        first = (pk - plan['starts']['galleries']) * size
+        photos.extend([pk, photo, position] for position, photo in enumerate(plan['photos'][first:first + size]))
+    return [
+        ('photologue.Gallery', ('id', 'date_added', 'title', 'slug', 'description', 'is_public'), galleries),
+        ('photologue.Gallery_sites', ('gallery_id', 'site_id'), sites),
+        ('photologue.Gallery_photos', ('gallery_id', 'photo_id', 'sort_value'), photos),
+    ]
+
+
+GENERATORS = {
+    'profiles': generate_profiles,
+    'topics': generate_topics,
+    'answers': generate_answers,
+    'topic_upvotes': generate_topic_upvotes,
+    'answer_upvotes': generate_answer_upvotes,
+    'photos': generate_photos,
+    'galleries': generate_galleries,
+}
+
+
+def generate_chunk(task):
+    kind, plan, start, count = task
+    return GENERATORS[kind](plan, start, count)
+
+
+class Command(BaseCommand):
+    help = 'Generates production scale data for load testing, in chunks and with deterministic seeds'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', type=int, default=50000)
+        parser.add_argument('--topics', type=int, default=200000)
+        parser.add_argument('--answers', type=int, default=1000000)
+        parser.add_argument('--topic-upvotes', type=int, default=200000)
+        parser.add_argument('--answer-upvotes', type=int, default=1000000)
+        parser.add_argument('--photos', type=int, default=5000)
+        parser.add_argument('--photos-per-gallery', type=int, default=50)
+        parser.add_argument('--days', type=int, default=365, help='spread creation dates over this many days')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--workers', type=int, default=1, help='processes generating rows in parallel')
+        parser.add_argument('--no-copy', action='store_true', help='use INSERT instead of COPY on PostgreSQL')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG:  # pragma: no cover
+            self.stdout.write("This command is only available for DEBUG=True")
+            self.stdout.write("Abort")
+            return
+        self.use_copy = connection.vendor == 'postgresql' and not options['no_copy']
+        plan = self.plan(options)
+        tasks = [(kind, plan, start, min(options['chunk_size'], plan['starts'][kind] + plan['counts'][kind] - start))
+                 for kind in GENERATORS
+                 for start in range(plan['starts'][kind], plan['starts'][kind] + plan['counts'][kind],
+                                    options['chunk_size'])]
+        started = time.monotonic()
+        written = {}
+        if options['workers'] > 1:
+            if 'fork' not in multiprocessing.get_all_start_methods():  # pragma: no cover
+                raise CommandError('--workers needs the fork start method')
+            # forked workers only generate rows, every write goes through the connection of this process
+            connections.close_all()
+            with multiprocessing.get_context('fork').Pool(options['workers']) as pool:
+                for tables in pool.imap(generate_chunk, tasks):
+                    self.write(tables, written)
+        else:
+            for task in tasks:
+                self.write(generate_chunk(task), written)
+        self.reset_sequences()
+        for label, count in written.items():
+            self.stdout.write(f'{label}: {count} rows')
+        self.stdout.write(f'Done in {time.monotonic() - started:.1f}s')
+
+    def plan(self, options):
+        """Works out the primary keys the new rows will use, so chunks can be generated independently."""
+        counts = {
+            'profiles': options['profiles'],
+            'topics': options['topics'],
+            'answers': options['answers'],
+            'topic_upvotes': options['topic_upvotes'],
+            'answer_upvotes': options['answer_upvotes'],
+            'photos': options['photos'],
+            'galleries': -(-options['photos'] // options['photos_per_gallery']),
+        }
+        models = {
+            'users': 'auth.User',
+            'profiles': 'oauth.UserProfile',
+            'topics': 'forum.Topic',
+            'answers': 'forum.Answer',
+            'photos': 'photologue.Photo',
+            'galleries': 'photologue.Gallery',
+        }
+        starts = {kind: (apps.get_model(label).objects.aggregate(pk=Max('pk'))['pk'] or 0) + 1
+                  for kind, label in models.items()}
+        # upvotes are numbered from zero, they only index the topics/answers and profiles below
+        starts.update(topic_upvotes=0, answer_upvotes=0)
+        plan = {'seed': options['seed'], 'days': options['days'], 'now': timezone.now(), 'counts': counts,
+                'starts': starts, 'photos_per_gallery': options['photos_per_gallery']}
+        for kind in ('profiles', 'topics', 'answers', 'photos'):
+            plan[kind] = range(starts[kind], starts[kind] + counts[kind])
+        if not counts['profiles']:
+            plan['profiles'] = list(apps.get_model(models['profiles']).objects.values_list('pk', flat=True))
+        if not counts['topics']:
+            plan['topics'] = list(apps.get_model(models['topics']).objects.values_list('pk', flat=True))
+        for kind, dependency in (('topics', 'profiles'), ('answers', 'topics'), ('answers', 'profiles')):
+            if counts[kind] and not plan[dependency]:
+                raise CommandError(f'Cannot generate {kind} without {dependency}')
+        for kind, target in (('topic_upvotes', 'topics'), ('answer_upvotes', 'answers')):
+            if counts[kind] > len(plan[target]) * len(plan['profiles']):
+                raise CommandError(f'Too many {kind} for {len(plan[target])} {target} and '
+                                   f'{len(plan["profiles"])} profiles')
+        plan['images'] = self.create_images() if counts['photos'] else []
+        return plan
+
+    @staticmethod
+    def create_images():
+        """Photos share a handful of small images, so thousands of them do not fill the disk."""
+        names = []
+        for index in range(IMAGE_COUNT):
+            name = f'photologue/photos/loadtest-{index}.jpg'
+            if not default_storage.exists(name):
+                image = BytesIO()
+                Image.new('RGB', (640, 480), COLOUR[index]).save(image, 'jpeg')
+                name = default_storage.save(name, ContentFile(image.getvalue()))
+            names.append(name)
+        return names
+
+    def write(self, tables, written):
+        with transaction.atomic():
+            for label, columns, rows in tables:
+                if rows:
+                    model = apps.get_model(label)
+                    fields = [model._meta.get_field(column) for column in columns]
+                    (self.copy_rows if self.use_copy else self.insert_rows)(model, fields, rows)
+                    written[label] = written.get(label, 0) + len(rows)
+
+    @staticmethod
+    def insert_rows(model, fields, rows):
+        """
+        Multi-row INSERT, which is what bulk_create runs, without building model instances and without
+        auto_now_add overwriting the generated creation dates.
+        """
+        batch_size = connection.ops.bulk_batch_size(fields, rows) or len(rows)
+        sql = 'INSERT INTO {} ({}) VALUES '.format(connection.ops.quote_name(model._meta.db_table), ', '.join(
+            connection.ops.quote_name(field.column) for field in fields))
+        placeholder = '({})'.format(', '.join(['%s'] * len(fields)))
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                cursor.execute(sql + ', '.join([placeholder] * len(batch)), [
+                    field.get_db_prep_save(value, connection) for row in batch for field, value in zip(fields, row)])
+
+    @staticmethod
+    def copy_rows(model, fields, rows):
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            prepared = (field.get_db_prep_save(value, connection) for field, value in zip(fields, row))
+            writer.writerow([COPY_NULL if value is None else value for value in prepared])
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert('COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL \'{}\')'.format(
+                connection.ops.quote_name(model._meta.db_table),
+                ', '.join(connection.ops.quote_name(field.column) for field in fields), COPY_NULL), buffer)
+
+    @staticmethod
+    def reset_sequences():
+        """Rows were written with explicit primary keys, so move the sequences past them."""
+        models = [apps.get_model(label) for label in ('auth.User', 'oauth.UserProfile', 'forum.Topic',
+                                                       'forum.Answer', 'photologue.Photo', 'photologue.Gallery')]
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
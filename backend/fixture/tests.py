@@ -1,5 +1,10 @@
+from io import StringIO
 from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import transaction
 from django.test import TestCase, override_settings
+from forum.models import Topic, Answer
+from oauth.models import UserProfile
 from fixture.management.commands.createfixture import Command
 from django.conf import settings
 
@@ -26,3 +31,38 @@ class FixtureTestCase(TestCase):
     def test_create_object_function(self):
         with self.assertRaises(ValueError):
             Command.create_objects(None)
+
+    def test_bulk_create_objects_function(self):
+        with self.assertRaises(ValueError):
+            Command.bulk_create_objects(None)
+
+
+@override_settings(DEBUG=True)
+class LoadTestFixturesTestCase(TestCase):
+    options = {'profiles': 20, 'topics': 30, 'answers': 50, 'topic_upvotes': 100, 'answer_upvotes': 200,
+               'photos': 0, 'chunk_size': 16, 'stdout': StringIO()}
+
+    def generate(self, **options):
+        with transaction.atomic():
+            call_command('loadtest_fixtures', **{**self.options, **options})
+            generated = (list(Topic.objects.order_by('pk').values_list('title', 'slug', 'author_id')),
+                         Answer.objects.count(), Topic.upvotes.through.objects.count(),
+                         Answer.upvotes.through.objects.count(), UserProfile.objects.count())
+            transaction.set_rollback(True)
+        return generated
+
+    def test_volumes(self):
+        """The requested number of rows is generated for every model"""
+        topics, answers, topic_upvotes, answer_upvotes, profiles = self.generate()
+        self.assertEqual((len(topics), answers, topic_upvotes, answer_upvotes, profiles), (30, 50, 100, 200, 20))
+        self.assertEqual(len({slug for _, slug, _ in topics}), 30)
+
+    def test_deterministic(self):
+        """The same seed generates the same rows and another seed different ones"""
+        self.assertEqual(self.generate(seed=1), self.generate(seed=1))
+        self.assertNotEqual(self.generate(seed=1)[0], self.generate(seed=2)[0])
+
+    def test_too_many_upvotes(self):
+        """Upvotes are unique per profile, so more than topics * profiles is refused"""
+        with self.assertRaises(CommandError):
+            self.generate(topic_upvotes=30 * 20 + 1)
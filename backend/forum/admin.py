@@ -1,11 +1,18 @@
 from django.contrib import admin
+from gymkhana_sac.admin import SelectRelatedAdminMixin
+from gymkhana_sac.exports import ExportAdminMixin
+from .exports import TopicExport, AnswerExport
 from .models import Topic, Answer
 
 
-class TopicAdmin(admin.ModelAdmin):
+class TopicAdmin(SelectRelatedAdminMixin, ExportAdminMixin, admin.ModelAdmin):
+    export_class = TopicExport
     date_hierarchy = 'created_at'
     list_display = ('title', 'author', 'created_at')
     list_filter = ('created_at',)
+    list_select_related = ('author__user',)
+    search_fields = ['title', 'slug']
+    autocomplete_fields = ('author', 'upvotes')
 
     class Meta:
         model = Topic
@@ -14,10 +21,13 @@ class TopicAdmin(admin.ModelAdmin):
 admin.site.register(Topic, TopicAdmin)
 
 
-class AnswerAdmin(admin.ModelAdmin):
+class AnswerAdmin(SelectRelatedAdminMixin, ExportAdminMixin, admin.ModelAdmin):
+    export_class = AnswerExport
     date_hierarchy = 'created_at'
     list_display = ('topic', 'author', 'created_at')
     list_filter = ('created_at',)
+    list_select_related = ('topic', 'author__user')
+    autocomplete_fields = ('topic', 'author', 'upvotes')
 
     class Meta:
         model = Answer
@@ -1,46 +1,87 @@
-from rest_framework.views import APIView
-from rest_framework.response import Response
-from forum.models import Topic, Answer
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed
 from django.shortcuts import get_object_or_404
+from forum.live import FORUM_CHANNEL, topic_channel
+from forum.models import Topic, Answer
+from gymkhana_sac.concurrency import run_sync
+from gymkhana_sac.encoding import JSONResponse, dumps
+from gymkhana_sac.pubsub import get_broker
 
+# seconds clients wait before asking for the next events after an ASGI worker answered
+LIVE_RECONNECT = 1
 
-class TopicUpvoteAPIToggle(APIView):
-    def get(self, request, slug=None, format='json'):
-        obj = get_object_or_404(Topic, slug=slug)
-        user = self.request.user
-        updated = False
-        upvoted = False
-        if user.is_authenticated:
-            if user.userprofile in obj.upvotes.all():
-                obj.upvotes.remove(user.userprofile)
-                upvoted = False
-            else:
-                obj.upvotes.add(user.userprofile)
-                upvoted = True
-            updated = True
-        data = {
-            'updated': updated,
-            'upvoted': upvoted
-        }
-        return Response(data)
-
-
-class AnswerUpvoteAPIToggle(APIView):
-    def get(self, request, id=None, format=None):
-        obj = get_object_or_404(Answer, id=id)
-        user = self.request.user
-        updated = False
+
+def toggle_upvote(request, model, **lookup):
+    """Toggles the upvote of the logged in user, ``None`` for anonymous users, who are refused before the lookup"""
+    user = request.user
+    if not user.is_authenticated:
+        return None
+    obj = get_object_or_404(model, **lookup)
+    if obj.upvotes.filter(pk=user.userprofile.pk).exists():
+        obj.upvotes.remove(user.userprofile)
         upvoted = False
-        if user.is_authenticated:
-            if user.userprofile in obj.upvotes.all():
-                obj.upvotes.remove(user.userprofile)
-                upvoted = False
-            else:
-                obj.upvotes.add(user.userprofile)
-                upvoted = True
-            updated = True
-        data = {
-            'updated': updated,
-            'upvoted': upvoted
-        }
-        return Response(data)
+    else:
+        obj.upvotes.add(user.userprofile)
+        upvoted = True
+    return {
+        'updated': True,
+        'upvoted': upvoted
+    }
+
+
+def upvote_response(data):
+    # the 403 REST framework's IsAuthenticated answered the DRF views these replace with
+    if data is None:
+        return JSONResponse({'detail': 'Authentication credentials were not provided.'}, status=403)
+    return JSONResponse(data)
+
+
+async def topic_upvote_toggle(request, slug=None):
+    return upvote_response(await run_sync(toggle_upvote, request, Topic, slug=slug))
+
+
+async def answer_upvote_toggle(request, id=None):
+    return upvote_response(await run_sync(toggle_upvote, request, Answer, id=id))
+
+
+async def live(request, slug=None):
+    """
+    The events of the forum, or of the topic ``slug``, after the id of the ``Last-Event-ID`` header or ``after``
+    parameter, as ``text/event-stream`` for ``EventSource`` clients and as JSON otherwise. Without an id, the events
+    after the current last one. Clients are told to ``reset``, i.e. fetch again, when events they did not see are
+    no longer kept.
+
+    ASGI workers wait up to ``LIVE_TIMEOUT`` seconds for an event, the answer ends the request and clients come back
+    for the next events (``retry``), which makes this a long poll ``EventSource`` follows by itself. WSGI workers,
+    which a waiting request would hold, answer at once and clients come back after ``LIVE_POLL_INTERVAL`` seconds.
+    """
+    # require_GET does not wrap coroutines before Django 4.1
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    after = request.headers.get('Last-Event-ID') or request.GET.get('after')
+    try:
+        after = None if after is None else int(after)
+    except ValueError:
+        return HttpResponseBadRequest('The last event id must be an integer.')
+    if isinstance(request, ASGIRequest):
+        timeout, retry = settings.LIVE_TIMEOUT, LIVE_RECONNECT
+    else:
+        timeout, retry = 0, settings.LIVE_POLL_INTERVAL
+    last_id, events = await get_broker().wait(FORUM_CHANNEL if slug is None else topic_channel(slug), after, timeout)
+    if after is not None and (after > last_id or events and events[0][0] > after + 1):
+        events = [(last_id, {'type': 'reset'})]
+
+    if 'text/event-stream' not in request.headers.get('Accept', ''):
+        response = JSONResponse({
+            'lastEventId': last_id,
+            'retry': retry * 1000,
+            'events': [{'eventId': event_id, **event} for event_id, event in events],
+        })
+    else:
+        # an id without data moves the client's Last-Event-ID along without an event
+        messages = [f'id: {event_id}\ndata: {dumps(event).decode()}\n\n' for event_id, event in events] or \
+                   [f'id: {last_id}\n\n']
+        response = HttpResponse(f'retry: {retry * 1000}\n' + ''.join(messages), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    return response
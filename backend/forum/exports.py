@@ -0,0 +1,44 @@
+from django.db.models import Count, Value
+from gymkhana_sac.exports import ChainedExport, Export
+from .models import Topic, Answer
+
+
+class TopicExport(Export):
+    name = 'forum-topics'
+    model = Topic
+    ordering = ('created_at', 'pk')
+    columns = (
+        ('kind', 'kind'),
+        ('topic', 'slug'),
+        ('title', 'title'),
+        ('roll', 'author__roll'),
+        ('created_at', 'created_at'),
+        ('upvotes', 'upvote_count'),
+    )
+
+    def rows(self, queryset=None):
+        queryset = self.get_queryset() if queryset is None else queryset
+        return super().rows(queryset.annotate(kind=Value('topic'), upvote_count=Count('upvotes')))
+
+
+class AnswerExport(Export):
+    name = 'forum-answers'
+    model = Answer
+    ordering = ('created_at', 'pk')
+    columns = (
+        ('kind', 'kind'),
+        ('topic', 'topic__slug'),
+        ('title', 'topic__title'),
+        ('roll', 'author__roll'),
+        ('created_at', 'created_at'),
+        ('upvotes', 'upvote_count'),
+    )
+
+    def rows(self, queryset=None):
+        queryset = self.get_queryset() if queryset is None else queryset
+        return super().rows(queryset.annotate(kind=Value('answer'), upvote_count=Count('upvotes')))
+
+
+class ForumActivityExport(ChainedExport):
+    name = 'forum-activity'
+    exports = (TopicExport, AnswerExport)
@@ -1,7 +1,7 @@
 from django import forms
 from .models import Topic, Answer
 from ckeditor_uploader.widgets import CKEditorUploadingWidget
-from django.utils.html import strip_tags
+from gymkhana_sac.richtext import html_to_text
 
 
 class TopicForm(forms.ModelForm):
@@ -21,9 +21,7 @@ class AnswerForm(forms.ModelForm):
         fields = ('topic', 'author', 'content')
 
     def clean_content(self):
-        content = strip_tags(self.data['content']).split()
-        content = [x for x in content if x != '&nbsp;']
-        if len(content) == 0:
+        if not html_to_text(self.data['content']):
             raise forms.ValidationError('This field is required')
         else:
             return self.data['content']
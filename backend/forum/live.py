@@ -0,0 +1,69 @@
+"""
+Live forum events, published to the ``forum`` channel and to the ``topic:<slug>`` channel of their topic once the
+transaction writing them commits (see ``gymkhana_sac/pubsub.py``). They carry the deltas clients apply to the topics
+and answers they fetched, ids being those of ``TopicNode`` and ``AnswerNode``:
+
+- ``{"type": "topic", "topic": <slug>, "id": <topic id>, "title": ..., "created": true|false}``
+- ``{"type": "answer", "topic": <slug>, "id": <answer id>, "topicId": <topic id>}``
+- ``{"type": "upvotes", "topic": <slug>, "id": <topic or answer id>, "isTopic": true|false, "count": <upvotes>}``
+
+Served by ``forum.api.views.live``.
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save
+from forum.models import Topic, Answer
+from gymkhana_sac.pubsub import get_broker
+
+FORUM_CHANNEL = 'forum'
+
+
+def topic_channel(slug):
+    return f'topic:{slug}'
+
+
+def publish(slug, event):
+    def send():
+        broker = get_broker()
+        broker.publish(FORUM_CHANNEL, event)
+        broker.publish(topic_channel(slug), event)
+    transaction.on_commit(send)
+
+
+def topic_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    publish(instance.slug, {'type': 'topic', 'topic': instance.slug, 'id': instance.id, 'title': instance.title,
+                            'created': created})
+
+
+def answer_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    slug = instance.topic.slug
+    publish(slug, {'type': 'answer', 'topic': slug, 'id': instance.id, 'topicId': instance.topic_id})
+
+
+def upvotes_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        objs = [instance]
+    elif pk_set:
+        # profile.topic_upvotes.add(...), the upvoted objects are the model's
+        objs = model._default_manager.filter(pk__in=pk_set)
+        if model is Answer:
+            objs = objs.select_related('topic')
+    else:
+        return
+    for obj in objs:
+        is_topic = isinstance(obj, Topic)
+        slug = obj.slug if is_topic else obj.topic.slug
+        publish(slug, {'type': 'upvotes', 'topic': slug, 'id': obj.id, 'isTopic': is_topic,
+                       'count': obj.upvotes.count()})
+
+
+def connect():
+    post_save.connect(topic_saved, sender=Topic, dispatch_uid='forum.live.topic_saved')
+    post_save.connect(answer_saved, sender=Answer, dispatch_uid='forum.live.answer_saved')
+    m2m_changed.connect(upvotes_changed, sender=Topic.upvotes.through, dispatch_uid='forum.live.topic_upvotes')
+    m2m_changed.connect(upvotes_changed, sender=Answer.upvotes.through, dispatch_uid='forum.live.answer_upvotes')
@@ -1,7 +1,8 @@
 from django.db import models
 from django.db.models import Q
-from django.db.models.signals import pre_save
-from .utils import unique_slug_generator
+from gymkhana_sac.richtext import RichTextModel
+from gymkhana_sac.slugs import UniqueSlugMixin
+from .utils import PROHIBITED
 from oauth.models import UserProfile
 from ckeditor_uploader.fields import RichTextUploadingField
 from django.urls import reverse
@@ -15,9 +16,9 @@ class TopicQueryset(models.query.QuerySet):
                 Q(author__user__first_name__icontains=query) |
                 Q(author__user__last_name__icontains=query) |
                 Q(title__icontains=query) |
-                Q(content__icontains=query) |
+                Q(plain_text__icontains=query) |
                 Q(tags__icontains=query) |
-                Q(answer__content__icontains=query)
+                Q(answer__plain_text__icontains=query)
             ).distinct()
         else:
             return self.none()
@@ -31,7 +32,7 @@ class TopicManager(models.Manager):
         return self.get_topic_queryset().search(query)
 
 
-class Topic(models.Model, HitCountMixin):
+class Topic(UniqueSlugMixin, RichTextModel, HitCountMixin):
     # Choices
     CAT_CHOICES = (
         ('Q', 'Question'),
@@ -51,6 +52,9 @@ class Topic(models.Model, HitCountMixin):
 
     objects = TopicManager()
 
+    slug_source = 'title'
+    reserved_slugs = PROHIBITED
+
     @property
     def number_of_answers(self):
         return self.answer_set.count()
@@ -79,15 +83,7 @@ class Topic(models.Model, HitCountMixin):
         return self.title
 
 
-def topic_pre_save_receiver(sender, instance, *args, **kwargs):
-    if not instance.slug:
-        instance.slug = unique_slug_generator(instance)
-
-
-pre_save.connect(topic_pre_save_receiver, sender=Topic)
-
-
-class Answer(models.Model):
+class Answer(RichTextModel):
     topic = models.ForeignKey(Topic, on_delete=models.CASCADE, verbose_name="topic of answer")
     author = models.ForeignKey(UserProfile, on_delete=models.CASCADE, verbose_name="author of answer")
     content = RichTextUploadingField(blank=True)
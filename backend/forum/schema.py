@@ -1,4 +1,5 @@
 import graphene
+from django.db.models import Prefetch
 from graphene import relay
 from graphene_django import DjangoObjectType
 from graphene_django.forms.mutation import DjangoModelFormMutation
@@ -6,9 +7,26 @@ from graphql_jwt.decorators import login_required
 
 from forum.forms import TopicForm, AnswerForm
 from forum.models import Topic, Answer
+from gymkhana_sac.auth import viewer_profile_id
+from gymkhana_sac.optimizer import QueryOptimizerMixin, count, hints, prefetched
+from gymkhana_sac.pagination import CountableConnection
+from oauth.models import UserProfile
 
+# the upvoters of topics and answers, for counting them and telling whether the viewer is one
+UPVOTES = Prefetch('upvotes', queryset=UserProfile.objects.only('id'))
 
-class AnswerNode(DjangoObjectType):
+
+def is_upvoted(obj, info):
+    """Whether the viewer upvoted the topic or answer ``obj``, from its prefetched upvoters if they are"""
+    profile_id = viewer_profile_id(info.context)
+    if profile_id is None:
+        return False
+    if prefetched(obj, 'upvotes'):
+        return any(profile.id == profile_id for profile in obj.upvotes.all())
+    return obj.upvotes.filter(id=profile_id).exists()
+
+
+class AnswerNode(QueryOptimizerMixin, DjangoObjectType):
     id = graphene.ID(required=True)
     upvotes_count = graphene.Int()
     is_upvoted = graphene.Boolean()
@@ -23,19 +41,20 @@ class AnswerNode(DjangoObjectType):
     def resolve_id(self, info):
         return self.id
 
+    @hints(prefetch_related=(UPVOTES,))
     def resolve_upvotes_count(self, info):
-        return self.upvotes.count()
+        return count(self, 'upvotes')
 
+    @hints(prefetch_related=(UPVOTES,))
     def resolve_is_upvoted(self, info):
-        if info.context.user.userprofile in self.upvotes.all():
-            return True
-        return False
+        return is_upvoted(self, info)
 
+    @hints(only=('author',))
     def resolve_is_author(self, info):
-        return info.context.user.userprofile == self.author
+        return viewer_profile_id(info.context) == self.author_id
 
 
-class TopicNode(DjangoObjectType):
+class TopicNode(QueryOptimizerMixin, DjangoObjectType):
     id = graphene.ID(required=True)
     upvotes_count = graphene.Int()
     answers_count = graphene.Int()
@@ -47,6 +66,7 @@ class TopicNode(DjangoObjectType):
         fields = '__all__'
         filter_fields = ('slug',)
         interfaces = (relay.Node,)
+        connection_class = CountableConnection
 
     @classmethod
     def search(cls, query, indfo):
@@ -56,19 +76,21 @@ class TopicNode(DjangoObjectType):
     def resolve_id(self, info):
         return self.id
 
+    @hints(prefetch_related=(UPVOTES,))
     def resolve_upvotes_count(self, info):
-        return self.upvotes.count()
+        return count(self, 'upvotes')
 
+    @hints(prefetch_related=(Prefetch('answer_set', queryset=Answer.objects.only('topic')),))
     def resolve_answers_count(self, info):
-        return self.answer_set.count()
+        return count(self, 'answer_set')
 
+    @hints(prefetch_related=(UPVOTES,))
     def resolve_is_upvoted(self, info):
-        if info.context.user.userprofile in self.upvotes.all():
-            return True
-        return False
+        return is_upvoted(self, info)
 
+    @hints(only=('author',))
     def resolve_is_author(self, info):
-        return info.context.user.userprofile == self.author
+        return viewer_profile_id(info.context) == self.author_id
 
 
 class CreateTopicMutation(DjangoModelFormMutation):
@@ -3,6 +3,7 @@ from django.test import TestCase, Client
 from django.urls import reverse
 from django.utils import timezone
 from forum.models import Topic, Answer
+from gymkhana_sac.slugs import bulk_create_with_slugs
 from oauth.models import UserProfile
 
 
@@ -44,3 +45,48 @@ class ForumTestCase(TestCase):
 
         response = self.client.get(self.answer_1.get_delete_url())
         self.assertRedirects(response, reverse('login') + "?next=" + self.answer_1.get_delete_url())
+
+
+class TopicSlugTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_1 = User.objects.create(username='test_user', first_name='test', last_name='user')
+        cls.user_profile_1 = UserProfile.objects.create(user=cls.user_1, roll='B00CS000', dob=timezone.now())
+
+    def test_slug_collision_gets_next_suffix(self):
+        """Topics with the same title get increasing numeric suffixes"""
+        slugs = [Topic.objects.create(author=self.user_profile_1, title='Same title').slug for _ in range(3)]
+        self.assertEqual(slugs, ['same-title', 'same-title-2', 'same-title-3'])
+
+    def test_slug_free_base_used(self):
+        """The bare slug is used when it is free, whatever numbered slugs exist"""
+        Topic.objects.create(author=self.user_profile_1, title='python 3')
+        self.assertEqual(Topic.objects.create(author=self.user_profile_1, title='python').slug, 'python')
+
+    def test_slug_year_tail_not_a_suffix(self):
+        """Numbers ending other titles, like years, do not push the suffixes of the bare slug"""
+        Topic.objects.create(author=self.user_profile_1, title='Fest 2021')
+        slugs = [Topic.objects.create(author=self.user_profile_1, title='Fest').slug for _ in range(2)]
+        self.assertEqual(slugs, ['fest', 'fest-2'])
+
+    def test_slug_reserved_word(self):
+        """Reserved words are never used as a bare slug"""
+        self.assertEqual(Topic.objects.create(author=self.user_profile_1, title='add').slug, 'add-2')
+
+    def test_slug_kept_when_given(self):
+        """An explicit slug is left untouched"""
+        self.assertEqual(Topic.objects.create(author=self.user_profile_1, title='abc', slug='custom').slug, 'custom')
+
+    def test_slug_fits_column(self):
+        """Slugs generated from long titles fit the slug column"""
+        topic = Topic.objects.create(author=self.user_profile_1, title='word ' * 40)
+        self.assertLessEqual(len(topic.slug), Topic._meta.get_field('slug').max_length)
+
+    def test_bulk_create_with_slugs(self):
+        """Bulk created topics get distinct slugs, also across batches"""
+        Topic.objects.create(author=self.user_profile_1, title='Bulk')
+        topics = [Topic(author=self.user_profile_1, title='Bulk') for _ in range(5)]
+        bulk_create_with_slugs(Topic, topics, batch_size=2)
+        self.assertEqual(sorted(topic.slug for topic in topics),
+                         ['bulk-2', 'bulk-3', 'bulk-4', 'bulk-5', 'bulk-6'])
+        self.assertEqual(Topic.objects.filter(slug__startswith='bulk').count(), 6)
@@ -1,30 +1,5 @@
-from django.utils.text import slugify
-import random
-import string
-
 PROHIBITED = ['add']
 
 
-def random_string_generator(size=7, chars=string.ascii_lowercase + string.digits):
-    return ''.join(random.choice(chars) for _ in range(size))
-
-
-def unique_slug_generator(instance, new_slug=None):
-    if new_slug is not None:
-        slug = new_slug
-    else:
-        slug = slugify(instance.title)
-
-    klass = instance.__class__
-    qs_exists = klass.objects.filter(slug=slug).exists()
-    if qs_exists or slug in PROHIBITED:
-        new_slug = "{slug}-{randstr}".format(
-            slug=slug,
-            randstr=random_string_generator(size=4)
-        )
-        return unique_slug_generator(instance, new_slug=new_slug)
-    return slug
-
-
 def send_activation_email(user=None, uidb64=None, token=None):
     pass
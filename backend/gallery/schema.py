@@ -1,10 +1,13 @@
 from graphene import ObjectType, String, List
+from gymkhana_sac.cache_control import cache_hint
 
 
+@cache_hint()
 class RenditionType(ObjectType):
     name = String()
     url = String()
 
 
+@cache_hint()
 class ImageType(ObjectType):
     sizes = List(RenditionType)
@@ -0,0 +1,44 @@
+"""
+Gunicorn settings of the production image: ``gunicorn gymkhana_sac.wsgi``, or ``gunicorn gymkhana_sac.asgi`` with
+``GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker``. Gunicorn reads this file from the working directory.
+
+The app is preloaded in the master and forked into the workers. ``kill -HUP`` restarts the workers gracefully
+(reloading this configuration, not the preloaded code); ``kill -USR2`` followed by ``kill -QUIT`` of the old master
+deploys new code without dropping requests.
+"""
+import multiprocessing
+import os
+import shutil
+
+from decouple import config
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gymkhana_sac.settings')
+
+bind = config('GUNICORN_BIND', default='0.0.0.0:9999')
+workers = config('GUNICORN_WORKERS', default=multiprocessing.cpu_count() * 2 + 1, cast=int)
+worker_class = config('GUNICORN_WORKER_CLASS', default='sync')
+threads = config('GUNICORN_THREADS', default=1, cast=int)
+preload_app = True
+timeout = config('GUNICORN_TIMEOUT', default=30, cast=int)
+graceful_timeout = config('GUNICORN_GRACEFUL_TIMEOUT', default=30, cast=int)
+keepalive = 5
+# Recycle workers now and then, so a slow leak can not take a worker down
+max_requests = config('GUNICORN_MAX_REQUESTS', default=2000, cast=int)
+max_requests_jitter = max_requests // 10
+forwarded_allow_ips = config('GUNICORN_FORWARDED_ALLOW_IPS', default='*')
+accesslog = '-'
+errorlog = '-'
+
+
+def on_starting(server):
+    # Metrics files of an earlier run would be summed with the ones of this run
+    from django.conf import settings
+    if settings.METRICS_ENABLED:
+        shutil.rmtree(settings.METRICS_DIR, ignore_errors=True)
+
+
+def when_ready(server):
+    # Runs in the master before the workers are forked, connections opened while preloading must not be shared
+    from django.db import connections
+    for connection in connections.all():
+        connection.close()
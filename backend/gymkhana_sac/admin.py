@@ -0,0 +1,97 @@
+"""
+Admin helpers. Profiles are picked with autocomplete widgets, which search the ``UserProfileAdmin`` instead of
+rendering every profile as an option of a ``<select>``.
+"""
+from django.contrib.admin.widgets import AutocompleteSelect
+
+# What the ``__str__`` of models shown in admin widgets, inline headers and autocomplete results reads
+WIDGET_SELECT_RELATED = {
+    'oauth.UserProfile': ('user',),
+    'main.Society': ('board',),
+    'main.Committee': ('board',),
+    'main.Membership': ('userprofile__user',),
+    'main.SenateMembership': ('userprofile__user',),
+}
+
+
+def widget_queryset(model):
+    """The objects of ``model`` with what their ``__str__`` reads, ``None`` when it reads nothing else"""
+    lookups = WIDGET_SELECT_RELATED.get(model._meta.label)
+    return model._default_manager.select_related(*lookups) if lookups else None
+
+
+class SelectRelatedAdminMixin(object):
+    """
+    ``ModelAdmin`` or inline mixin loading what the ``__str__`` of its objects and of the options of its foreign key
+    and many to many widgets reads along with them, rather than with a query per object.
+    """
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        lookups = WIDGET_SELECT_RELATED.get(self.model._meta.label, ())
+        if not lookups:
+            return queryset
+        # change lists only apply list_select_related to querysets without select_related
+        list_select_related = getattr(self, 'list_select_related', ())
+        if isinstance(list_select_related, (list, tuple)):
+            lookups += tuple(list_select_related)
+        return queryset.select_related(*lookups)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if 'queryset' not in kwargs:
+            queryset = widget_queryset(db_field.related_model)
+            if queryset is not None:
+                kwargs['queryset'] = queryset
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def formfield_for_manytomany(self, db_field, request, **kwargs):
+        if 'queryset' not in kwargs:
+            queryset = widget_queryset(db_field.related_model)
+            if queryset is not None:
+                kwargs['queryset'] = queryset
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
+
+
+class InstanceAutocompleteSelect(AutocompleteSelect):
+    """``AutocompleteSelect`` labelled with the ``selected`` object the form's instance holds, rather than a query"""
+    selected = None
+
+    def optgroups(self, name, value, attr=None):
+        selected = self.selected
+        values = [str(v) for v in value if str(v) not in self.choices.field.empty_values]
+        if selected is None or self.field.remote_field.field_name != selected._meta.pk.name or \
+                values != [str(selected.pk)]:
+            return super().optgroups(name, value, attr)
+        options = [] if self.is_required else [self.create_option(name, '', '', False, 0)]
+        options.append(self.create_option(name, selected.pk, self.choices.field.label_from_instance(selected), True,
+                                          len(options)))
+        return [(None, options, 0)]
+
+
+class SelectRelatedInlineMixin(SelectRelatedAdminMixin):
+    """
+    Inline mixin labelling the autocomplete widgets of foreign keys of existing rows with the related objects the
+    rows were loaded with (see ``WIDGET_SELECT_RELATED``), so that the rows do not cost a query each.
+    """
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if 'widget' not in kwargs and db_field.name in self.get_autocomplete_fields(request):
+            kwargs['widget'] = InstanceAutocompleteSelect(db_field, self.admin_site, using=kwargs.get('using'))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        names = [name for name in self.get_autocomplete_fields(request)
+                 if self.model._meta.get_field(name).many_to_one]
+
+        class InstanceLabelsFormSet(formset):
+            def _construct_form(self, i, **kwargs):
+                form = super()._construct_form(i, **kwargs)
+                for name in names:
+                    widget = getattr(form.fields[name].widget, 'widget', None)
+                    if isinstance(widget, InstanceAutocompleteSelect) and \
+                            form.instance._meta.get_field(name).is_cached(form.instance):
+                        widget.selected = getattr(form.instance, name)
+                return form
+
+        return InstanceLabelsFormSet
@@ -0,0 +1,17 @@
+"""
+ASGI config for gymkhana_sac project.
+
+It exposes the ASGI callable as a module-level variable named ``application``, served by gunicorn with
+``GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker``.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gymkhana_sac.settings')
+
+application = get_asgi_application()
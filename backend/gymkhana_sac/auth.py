@@ -0,0 +1,89 @@
+"""
+JWT authentication of GraphQL requests, done once per request instead of once per resolved field like
+``graphql_jwt.middleware.JSONWebTokenMiddleware`` does. Requests without a session user are authenticated with the
+token of their ``Authorization`` header (or JWT cookie): it is verified, or found among the payloads verified in the
+last ``JWT_PAYLOAD_CACHE_TIMEOUT`` seconds, and the user is loaded with its profile in one query. Tokens passed as
+arguments (``JWT_ALLOW_ARGUMENT``) are not supported.
+
+Resolvers get the profile of the viewer with ``viewer_profile_id(info.context)``, without a query.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils.translation import gettext as _
+from graphql_jwt import exceptions
+from graphql_jwt.settings import jwt_settings
+from graphql_jwt.utils import get_http_authorization, get_payload
+from gymkhana_sac.cache import LocalTier
+
+_payloads = LocalTier(settings.JWT_PAYLOAD_CACHE_MAX_ENTRIES)
+
+
+def verified_payload(token, request=None):
+    """The payload of ``token``, verified now or at most ``JWT_PAYLOAD_CACHE_TIMEOUT`` seconds ago"""
+    key = hashlib.sha256(token.encode()).hexdigest()
+    payload = _payloads.get(key)
+    if payload is not None:
+        return payload
+    payload = get_payload(token, request)
+    keep_until = time.time() + settings.JWT_PAYLOAD_CACHE_TIMEOUT
+    if jwt_settings.JWT_VERIFY_EXPIRATION and 'exp' in payload:
+        keep_until = min(keep_until, payload['exp'])
+    _payloads.set(key, payload, keep_until)
+    return payload
+
+
+def get_user_by_token(token, request=None):
+    """The user ``token`` was issued to, with its profile, ``None`` if there is no such user"""
+    payload = verified_payload(token, request)
+    username = jwt_settings.JWT_PAYLOAD_GET_USERNAME_HANDLER(payload)
+    if not username:
+        raise exceptions.JSONWebTokenError(_('Invalid payload'))
+    user_model = get_user_model()
+    try:
+        user = user_model._default_manager.select_related('userprofile').get(**{user_model.USERNAME_FIELD: username})
+    except user_model.DoesNotExist:
+        return None
+    if not user.is_active:
+        raise exceptions.JSONWebTokenError(_('User is disabled'))
+    return user
+
+
+def authenticate(request):
+    """Authenticates ``request`` with its token when it has no session user, once, raising the token's errors"""
+    if not hasattr(request, '_jwt_error'):
+        request._jwt_error = None
+        token = get_http_authorization(request)
+        if token is not None and not request.user.is_authenticated:
+            try:
+                user = get_user_by_token(token, request)
+            except exceptions.JSONWebTokenError as error:
+                request._jwt_error = error
+            else:
+                if user is not None:
+                    request.user = user
+    if request._jwt_error is not None:
+        raise request._jwt_error
+
+
+def viewer_profile_id(request):
+    """Id of the profile of the user ``request`` is authenticated as, ``None`` without one"""
+    user = request.user
+    if not user.is_authenticated:
+        return None
+    try:
+        return user.userprofile.id
+    except ObjectDoesNotExist:
+        return None
+
+
+class JSONWebTokenMiddleware(object):
+    """GRAPHENE middleware authenticating requests with their JWT before their top level fields resolve"""
+
+    def resolve(self, next, root, info, **kwargs):
+        if root is None:
+            authenticate(info.context)
+        return next(root, info, **kwargs)
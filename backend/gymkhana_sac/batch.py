@@ -0,0 +1,57 @@
+"""
+Batched GraphQL requests: a JSON array of operations posted to a GraphQL view runs them all in the one request, so
+they share the middleware, authentication, session, database connection and the request as GraphQL context. The
+response is the array of their results, in order, each with the ``id`` it was sent with and its own ``status``::
+
+    [{"id": 1, "query": "{ viewer { username } }"}, {"id": 2, "query": "{ boards { edges { node { name } } } }"}]
+
+An operation that fails only fails its own result, the response is 200 whenever the batch itself could be read.
+"""
+import json
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import HttpResponseBadRequest
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.views import HttpError
+
+
+class GraphQLBatchMixin(object):
+    """``GraphQLView`` mixin accepting an array of operations as well as a single one"""
+
+    def parse_body(self, request):
+        if self.get_content_type(request) == 'application/json':
+            try:
+                data = json.loads(request.body.decode('utf-8'))
+            except (TypeError, ValueError):
+                data = None
+            # the view is instantiated per request, batching is decided for this one
+            self.batch = isinstance(data, list)
+            if self.batch:
+                if not data:
+                    raise HttpError(HttpResponseBadRequest('Received an empty list in the batch request.'))
+                if len(data) > settings.GRAPHQL_MAX_BATCH_SIZE:
+                    raise HttpError(HttpResponseBadRequest(
+                        f'Batch requests take at most {settings.GRAPHQL_MAX_BATCH_SIZE} operations.'))
+                if not all(isinstance(operation, dict) for operation in data):
+                    raise HttpError(HttpResponseBadRequest('Every operation of a batch must be an object.'))
+                return data
+        return super().parse_body(request)
+
+    def get_response(self, request, data, show_graphiql=False):
+        if not self.batch:
+            return super().get_response(request, data, show_graphiql)
+        # a mutation failing earlier in the batch must not roll back the ones after it
+        setattr(request, MUTATION_ERRORS_FLAG, False)
+        with ExitStack() as stack:
+            if connection.in_atomic_block:
+                # with ATOMIC_REQUESTS, an operation's errors only roll back its own savepoint
+                stack.enter_context(transaction.atomic())
+            try:
+                result = super().get_response(request, data, show_graphiql)[0]
+            except HttpError as error:
+                result = self.json_encode(request, {
+                    'errors': [self.format_error(error)], 'id': data.get('id'), 'status': error.response.status_code,
+                })
+        return result, 200
@@ -0,0 +1,33 @@
+from django.db import connections, router
+
+
+def bulk_upsert(model, objs, unique_fields, update_fields, batch_size=500):
+    """
+    Inserts ``objs`` and updates ``update_fields`` of rows that already exist with the same ``unique_fields``,
+    using ``INSERT ... ON CONFLICT DO UPDATE`` (PostgreSQL and SQLite 3.24+). This is what
+    ``bulk_create(update_conflicts=True)`` does on newer Django versions, without the per-row CASE
+    expressions that make ``bulk_update`` slow for large batches.
+    """
+    using = router.db_for_write(model)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    # primary keys are only written when every row carries one, otherwise the database assigns them
+    with_pk = all(obj.pk is not None for obj in objs)
+    fields = [field for field in model._meta.concrete_fields if with_pk or not field.primary_key]
+    batch_size = min(batch_size, connection.ops.bulk_batch_size(fields, objs) or batch_size)
+    columns = ', '.join(quote(field.column) for field in fields)
+    conflict = ', '.join(quote(model._meta.get_field(name).column) for name in unique_fields)
+    updates = ', '.join('{0} = EXCLUDED.{0}'.format(quote(model._meta.get_field(name).column))
+                        for name in update_fields)
+    row_placeholder = '({})'.format(', '.join(['%s'] * len(fields)))
+    with connection.cursor() as cursor:
+        for start in range(0, len(objs), batch_size):
+            batch = objs[start:start + batch_size]
+            params = [field.get_db_prep_save(field.pre_save(obj, add=True), connection)
+                      for obj in batch for field in fields]
+            cursor.execute(
+                f'INSERT INTO {quote(model._meta.db_table)} ({columns}) '
+                f'VALUES {", ".join([row_placeholder] * len(batch))} '
+                f'ON CONFLICT ({conflict}) DO UPDATE SET {updates}',
+                params)
+    return objs
@@ -0,0 +1,230 @@
+"""
+Two tier cache backend: a small in-process LRU in front of a shared cache alias, with stampede protection in
+``get_or_set``. Configured per alias in ``CACHES``::
+
+    'pages': {
+        'BACKEND': 'gymkhana_sac.cache.TieredCache',
+        'LOCATION': 'pages',
+        'TIMEOUT': 60,
+        'OPTIONS': {'SHARED': 'default', 'LOCAL_MAX_ENTRIES': 500, 'LOCAL_TIMEOUT': 5},
+    }
+
+Entries live in the shared cache for ``TIMEOUT`` seconds plus ``STALE_TIMEOUT``, during which ``get_or_set`` still
+serves them while a single caller, holding a lock in the shared cache, recomputes the value. Other processes see a
+change after at most ``LOCAL_TIMEOUT`` seconds, when their local copy expires.
+"""
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
+from gymkhana_sac.instrumentation import notify
+
+# local tiers and statistics, by LOCATION, shared by the per thread backend instances like LocMemCache does
+_tiers = {}
+_stats = {}
+_lock = threading.Lock()
+
+STATISTICS = ('local_hits', 'shared_hits', 'misses', 'stale_hits', 'recomputes', 'lock_waits')
+
+
+class LocalTier(object):
+    """Thread safe LRU of pickled ``(value, fresh_until)`` entries, each kept until its ``local_until``"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+        return pickle.loads(entry[0])
+
+    def set(self, key, envelope, local_until):
+        pickled = pickle.dumps(envelope, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.entries[key] = (pickled, local_until)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            return self.entries.pop(key, None) is not None
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class TieredCache(BaseCache):
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.name = name
+        self.shared_alias = options.get('SHARED', 'default')
+        self.local_timeout = options.get('LOCAL_TIMEOUT', 5)
+        self.stale_timeout = options.get('STALE_TIMEOUT', 30)
+        self.lock_timeout = options.get('LOCK_TIMEOUT', 10)
+        with _lock:
+            if name not in _tiers:
+                _tiers[name] = LocalTier(options.get('LOCAL_MAX_ENTRIES', 1000))
+                _stats[name] = Counter()
+        self.local = _tiers[name]
+        self.stats = _stats[name]
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def count(self, statistic):
+        with _lock:
+            self.stats[statistic] += 1
+
+    def wrap(self, value, timeout):
+        """The ``(value, fresh_until)`` envelope of a value kept for ``timeout``, and its timeout in the shared tier"""
+        timeout = self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+        if timeout is None:
+            return (value, None), None
+        return (value, time.time() + timeout), timeout + self.stale_timeout
+
+    def entry(self, key):
+        """The ``(value, fresh_until)`` envelope of a made key, from the local tier or else the shared one"""
+        envelope = self.local.get(key)
+        if envelope is not None:
+            self.count('local_hits')
+            return envelope
+        envelope = self.shared.get(key)
+        if envelope is None:
+            self.count('misses')
+            return None
+        self.count('shared_hits')
+        self.keep_local(key, envelope)
+        return envelope
+
+    def keep_local(self, key, envelope):
+        local_until = time.time() + self.local_timeout
+        fresh_until = envelope[1]
+        self.local.set(key, envelope, local_until if fresh_until is None else min(local_until, fresh_until))
+
+    @staticmethod
+    def fresh(envelope):
+        return envelope is not None and (envelope[1] is None or envelope[1] > time.time())
+
+    def store(self, key, value, timeout):
+        if timeout == 0:
+            self.delete_key(key)
+            return
+        envelope, shared_timeout = self.wrap(value, timeout)
+        self.shared.set(key, envelope, shared_timeout)
+        self.keep_local(key, envelope)
+
+    def delete_key(self, key):
+        deleted = self.local.delete(key)
+        return bool(self.shared.delete(key)) or deleted
+
+    def get(self, key, default=None, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        envelope = self.entry(key)
+        return envelope[0] if self.fresh(envelope) else default
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        self.store(key, value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        envelope = self.entry(key)
+        if self.fresh(envelope):
+            return False
+        if envelope is not None:
+            # stale, but still in the shared tier
+            self.store(key, value, timeout)
+            return True
+        envelope, shared_timeout = self.wrap(value, timeout)
+        if not self.shared.add(key, envelope, shared_timeout):
+            return False
+        self.keep_local(key, envelope)
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        envelope = self.entry(key)
+        if not self.fresh(envelope):
+            return False
+        self.store(key, envelope[0], timeout)
+        return True
+
+    def delete(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return self.delete_key(key)
+
+    def clear(self):
+        # entries of this alias cannot be told apart in the shared cache, it is cleared as a whole
+        self.local.clear()
+        self.shared.clear()
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        """
+        Like ``BaseCache.get_or_set``, but when the entry is missing or stale, only the caller that takes the lock
+        computes ``default``. The others serve the stale value, or wait up to ``LOCK_TIMEOUT`` for the new one.
+        """
+        made_key = self.make_key(key, version=version)
+        self.validate_key(made_key)
+        envelope = self.entry(made_key)
+        if self.fresh(envelope):
+            notify(self, 1, 0)
+            return envelope[0]
+        notify(self, 0, 1)
+        lock_key = f'{made_key}:lock'
+        owns_lock = self.shared.add(lock_key, True, self.lock_timeout)
+        if not owns_lock:
+            if envelope is not None:
+                self.count('stale_hits')
+                return envelope[0]
+            envelope = self.wait(made_key)
+            if envelope is not None:
+                return envelope[0]
+        try:
+            value = default() if callable(default) else default
+            self.count('recomputes')
+            self.store(made_key, value, timeout)
+        finally:
+            # a caller that waited in vain computes without the lock, which stays with its holder
+            if owns_lock:
+                self.shared.delete(lock_key)
+        return value
+
+    def wait(self, key):
+        """The envelope another process is computing, ``None`` if it is not there within ``LOCK_TIMEOUT``"""
+        self.count('lock_waits')
+        deadline = time.monotonic() + self.lock_timeout
+        delay = 0.01
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            envelope = self.shared.get(key)
+            if self.fresh(envelope):
+                self.keep_local(key, envelope)
+                return envelope
+            delay = min(delay * 2, 0.2)
+        return None
+
+
+def tiered_stats():
+    """Lookup statistics of the tiered caches of this process, by LOCATION"""
+    with _lock:
+        return {name: {statistic: stats[statistic] for statistic in STATISTICS} for name, stats in _stats.items()}
@@ -0,0 +1,154 @@
+"""
+HTTP caching of GraphQL queries sent with GET. Types and resolvers declare how long their data may be cached with
+``cache_hint``, and a query may be cached for the shortest time any field it selects allows::
+
+    @cache_hint(max_age=300)
+    class BoardNode(DjangoObjectType):
+        @cache_hint(max_age=60)
+        def resolve_upcoming_events(self, info, **kwargs):
+            ...
+
+A field returning an object is cached as long as its resolver's hint, or else its type's hint allows (the node type's
+for connections), and not at all without either, except for the edges and page info of connections, which take the
+time of the nodes. Fields returning scalars only count when their resolver has a hint. A hint without ``max_age``
+leaves the time to the fields around it, e.g. for value types like ``ImageType``. Any ``PRIVATE`` hint keeps the
+response out of shared caches.
+
+Successful GET responses get their ``Cache-Control`` and an ``ETag``, and requests whose ``If-None-Match`` matches
+are answered ``304 Not Modified``.
+"""
+from functools import lru_cache
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers, \
+    set_response_etag
+from graphene.relay import Connection
+from graphene.utils.str_converters import to_camel_case
+from graphql import parse
+from graphql.error import GraphQLSyntaxError
+from graphql.language.ast import FragmentDefinition, FragmentSpread, InlineFragment, OperationDefinition
+from graphql.type.definition import GraphQLInterfaceType, GraphQLObjectType, GraphQLUnionType, get_named_type
+
+PUBLIC = 'PUBLIC'
+PRIVATE = 'PRIVATE'
+
+
+class CacheHint(object):
+    def __init__(self, max_age=None, scope=PUBLIC):
+        self.max_age = max_age
+        self.scope = scope
+
+
+def cache_hint(max_age=None, scope=PUBLIC):
+    """Declares for how many seconds the data of a type, or of a resolver's field, may be cached, and by whom"""
+    def decorator(target):
+        target.cache_hint = CacheHint(max_age, scope)
+        return target
+    return decorator
+
+
+class Policy(object):
+    """The shortest time and the narrowest scope of the hints of a query"""
+
+    def __init__(self):
+        self.max_age = None
+        self.scope = PUBLIC
+
+    def add(self, hint):
+        if hint.max_age is not None:
+            self.max_age = hint.max_age if self.max_age is None else min(self.max_age, hint.max_age)
+        if hint.scope == PRIVATE:
+            self.scope = PRIVATE
+
+
+NO_CACHE = CacheHint(max_age=0)
+
+
+def resolver_hint(graphene_type, field_name):
+    """The hint of the resolver of the GraphQL field ``field_name`` of ``graphene_type``"""
+    for name, field in getattr(getattr(graphene_type, '_meta', None), 'fields', {}).items():
+        if (getattr(field, 'name', None) or to_camel_case(name)) == field_name:
+            return getattr(getattr(graphene_type, f'resolve_{name}', None), 'cache_hint', None)
+    return None
+
+
+def walk(policy, schema, parent, selection_set, fragments, visited):
+    graphene_parent = getattr(parent, 'graphene_type', None)
+    for selection in selection_set.selections:
+        if isinstance(selection, (FragmentSpread, InlineFragment)):
+            if isinstance(selection, FragmentSpread):
+                if selection.name.value in visited:
+                    continue
+                visited = visited | {selection.name.value}
+                fragment = fragments[selection.name.value]
+            else:
+                fragment = selection
+            condition = fragment.type_condition
+            walk(policy, schema, schema.get_type(condition.name.value) if condition else parent,
+                 fragment.selection_set, fragments, visited)
+            continue
+        name = selection.name.value
+        if name == '__typename':
+            continue
+        field = getattr(parent, 'fields', {}).get(name)
+        if field is None:
+            # introspection
+            policy.add(NO_CACHE)
+            continue
+        field_type = get_named_type(field.type)
+        hint = resolver_hint(graphene_parent, name)
+        if isinstance(field_type, (GraphQLObjectType, GraphQLInterfaceType, GraphQLUnionType)):
+            graphene_type = getattr(field_type, 'graphene_type', None)
+            if isinstance(graphene_type, type) and issubclass(graphene_type, Connection):
+                graphene_type = graphene_type._meta.node
+            hint = hint or getattr(graphene_type, 'cache_hint', None)
+            # the edges and page info of connections are as fresh as their nodes
+            if hint is None and not (isinstance(graphene_parent, type) and issubclass(graphene_parent, Connection)):
+                hint = NO_CACHE
+            if hint is not None:
+                policy.add(hint)
+            if selection.selection_set:
+                walk(policy, schema, field_type, selection.selection_set, fragments, visited)
+        elif hint is not None:
+            policy.add(hint)
+
+
+@lru_cache(maxsize=256)
+def cache_policy(schema, query, operation_name=None):
+    """``(max_age, scope)`` of ``query``, ``max_age`` 0 for anything but queries and for invalid documents"""
+    try:
+        document = parse(query)
+    except GraphQLSyntaxError:
+        return 0, PUBLIC
+    operations = [definition for definition in document.definitions if isinstance(definition, OperationDefinition)]
+    if operation_name:
+        operations = [operation for operation in operations
+                      if operation.name and operation.name.value == operation_name]
+    if len(operations) != 1 or operations[0].operation != 'query':
+        return 0, PUBLIC
+    fragments = {definition.name.value: definition for definition in document.definitions
+                 if isinstance(definition, FragmentDefinition)}
+    policy = Policy()
+    walk(policy, schema, schema.get_query_type(), operations[0].selection_set, fragments, frozenset())
+    return policy.max_age or 0, policy.scope
+
+
+class GraphQLCacheControlMixin(object):
+    """``GraphQLView`` mixin adding ``Cache-Control`` and ``ETag`` to the responses of GET queries"""
+    # PRIVATE for views whose data depends on the user
+    cache_scope = PUBLIC
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        if request.method != 'GET' or response.status_code != 200 or \
+                not response.get('Content-Type', '').startswith('application/json') or b'"errors":' in response.content:
+            return response
+        max_age, scope = cache_policy(self.schema, request.GET.get('query', ''), request.GET.get('operationName'))
+        if self.cache_scope == PRIVATE:
+            scope = PRIVATE
+            patch_vary_headers(response, ('Authorization', 'Cookie'))
+        if max_age:
+            patch_cache_control(response, max_age=max_age, **{scope.lower(): True})
+        else:
+            patch_cache_control(response, no_cache=True)
+        set_response_etag(response)
+        return get_conditional_response(request, etag=response['ETag'], response=response)
@@ -0,0 +1,51 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from gymkhana_sac.db import replicas
+
+_executor = None
+_executor_pid = None
+
+
+def executor():
+    """The process wide pool async views run their ORM work on, ``ASYNC_ORM_THREADS`` threads at most"""
+    global _executor, _executor_pid
+    # threads do not survive a fork, a preloaded gunicorn worker builds its own pool
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ThreadPoolExecutor(max_workers=settings.ASYNC_ORM_THREADS, thread_name_prefix='orm')
+        _executor_pid = os.getpid()
+    return _executor
+
+
+def _run(function, args, kwargs, state):
+    # What request_started and request_finished do around sync views: connections that are broken or older
+    # than CONN_MAX_AGE are dropped, the others stay open for the next call on this thread
+    close_old_connections()
+    try:
+        with replicas.bind(state):
+            return function(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_sync(function, *args, **kwargs):
+    """Awaits ``function(*args, **kwargs)`` run on the ORM thread pool"""
+    loop = asyncio.get_event_loop()
+    # executor threads do not see the caller's request state, the replica routing of the request is handed over
+    return await loop.run_in_executor(executor(), functools.partial(_run, function, args, kwargs, replicas.current()))
+
+
+def pooled(view):
+    """
+    Async view running the sync ``view`` on the ORM thread pool. Under ASGI, Django runs every sync view on
+    one shared thread; a pooled view waits on its own thread and leaves the event loop free for slow clients.
+    """
+    async def pooled_view(request, *args, **kwargs):
+        return await run_sync(view, request, *args, **kwargs)
+    # keeps attributes such as csrf_exempt
+    pooled_view.__dict__.update((key, value) for key, value in view.__dict__.items() if not key.startswith('__'))
+    return pooled_view
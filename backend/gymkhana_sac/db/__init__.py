@@ -0,0 +1,4 @@
+"""
+Database backend additions: health checks for persistent connections and an in-process connection pool,
+used by the ``gymkhana_sac.db.postgresql`` engine.
+"""
@@ -0,0 +1,61 @@
+from django.db.utils import OperationalError
+from gymkhana_sac.db.pool import get_pool, ping, PoolTimeout
+
+
+class HealthCheckMixin(object):
+    """
+    ``DatabaseWrapper`` mixin checking a persistent connection (``CONN_MAX_AGE``) once per request, on first use,
+    when ``CONN_HEALTH_CHECKS`` is set, so a connection the server dropped is reopened instead of failing the request.
+    """
+    health_check_due = False
+
+    def close_if_unusable_or_obsolete(self):
+        # called by close_old_connections when a request starts and finishes
+        super().close_if_unusable_or_obsolete()
+        self.health_check_due = bool(self.settings_dict.get('CONN_HEALTH_CHECKS')) and self.connection is not None
+
+    def ensure_connection(self):
+        if self.health_check_due:
+            self.health_check_due = False
+            if self.connection is not None and not self.in_atomic_block and not self.is_usable():
+                self.close()
+        super().ensure_connection()
+
+
+class PoolMixin(object):
+    """
+    ``DatabaseWrapper`` mixin taking connections from a per process pool of ``POOL_SIZE`` connections (waiting up to
+    ``POOL_TIMEOUT`` seconds) and handing them back on close, instead of opening and closing them.
+    """
+    reused_connection = False
+
+    def get_pool(self):
+        size = self.settings_dict.get('POOL_SIZE')
+        if not size:
+            return None
+        return get_pool(self.alias, size, self.settings_dict.get('POOL_TIMEOUT', 10),
+                        self.settings_dict.get('POOL_MAX_IDLE', 300))
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool()
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        check = ping if self.settings_dict.get('CONN_HEALTH_CHECKS') else None
+        try:
+            connection, self.reused_connection = pool.get(lambda: super(PoolMixin, self).get_new_connection(conn_params),
+                                                          check)
+        except PoolTimeout as e:
+            raise OperationalError(str(e)) from e
+        return connection
+
+    def _close(self):
+        pool = self.get_pool()
+        if pool is None or self.connection is None:
+            return super()._close()
+        try:
+            # a no-op unless the request left a transaction open
+            self.connection.rollback()
+        except Exception:
+            pool.discard(self.connection)
+        else:
+            pool.put(self.connection)
@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+from contextlib import closing
+
+_pools = {}
+_lock = threading.Lock()
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool(object):
+    """
+    Thread safe pool of at most ``size`` DB-API connections. ``get`` waits up to ``timeout`` seconds for a free
+    one, reuses the most recently returned idle connection and opens a new one when none is idle. Connections
+    idle for longer than ``max_idle`` seconds are closed rather than reused.
+    """
+
+    def __init__(self, size, timeout=10, max_idle=300):
+        self.size = size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.idle = []
+        self.slots = threading.BoundedSemaphore(size)
+        self.lock = threading.Lock()
+        self.in_use = 0
+        self.opened = 0
+        self.waits = 0
+        self.timeouts = 0
+
+    def get(self, connect, check=None):
+        """A ``(connection, reused)`` pair, ``connect()`` opens new connections and ``check(connection)`` vets idle ones"""
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.waits += 1
+            if not self.slots.acquire(timeout=self.timeout):
+                with self.lock:
+                    self.timeouts += 1
+                raise PoolTimeout(f'No connection free in the pool of {self.size} within {self.timeout}s')
+        try:
+            connection = self.reuse(check)
+            reused = connection is not None
+            if not reused:
+                connection = connect()
+                with self.lock:
+                    self.opened += 1
+        except BaseException:
+            self.slots.release()
+            raise
+        with self.lock:
+            self.in_use += 1
+        return connection, reused
+
+    def reuse(self, check):
+        while True:
+            with self.lock:
+                if not self.idle:
+                    return None
+                connection, returned_at = self.idle.pop()
+            if time.monotonic() - returned_at <= self.max_idle and (check is None or check(connection)):
+                return connection
+            _close(connection)
+
+    def put(self, connection):
+        with self.lock:
+            self.idle.append((connection, time.monotonic()))
+            self.in_use -= 1
+        self.slots.release()
+
+    def discard(self, connection):
+        _close(connection)
+        with self.lock:
+            self.in_use -= 1
+        self.slots.release()
+
+    def stats(self):
+        with self.lock:
+            return {'size': self.size, 'in_use': self.in_use, 'idle': len(self.idle), 'opened': self.opened,
+                    'waits': self.waits, 'timeouts': self.timeouts}
+
+
+def _close(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+def ping(connection):
+    """Whether a DB-API connection still answers"""
+    try:
+        with closing(connection.cursor()) as cursor:
+            cursor.execute('SELECT 1')
+    except Exception:
+        return False
+    return True
+
+
+def get_pool(alias, size, timeout, max_idle):
+    """The pool of a database alias in this process, a forked worker gets its own"""
+    key = (alias, os.getpid())
+    with _lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(size, timeout, max_idle)
+        return _pools[key]
+
+
+def pool_stats():
+    """Statistics of the pools of this process, by database alias"""
+    pid = os.getpid()
+    with _lock:
+        pools = [(alias, pool) for (alias, pool_pid), pool in _pools.items() if pool_pid == pid]
+    return {alias: pool.stats() for alias, pool in pools}
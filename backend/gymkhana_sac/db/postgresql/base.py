@@ -0,0 +1,6 @@
+from django.db.backends.postgresql import base
+from gymkhana_sac.db.mixins import HealthCheckMixin, PoolMixin
+
+
+class DatabaseWrapper(HealthCheckMixin, PoolMixin, base.DatabaseWrapper):
+    """Django's PostgreSQL backend with ``CONN_HEALTH_CHECKS`` and the optional ``POOL_SIZE`` connection pool"""
@@ -0,0 +1,211 @@
+"""
+Read replica routing. Code marked as read only (``replica_reads``, ``ReplicaReadMixin``, GraphQL queries) reads from
+one of the ``REPLICA_DATABASES`` while everything else, and every write, uses ``default``. A client that wrote is
+pinned to ``default`` for ``REPLICA_PIN_SECONDS`` by a cookie, so it reads its own writes, and replicas lagging more
+than ``REPLICA_MAX_LAG`` seconds behind are skipped.
+"""
+import asyncio
+import random
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from asgiref.local import Local
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections, DEFAULT_DB_ALIAS, DatabaseError
+from graphql.backend.base import GraphQLDocument
+
+PIN_COOKIE = 'db_primary_until'
+
+# lag of a replica behind its primary, 0 on a primary or a replica that is up to date
+LAG_SQL = ('SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+           'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END')
+
+_local = Local()
+_checks = {}
+
+
+class RoutingState(object):
+    """Where the reads of the current request go"""
+
+    def __init__(self, pinned=False):
+        # the client wrote within REPLICA_PIN_SECONDS
+        self.pinned = pinned
+        self.read_only = False
+        self.wrote = False
+        self.replica = None
+
+
+def current():
+    return getattr(_local, 'state', None)
+
+
+@contextmanager
+def bind(state):
+    """Makes ``state`` the routing state of this thread (and of the sync code Django runs for it)"""
+    previous = current()
+    _local.state = state
+    try:
+        yield state
+    finally:
+        _local.state = previous
+
+
+@contextmanager
+def replica_reads():
+    """Reads within the block may come from a replica"""
+    state = current()
+    if state is None:
+        with bind(RoutingState()), replica_reads():
+            yield
+        return
+    read_only, state.read_only = state.read_only, True
+    try:
+        yield
+    finally:
+        state.read_only = read_only
+
+
+def replica_view(view):
+    """Decorator for views that only read"""
+    @wraps(view)
+    def wrapped_view(*args, **kwargs):
+        with replica_reads():
+            return view(*args, **kwargs)
+    return wrapped_view
+
+
+class ReplicaReadMixin(object):
+    """Class based view mixin for views that only read"""
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads():
+            return super().dispatch(request, *args, **kwargs)
+
+
+def replica_lag(alias):
+    """Seconds ``alias`` is behind the primary, 0 for backends without streaming replication"""
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(LAG_SQL)
+        return float(cursor.fetchone()[0] or 0)
+
+
+def replica_usable(alias):
+    """Whether ``alias`` answers and keeps up, checked at most every ``REPLICA_LAG_CHECK_INTERVAL`` seconds"""
+    now = time.monotonic()
+    checked = _checks.get(alias)
+    if checked is None or now - checked[0] >= settings.REPLICA_LAG_CHECK_INTERVAL:
+        try:
+            usable = replica_lag(alias) <= settings.REPLICA_MAX_LAG
+        except DatabaseError:
+            connections[alias].close()
+            usable = False
+        checked = _checks[alias] = (now, usable)
+    return checked[1]
+
+
+class ReplicaRouter(object):
+    """Sends the reads of read only code to a usable replica, one per request, and all else to ``default``"""
+
+    def db_for_read(self, model, **hints):
+        state = current()
+        if state is None or not state.read_only or state.pinned or state.wrote or not settings.REPLICA_DATABASES:
+            return DEFAULT_DB_ALIAS
+        # reads in a transaction on the primary see its uncommitted writes there only
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if state.replica is None or not replica_usable(state.replica):
+            usable = [alias for alias in settings.REPLICA_DATABASES if replica_usable(alias)]
+            state.replica = random.choice(usable) if usable else DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = current()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # replicas get their schema from the primary
+        return False if db in settings.REPLICA_DATABASES else None
+
+
+class ReplicaPinMiddleware:
+    """
+    Binds a routing state to every request, and sets a cookie pinning the client to the primary for
+    ``REPLICA_PIN_SECONDS`` after a request that wrote, so the next pages show what it just posted.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # how Django tells an async middleware instance from a sync one
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        state = self.state(request)
+        with bind(state):
+            response = self.get_response(request)
+        return self.pin(state, response)
+
+    async def __acall__(self, request):
+        state = self.state(request)
+        with bind(state):
+            response = await self.get_response(request)
+        return self.pin(state, response)
+
+    @staticmethod
+    def state(request):
+        try:
+            pinned = float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            pinned = False
+        return RoutingState(pinned=pinned)
+
+    @staticmethod
+    def pin(state, response):
+        if state.wrote:
+            seconds = settings.REPLICA_PIN_SECONDS
+            response.set_cookie(PIN_COOKIE, str(int(time.time() + seconds)), max_age=seconds, httponly=True,
+                                samesite='Lax')
+        return response
+
+
+class GraphQLReplicaMixin(object):
+    """``GraphQLView`` mixin running query operations with ``replica_reads``, mutations on the primary"""
+
+    def get_backend(self, request):
+        return ReplicaBackend(super().get_backend(request))
+
+
+class ReplicaBackend(object):
+    def __init__(self, backend):
+        self.backend = backend
+
+    def document_from_string(self, schema, document_string):
+        document = self.backend.document_from_string(schema, document_string)
+
+        def execute(*args, **kwargs):
+            if document.get_operation_type(kwargs.get('operation_name')) != 'query':
+                return document.execute(*args, **kwargs)
+            with replica_reads():
+                return document.execute(*args, **kwargs)
+
+        # a new document, cached backends hand out the same one to every request
+        return GraphQLDocument(document.schema, document.document_string, document.document_ast, execute)
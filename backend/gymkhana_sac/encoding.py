@@ -0,0 +1,80 @@
+"""
+JSON encoding of responses. ``dumps`` encodes with the function named by the ``JSON_ENCODER`` setting, by default
+orjson's when it is installed and the standard library's otherwise. Both encode what ``DjangoJSONEncoder`` does
+(dates, times, decimals, UUIDs and lazy strings) the same way, to compact UTF-8 bytes.
+"""
+import json
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils.module_loading import import_string
+from rest_framework import renderers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_django_encoder = DjangoJSONEncoder()
+
+
+def stdlib_dumps(obj):
+    return json.dumps(obj, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def orjson_dumps(obj):
+    # dates and times are left to DjangoJSONEncoder, which rounds them to milliseconds
+    return orjson.dumps(obj, default=_django_encoder.default,
+                        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+
+
+default_dumps = stdlib_dumps if orjson is None else orjson_dumps
+
+
+@lru_cache(maxsize=None)
+def get_encoder(path):
+    return import_string(path)
+
+
+def dumps(obj):
+    """``obj`` as compact JSON bytes, encoded with the ``JSON_ENCODER``"""
+    return get_encoder(settings.JSON_ENCODER)(obj)
+
+
+def iter_json_list(items):
+    """Encodes the JSON array of ``items`` one item at a time, for ``StreamingHttpResponse``"""
+    yield b'['
+    for index, item in enumerate(items):
+        yield (b',\n' if index else b'\n') + dumps(item)
+    yield b'\n]\n'
+
+
+class JSONResponse(HttpResponse):
+    """``JsonResponse`` encoded with ``dumps``"""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """Django REST framework's ``JSONRenderer`` encoding with ``dumps`` unless indented output is asked for"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class GraphQLEncoderMixin(object):
+    """``GraphQLView`` mixin encoding results with ``dumps`` unless pretty printing is asked for"""
+
+    def json_encode(self, request, d, pretty=False):
+        if self.pretty or pretty or request.GET.get('pretty'):
+            return super().json_encode(request, d, pretty)
+        # batches are joined as str by GraphQLView
+        return dumps(d).decode()
@@ -0,0 +1,120 @@
+import csv
+from itertools import chain
+
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from django.views import View
+from gymkhana_sac.encoding import iter_json_list
+
+EXPORT_FORMATS = ('csv', 'json')
+CHUNK_SIZE = 2000
+# Spreadsheets run cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def escape_cell(value):
+    """Quotes the strings a spreadsheet would run as a formula, the exports carry text users submitted"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class Echo(object):
+    """File-like object for csv.writer that hands every written line back instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+class Export(object):
+    """
+    Describes an export as a list of ``(header, lookup)`` columns. Rows are read with ``values_list`` over a
+    chunked ``iterator()`` (a server side cursor on PostgreSQL) and written to a ``StreamingHttpResponse``,
+    so memory use does not grow with the number of rows.
+    """
+    name = None
+    model = None
+    columns = ()
+    ordering = ('pk',)
+    chunk_size = CHUNK_SIZE
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    @property
+    def headers(self):
+        return [header for header, _ in self.columns]
+
+    @property
+    def permission(self):
+        return f'{self.model._meta.app_label}.view_{self.model._meta.model_name}'
+
+    def rows(self, queryset=None):
+        queryset = self.get_queryset() if queryset is None else queryset
+        return queryset.order_by(*self.ordering).values_list(
+            *[lookup for _, lookup in self.columns]).iterator(chunk_size=self.chunk_size)
+
+    def stream_csv(self, rows):
+        writer = csv.writer(Echo())
+        yield writer.writerow(self.headers)
+        for row in rows:
+            yield writer.writerow([escape_cell(value) for value in row])
+
+    def stream_json(self, rows):
+        headers = self.headers
+        return iter_json_list(dict(zip(headers, row)) for row in rows)
+
+    def response(self, fmt='csv', queryset=None):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f'Unknown export format {fmt}')
+        content_type = 'text/csv' if fmt == 'csv' else 'application/json'
+        stream = getattr(self, f'stream_{fmt}')(self.rows(queryset))
+        response = StreamingHttpResponse(stream, content_type=f'{content_type}; charset=utf-8')
+        filename = f'{self.name}-{timezone.localdate():%Y-%m-%d}.{fmt}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class ChainedExport(Export):
+    """Export streaming the rows of several exports with the same headers one after the other."""
+    exports = ()
+
+    @property
+    def columns(self):
+        return self.exports[0].columns
+
+    @property
+    def permission(self):
+        return [export().permission for export in self.exports]
+
+    def rows(self, queryset=None):
+        return chain.from_iterable(export().rows() for export in self.exports)
+
+
+class ExportView(View):
+    export_class = None
+
+    def get(self, request, fmt='csv'):
+        export = self.export_class()
+        permissions = export.permission if isinstance(export.permission, list) else [export.permission]
+        if not request.user.has_perms(permissions):
+            raise PermissionDenied
+        if fmt not in EXPORT_FORMATS:
+            raise Http404
+        return export.response(fmt)
+
+
+class ExportAdminMixin(object):
+    """Adds CSV and JSON export actions for the selected rows to a ModelAdmin using ``export_class``."""
+    export_class = None
+    actions = ('export_csv', 'export_json')
+
+    @admin.action(description='Export selected rows as CSV', permissions=('view',))
+    def export_csv(self, request, queryset):
+        return self.export_class().response('csv', queryset)
+
+    @admin.action(description='Export selected rows as JSON', permissions=('view',))
+    def export_json(self, request, queryset):
+        return self.export_class().response('json', queryset)
@@ -0,0 +1,62 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+
+_missing = object()
+_lock = threading.Lock()
+_local = threading.local()
+cache_listeners = []
+
+
+def _tag(alias, backend):
+    backend.instrumentation_alias = alias
+    return backend
+
+
+def _patch_cache_class(cache_class):
+    get, get_many = cache_class.get, cache_class.get_many
+
+    def counting_get(self, key, default=None, version=None):
+        value = get(self, key, _missing, version=version)
+        if not getattr(_local, 'in_get_many', False):
+            notify(self, int(value is not _missing), int(value is _missing))
+        return default if value is _missing else value
+
+    def counting_get_many(self, keys, version=None):
+        keys = list(keys)
+        # the base get_many calls get for every key, those are counted here
+        _local.in_get_many = True
+        try:
+            values = get_many(self, keys, version=version)
+        finally:
+            _local.in_get_many = False
+        notify(self, len(values), len(keys) - len(values))
+        return values
+
+    cache_class.get, cache_class.get_many, cache_class._instrumented = counting_get, counting_get_many, True
+
+
+def notify(backend, hits, misses):
+    alias = getattr(backend, 'instrumentation_alias', 'default')
+    for listener in cache_listeners:
+        listener(alias, hits, misses)
+
+
+def add_cache_listener(listener):
+    """
+    Calls ``listener(alias, hits, misses)`` after every ``get``/``get_many`` of the configured caches. Backend
+    classes are wrapped once, and backends are tagged with their alias as ``caches`` creates them per thread.
+    """
+    with _lock:
+        if listener in cache_listeners:
+            return
+        cache_listeners.append(listener)
+        if not getattr(caches, '_instrumented', False):
+            create_connection = caches.create_connection
+            caches.create_connection = lambda alias: _tag(alias, create_connection(alias))
+            caches._instrumented = True
+        for alias in settings.CACHES:
+            backend = _tag(alias, caches[alias])
+            if not getattr(backend.__class__, '_instrumented', False):
+                _patch_cache_class(backend.__class__)
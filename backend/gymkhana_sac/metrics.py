@@ -0,0 +1,406 @@
+import asyncio
+import atexit
+import fcntl
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager, ExitStack
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from gymkhana_sac.cache import tiered_stats
+from gymkhana_sac.db.pool import pool_stats
+from gymkhana_sac.instrumentation import add_cache_listener
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+ARCHIVE = 'archive.json'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Registry(object):
+    """
+    Metrics of this process, written to ``METRICS_DIR/<pid>-<token>.json`` at most every
+    ``METRICS_FLUSH_INTERVAL`` seconds. Collecting sums the files of every process (gunicorn workers included),
+    and folds those of dead processes into ``archive.json`` so counters never go backwards.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        # called before every snapshot, to update metrics read from elsewhere
+        self.collectors = []
+        self.last_flush = 0
+        self.token = uuid.uuid4().hex[:8]
+        self.pid = os.getpid()
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+
+    def reset(self):
+        self.token = uuid.uuid4().hex[:8]
+        self.pid = os.getpid()
+        self.last_flush = 0
+        for metric in self.metrics.values():
+            metric.values = {}
+            metric.lock = threading.Lock()
+
+    def after_fork(self):
+        """Forked processes start from zero, what the parent counted is in the parent's file"""
+        if os.getpid() != self.pid:
+            self.reset()
+
+    def snapshot(self):
+        for collector in self.collectors:
+            collector()
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def flush(self, directory=None):
+        self.after_fork()
+        directory = directory or settings.METRICS_DIR
+        os.makedirs(directory, exist_ok=True)
+        self.dump(self.snapshot(), os.path.join(directory, f'{os.getpid()}-{self.token}.json'))
+        self.last_flush = time.monotonic()
+
+    def flush_if_due(self):
+        if time.monotonic() - self.last_flush >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def collect(self, directory=None):
+        """Values of every metric summed over all processes, as ``{name: {labels: value}}``"""
+        directory = directory or settings.METRICS_DIR
+        self.flush(directory)
+        merged = {}
+        with open(os.path.join(directory, '.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            archive = self.load(os.path.join(directory, ARCHIVE))
+            dead = []
+            for name in os.listdir(directory):
+                if not name.endswith('.json') or name == ARCHIVE:
+                    continue
+                path = os.path.join(directory, name)
+                state = self.load(path)
+                if _alive(int(name.split('-')[0])):
+                    self.merge(merged, state)
+                else:
+                    # gauges describe live processes only
+                    self.merge(archive, {name: values for name, values in state.items()
+                                         if name in self.metrics and self.metrics[name].kind != 'gauge'})
+                    dead.append(path)
+            if dead:
+                self.dump(archive, os.path.join(directory, ARCHIVE))
+                for path in dead:
+                    os.remove(path)
+        self.merge(merged, archive)
+        return merged
+
+    def load(self, path):
+        try:
+            with open(path) as state:
+                dumped = json.load(state)
+        except (FileNotFoundError, ValueError):
+            return {}
+        return {name: {tuple(key): value for key, value in items} for name, items in dumped.items()}
+
+    @staticmethod
+    def dump(values, path):
+        dumped = {name: [[list(key), value] for key, value in items.items()] for name, items in values.items()}
+        with open(f'{path}.tmp', 'w') as state:
+            json.dump(dumped, state)
+        os.replace(f'{path}.tmp', path)
+
+    def merge(self, values, other):
+        for name, items in other.items():
+            metric = self.metrics.get(name)
+            if metric is None:
+                continue
+            target = values.setdefault(name, {})
+            for key, value in items.items():
+                target[key] = metric.add(target.get(key), value)
+
+    def render(self, merged):
+        """The Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples(merged.get(metric.name, {})):
+                formatted = ','.join(f'{label}="{_escape(str(label_value))}"' for label, label_value in labels)
+                lines.append(f'{name}{{{formatted}}} {value:g}' if formatted else f'{name} {value:g}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+class Metric(object):
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.values = {}
+        self.lock = threading.Lock()
+        registry.register(self)
+
+    def key(self, labels):
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def snapshot(self):
+        with self.lock:
+            return {key: list(value) if isinstance(value, list) else value for key, value in self.values.items()}
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def set_total(self, value, **labels):
+        """For totals this process keeps elsewhere, e.g. in the connection pool"""
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    @staticmethod
+    def add(value, other):
+        return (value or 0) + other
+
+    def samples(self, values):
+        for key, value in sorted(values.items()):
+            yield self.name, list(zip(self.labels, key)), value
+
+
+class Gauge(Counter):
+    """A value that goes up and down, summed over the live processes"""
+    kind = 'gauge'
+
+    set = Counter.set_total
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            # counts per bucket, the last one being +Inf, then the sum
+            state = self.values.setdefault(key, [0] * (len(self.buckets) + 1) + [0])
+            state[bisect_left(self.buckets, value)] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    @staticmethod
+    def add(value, other):
+        return list(other) if value is None else [one + two for one, two in zip(value, other)]
+
+    def samples(self, values):
+        for key, state in sorted(values.items()):
+            labels = list(zip(self.labels, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), state):
+                cumulative += count
+                yield f'{self.name}_bucket', labels + [('le', bound if bound == '+Inf' else f'{bound:g}')], cumulative
+            yield f'{self.name}_sum', labels, state[-1]
+            yield f'{self.name}_count', labels, cumulative
+
+
+REQUESTS = Counter('http_requests_total', 'HTTP requests by view, method and status', ('view', 'method', 'status'))
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'HTTP request latency by view', ('view', 'method'))
+DB_QUERIES = Histogram('db_queries_per_request', 'SQL statements run per request', ('view',), COUNT_BUCKETS)
+DB_TIME = Histogram('db_query_seconds_per_request', 'Time spent in SQL per request', ('view',))
+CACHE_REQUESTS = Counter('cache_requests_total', 'Cache lookups by cache alias and result', ('cache', 'result'))
+GRAPHQL_LATENCY = Histogram('graphql_operation_duration_seconds', 'GraphQL operation latency',
+                            ('endpoint', 'operation'))
+GRAPHQL_ERRORS = Counter('graphql_errors_total', 'GraphQL errors by operation and top level field',
+                         ('endpoint', 'operation', 'field'))
+RENDITION_TIME = Histogram('image_rendition_duration_seconds', 'Time generating image renditions', ('kind',))
+HITCOUNT_TIME = Histogram('hitcount_record_duration_seconds', 'Time spent recording topic hits in the request')
+CACHE_TIER_LOOKUPS = Counter('cache_tier_lookups_total', 'Lookups of the tiered caches by the tier that answered, '
+                             'and stampede protection outcomes', ('cache', 'result'))
+DB_CONNECTIONS_OPENED = Counter('db_connections_opened_total', 'Database connections opened (not taken from the pool)',
+                                ('database',))
+DB_POOL_SIZE = Gauge('db_pool_size', 'Maximum connections of the database connection pools', ('database',))
+DB_POOL_CONNECTIONS = Gauge('db_pool_connections', 'Pooled connections by state', ('database', 'state'))
+DB_POOL_WAITS = Counter('db_pool_waits_total', 'Connection checkouts that had to wait for a free connection',
+                        ('database',))
+DB_POOL_TIMEOUTS = Counter('db_pool_timeouts_total', 'Connection checkouts that timed out', ('database',))
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _escape(value):
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _count_cache_calls(alias, hits, misses):
+    if hits:
+        CACHE_REQUESTS.inc(hits, cache=alias, result='hit')
+    if misses:
+        CACHE_REQUESTS.inc(misses, cache=alias, result='miss')
+
+
+def _count_connection(sender, connection, **kwargs):
+    if not getattr(connection, 'reused_connection', False):
+        DB_CONNECTIONS_OPENED.inc(database=connection.alias)
+
+
+def _collect_pools():
+    for alias, stats in pool_stats().items():
+        DB_POOL_SIZE.set(stats['size'], database=alias)
+        DB_POOL_CONNECTIONS.set(stats['in_use'], database=alias, state='in_use')
+        DB_POOL_CONNECTIONS.set(stats['idle'], database=alias, state='idle')
+        DB_POOL_WAITS.set_total(stats['waits'], database=alias)
+        DB_POOL_TIMEOUTS.set_total(stats['timeouts'], database=alias)
+
+
+def _collect_tiered_caches():
+    for name, stats in tiered_stats().items():
+        for statistic, value in stats.items():
+            CACHE_TIER_LOOKUPS.set_total(value, cache=name, result=statistic)
+
+
+registry.collectors.extend((_collect_pools, _collect_tiered_caches))
+
+
+def _timed(function, histogram, **labels):
+    @wraps(function)
+    def timed(*args, **kwargs):
+        with histogram.time(**labels):
+            return function(*args, **kwargs)
+    return timed
+
+
+def _flush_at_exit():
+    if settings.METRICS_ENABLED:
+        registry.flush()
+
+
+_instrumented = False
+
+
+def instrument():
+    """Hooks the caches, connections, image renditions and hit counting into the metrics, once per process"""
+    global _instrumented
+    if _instrumented:
+        return
+    from hitcount.views import HitCountMixin
+    from versatileimagefield.datastructures.filteredimage import FilteredImage
+    from versatileimagefield.datastructures.sizedimage import SizedImage
+    add_cache_listener(_count_cache_calls)
+    connection_created.connect(_count_connection)
+    SizedImage.create_resized_image = _timed(SizedImage.create_resized_image, RENDITION_TIME, kind='sized')
+    FilteredImage.create_filtered_image = _timed(FilteredImage.create_filtered_image, RENDITION_TIME,
+                                                 kind='filtered')
+    HitCountMixin.hit_count = classmethod(_timed(HitCountMixin.hit_count.__func__, HITCOUNT_TIME))
+    atexit.register(_flush_at_exit)
+    _instrumented = True
+
+
+def view_label(request):
+    """The url name (or view path for unnamed patterns), which keeps label cardinality bounded"""
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else '<unresolved>'
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status and SQL statements of every request, see ``/metrics``. Under ASGI the SQL of async
+    views runs on other threads (gymkhana_sac/concurrency.py) and is not recorded per request.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # how Django tells an async middleware instance from a sync one
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        instrument()
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        registry.after_fork()
+        statements = [0, 0.0]
+
+        def execute(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                statements[0] += 1
+                statements[1] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(execute))
+            response = self.get_response(request)
+        view = self.record(request, response, started)
+        DB_QUERIES.observe(statements[0], view=view)
+        DB_TIME.observe(statements[1], view=view)
+        registry.flush_if_due()
+        return response
+
+    async def __acall__(self, request):
+        registry.after_fork()
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.record(request, response, started)
+        registry.flush_if_due()
+        return response
+
+    @staticmethod
+    def record(request, response, started):
+        view = view_label(request)
+        method = request.method if request.method in METHODS else 'other'
+        REQUEST_LATENCY.observe(time.perf_counter() - started, view=view, method=method)
+        REQUESTS.inc(view=view, method=method, status=response.status_code)
+        return view
+
+
+class GraphQLMetricsMixin(object):
+    """``GraphQLView`` mixin recording operation latency and errors by top level field"""
+
+    def execute_graphql_request(self, request, data, query, variables, operation_name, show_graphiql=False):
+        started = time.perf_counter()
+        result = super().execute_graphql_request(request, data, query, variables, operation_name, show_graphiql)
+        if settings.METRICS_ENABLED and result is not None:
+            labels = {'endpoint': request.path, 'operation': (operation_name or 'anonymous')[:100]}
+            GRAPHQL_LATENCY.observe(time.perf_counter() - started, **labels)
+            for error in result.errors or ():
+                path = getattr(error, 'path', None)
+                GRAPHQL_ERRORS.inc(field=path[0] if path else '<document>', **labels)
+        return result
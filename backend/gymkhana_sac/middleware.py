@@ -0,0 +1,132 @@
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model, load_backend
+from django.contrib.auth import middleware
+from django.contrib.auth.models import AnonymousUser
+from django.middleware.gzip import re_accepts_gzip
+from django.utils.cache import patch_vary_headers
+from django.utils.crypto import constant_time_compare
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+from django.utils.regex_helper import _lazy_re_compile
+from django.utils.text import compress_sequence, compress_string
+from htmlmin import middleware as htmlmin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+re_accepts_brotli = _lazy_re_compile(r'\bbr\b')
+# brotli's default of 11 is meant for static files, 5 compresses about as fast as gzip's 6 and smaller
+BROTLI_QUALITY = 5
+
+
+def get_user(request):
+    """
+    ``django.contrib.auth.get_user`` fetching the user with its ``userprofile`` in one query. Every configured
+    backend (model, social and JWT) loads session users by primary key alone, so the query is the same for all.
+    """
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = _get_session_user(request) or AnonymousUser()
+    return request._cached_user
+
+
+def _get_session_user(request):
+    user_model = get_user_model()
+    try:
+        user_id = user_model._meta.pk.to_python(request.session[SESSION_KEY])
+        backend_path = request.session[BACKEND_SESSION_KEY]
+    except KeyError:
+        return None
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return None
+    try:
+        user = user_model._default_manager.select_related('userprofile').get(pk=user_id)
+    except user_model.DoesNotExist:
+        return None
+    can_authenticate = getattr(load_backend(backend_path), 'user_can_authenticate', None)
+    if can_authenticate is not None and not can_authenticate(user):
+        return None
+    # sessions end when the password changes, hashes of sessions from before Django 3.1 are still accepted
+    session_hash = request.session.get(HASH_SESSION_KEY)
+    if not session_hash or not (constant_time_compare(session_hash, user.get_session_auth_hash()) or
+                                constant_time_compare(session_hash, user._legacy_get_session_auth_hash())):
+        request.session.flush()
+        return None
+    return user
+
+
+class AuthenticationMiddleware(middleware.AuthenticationMiddleware):
+    """``django.contrib.auth``'s middleware with the user loaded by ``get_user``"""
+
+    def process_request(self, request):
+        assert hasattr(request, 'session'), (
+            "The authentication middleware requires session middleware to be installed. Edit your MIDDLEWARE "
+            "setting to insert 'django.contrib.sessions.middleware.SessionMiddleware' before "
+            "'gymkhana_sac.middleware.AuthenticationMiddleware'."
+        )
+        request.user = SimpleLazyObject(lambda: get_user(request))
+
+
+def compress_brotli(content):
+    return brotli.compress(content, mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY)
+
+
+def compress_brotli_sequence(sequence):
+    compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY)
+    for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    ``django.middleware.gzip.GZipMiddleware`` preferring brotli, when it is installed and accepted, and leaving
+    responses under ``COMPRESSION_MIN_SIZE`` bytes and event streams alone.
+    """
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        if response.has_header('Content-Encoding') or response.get('Content-Type', '').startswith('text/event-stream'):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is not None and re_accepts_brotli.search(accept_encoding):
+            encoding, compress, compress_stream = 'br', compress_brotli, compress_brotli_sequence
+        elif re_accepts_gzip.search(accept_encoding):
+            encoding, compress, compress_stream = 'gzip', compress_string, compress_sequence
+        else:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(response.streaming_content)
+            del response['Content-Length']
+        else:
+            compressed = compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # compressed responses only match their ETag weakly
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+
+# django-htmlmin's middleware is sync only, which makes Django run everything below it, async views included, on
+# the one thread it keeps for sync code. The same hooks on MiddlewareMixin work in both modes.
+
+class MarkRequestMiddleware(MiddlewareMixin):
+    process_request = htmlmin.MarkRequestMiddleware.process_request
+
+
+class HtmlMinifyMiddleware(MiddlewareMixin):
+    can_minify_response = htmlmin.HtmlMinifyMiddleware.can_minify_response
+    process_response = htmlmin.HtmlMinifyMiddleware.process_response
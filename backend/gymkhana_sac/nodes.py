@@ -0,0 +1,75 @@
+"""
+``nodes(ids: [...])``: ``node(id:)`` for many global ids at once. The ids are grouped by type and every group is
+fetched with one ``IN`` query on the type's ``get_queryset``, so its filtering and query optimization apply as they
+do to ``node``. Nodes come back in the order of the ids, ``null`` for the ids that do not resolve.
+"""
+import graphene
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from graphene import relay
+from graphene_django import DjangoObjectType
+from graphql import GraphQLError
+
+# at most as many ids as the nodes of a connection page
+MAX_IDS = settings.GRAPHENE.get('RELAY_CONNECTION_MAX_LIMIT', 100)
+
+
+def node_type(info, type_name):
+    """The graphene type named ``type_name`` if it implements ``Node``"""
+    graphql_type = info.schema.get_type(type_name)
+    graphene_type = getattr(graphql_type, 'graphene_type', None)
+    if graphene_type is None or relay.Node not in getattr(graphene_type._meta, 'interfaces', ()):
+        return None
+    return graphene_type
+
+
+def get_nodes(info, ids):
+    # positions of the ids, by primary key, by type
+    groups = {}
+    for position, global_id in enumerate(ids):
+        try:
+            type_name, pk = relay.Node.from_global_id(global_id)
+        except Exception:
+            continue
+        graphene_type = node_type(info, type_name)
+        if graphene_type is not None:
+            groups.setdefault(graphene_type, {}).setdefault(pk, []).append(position)
+
+    nodes = [None] * len(ids)
+    for graphene_type, positions in groups.items():
+        if not issubclass(graphene_type, DjangoObjectType):
+            for pk, pk_positions in positions.items():
+                for position in pk_positions:
+                    nodes[position] = graphene_type.get_node(info, pk)
+            continue
+        model = graphene_type._meta.model
+        by_pk = {}
+        for pk, pk_positions in positions.items():
+            try:
+                by_pk.setdefault(model._meta.pk.to_python(pk), []).extend(pk_positions)
+            except ValidationError:
+                pass
+        if not by_pk:
+            continue
+        queryset = graphene_type.get_queryset(model._default_manager, info)
+        for obj in queryset.filter(pk__in=list(by_pk)):
+            for position in by_pk[obj.pk]:
+                nodes[position] = obj
+    return nodes
+
+
+def resolve_nodes(root, info, ids):
+    if len(ids) > MAX_IDS:
+        raise GraphQLError(f'Requesting {len(ids)} nodes exceeds the limit of {MAX_IDS}.')
+    return get_nodes(info, ids)
+
+
+class NodesField(graphene.Field):
+    def __init__(self, **kwargs):
+        super().__init__(
+            graphene.List(relay.Node),
+            ids=graphene.List(graphene.NonNull(graphene.ID), required=True, description='Global ids of the nodes'),
+            resolver=resolve_nodes,
+            description='The nodes of the ids, in their order, null where there is none',
+            **kwargs
+        )
@@ -0,0 +1,256 @@
+"""
+GraphQL query optimizer: computes ``only()``, ``select_related()`` and ``prefetch_related()`` for the querysets of
+``DjangoObjectType`` nodes from the fields a query selects.
+
+Model fields selected by the query are loaded, and nothing else. To-one relations are joined, and to-many relations
+resolved by a plain ``DjangoConnectionField`` are prefetched with their own optimized queryset. Fields with custom
+resolvers declare what they read with ``hints``; when a selected field has a resolver without hints, the fields of
+its model are loaded in full, as there is no telling what the resolver touches::
+
+    class SocietyNode(QueryOptimizerMixin, DjangoObjectType):
+        @hints(only=('cover',))
+        def resolve_cover(self, info):
+            ...
+"""
+from django.db.models import Manager, Prefetch, QuerySet
+from graphene import Dynamic, List, NonNull
+from graphene.utils.str_converters import to_camel_case
+from graphene_django import DjangoConnectionField, DjangoObjectType
+from graphene_django.filter import DjangoFilterConnectionField
+from graphql.language.ast import FragmentSpread, InlineFragment
+
+# fields every node can resolve from the primary key alone
+PK_FIELDS = {'id', 'pk', '__typename'}
+
+
+class Hints(object):
+    def __init__(self, only=(), select_related=(), prefetch_related=()):
+        self.only = only
+        self.select_related = select_related
+        self.prefetch_related = prefetch_related
+
+
+def hints(only=(), select_related=(), prefetch_related=()):
+    """
+    Declares what a resolver reads: model fields for ``only()``, relations to join and lookups (or ``Prefetch``
+    objects) to prefetch. A resolver that needs nothing but the primary key is decorated with ``@hints()``.
+    """
+    def decorator(resolver):
+        resolver.optimizer_hints = Hints(only, select_related, prefetch_related)
+        return resolver
+    return decorator
+
+
+def prefetched(instance, lookup):
+    """Whether the ``lookup`` relation of ``instance`` was prefetched"""
+    return lookup in getattr(instance, '_prefetched_objects_cache', {})
+
+
+def count(instance, lookup):
+    """Number of objects in the ``lookup`` relation, counted from prefetched objects when there are"""
+    related = getattr(instance, lookup)
+    return len(related.all()) if prefetched(instance, lookup) else related.count()
+
+
+class Plan(object):
+    """The ``select_related`` and ``prefetch_related`` lookups of a queryset, gathered while walking a query"""
+
+    def __init__(self, info):
+        self.info = info
+        self.select_related = set()
+        self.prefetches = {}
+
+    def prefetch(self, lookup, queryset=None):
+        # a lookup prefetched with a queryset serves the hints wanting the same lookup prefetched
+        if queryset is not None or lookup not in self.prefetches:
+            self.prefetches[lookup] = Prefetch(lookup, queryset)
+
+    def add_hints(self, hint, prefix):
+        self.select_related.update(prefix + lookup for lookup in hint.select_related)
+        for lookup in hint.prefetch_related:
+            if isinstance(lookup, Prefetch):
+                self.prefetch(prefix + lookup.prefetch_through, lookup.queryset)
+            else:
+                self.prefetch(prefix + lookup)
+
+    def apply(self, queryset, only):
+        if self.select_related:
+            queryset = queryset.select_related(*sorted(self.select_related))
+        if self.prefetches:
+            queryset = queryset.prefetch_related(*self.prefetches.values())
+        if only is not None:
+            # querysets of related managers set the parent on their objects, reading the foreign key to it
+            only = set(only).union(field.name for field in queryset._known_related_objects)
+            queryset = queryset.only(*sorted(only))
+        return queryset
+
+    def walk(self, node, selections, prefix=''):
+        """
+        Adds the relations ``selections`` of ``node`` need, and returns the fields (prefixed with the path from the
+        queryset's model) to load, ``None`` when they cannot be told
+        """
+        model = node._meta.model
+        relations = model_fields(model)
+        graphql_names = field_names(node)
+        only = set()
+        complete = True
+        for graphql_name, asts in selections.items():
+            name = graphql_names.get(graphql_name, graphql_name)
+            if name in PK_FIELDS:
+                continue
+            resolver = getattr(node, f'resolve_{name}', None)
+            hint = getattr(resolver, 'optimizer_hints', None)
+            if hint is not None:
+                self.add_hints(hint, prefix)
+                only.update(prefix + field for field in hint.only)
+                continue
+            model_field = relations.get(name)
+            if resolver is not None or model_field is None:
+                complete = False
+                continue
+            path = prefix + name
+            if not model_field.is_relation:
+                only.add(path)
+            elif model_field.many_to_one or model_field.one_to_one:
+                self.select_related.add(path)
+                if model_field.concrete:
+                    only.add(path)
+                related = related_node(node, name)
+                nested = None
+                if related is not None:
+                    nested = self.walk(related, collect(self.info, asts, related), f'{path}__')
+                # the related model is loaded in full unless all of its selected fields are known
+                if nested is not None:
+                    only.update(nested)
+                    if not model_field.concrete:
+                        only.add(path)
+            else:
+                self.prefetch_many(node, name, model_field, asts, path)
+        return only if complete else None
+
+    def prefetch_many(self, node, name, model_field, asts, path):
+        field = graphene_field(node, name)
+        # filter connections filter the related manager anew, prefetched objects would go unused
+        if not isinstance(field, DjangoConnectionField) or isinstance(field, DjangoFilterConnectionField):
+            return
+        related = field.node_type
+        plan = Plan(self.info)
+        only = plan.walk(related, collect(self.info, asts, related, connection=True))
+        if only is not None and model_field.one_to_many:
+            # the foreign key the prefetched objects are matched to their parents with
+            only.add(model_field.field.name)
+        self.prefetch(path, plan.apply(related._meta.model._default_manager.all(), only))
+
+
+def model_fields(model):
+    """Fields and relations of ``model`` by the name their graphene fields have, the accessor of reverse relations"""
+    fields = {}
+    for field in model._meta.get_fields():
+        fields[field.get_accessor_name() if field.auto_created and not field.concrete else field.name] = field
+    return fields
+
+
+def field_names(node):
+    """Field names of ``node`` by their GraphQL names"""
+    names = {}
+    for name, field in node._meta.fields.items():
+        names[getattr(field, 'name', None) or to_camel_case(name)] = name
+    return names
+
+
+def graphene_field(node, name):
+    field = node._meta.fields.get(name)
+    if isinstance(field, Dynamic):
+        field = field.get_type()
+    return field
+
+
+def related_node(node, name):
+    field = graphene_field(node, name)
+    field_type = getattr(field, 'type', None)
+    while isinstance(field_type, (NonNull, List)):
+        field_type = field_type.of_type
+    if isinstance(field_type, type) and issubclass(field_type, DjangoObjectType):
+        return field_type
+    return None
+
+
+def included(info, selection):
+    """Whether ``@skip`` and ``@include`` keep ``selection``"""
+    for directive in selection.directives or ():
+        if directive.name.value not in ('skip', 'include'):
+            continue
+        condition = next((argument.value for argument in directive.arguments if argument.name.value == 'if'), None)
+        if condition is None:
+            continue
+        if hasattr(condition, 'name'):
+            value = bool((info.variable_values or {}).get(condition.name.value))
+        else:
+            value = condition.value in (True, 'true')
+        if value == (directive.name.value == 'skip'):
+            return False
+    return True
+
+
+def type_names(node):
+    names = {node._meta.name}
+    names.update(interface._meta.name for interface in node._meta.interfaces)
+    return names
+
+
+def selected(info, selection_set, types=None, fields=None):
+    """The fields of ``selection_set`` by GraphQL name, following fragments on ``types`` (any type when ``None``)"""
+    fields = {} if fields is None else fields
+    for selection in (selection_set.selections if selection_set else ()):
+        if not included(info, selection):
+            continue
+        if isinstance(selection, (FragmentSpread, InlineFragment)):
+            fragment = info.fragments[selection.name.value] if isinstance(selection, FragmentSpread) else selection
+            condition = fragment.type_condition
+            if types is None or condition is None or condition.name.value in types:
+                selected(info, fragment.selection_set, types, fields)
+        else:
+            fields.setdefault(selection.name.value, []).append(selection)
+    return fields
+
+
+def collect(info, asts, node, connection=False):
+    """The fields selected on ``node`` by ``asts``, the ``edges { node }`` of a connection when ``connection``"""
+    if connection:
+        edges = selected(info, None)
+        for ast in asts:
+            selected(info, ast.selection_set, fields=edges)
+        nodes = selected(info, None)
+        for edge in edges.get('edges', ()):
+            selected(info, edge.selection_set, fields=nodes)
+        asts = nodes.get('node', ())
+    fields = {}
+    for ast in asts:
+        selected(info, ast.selection_set, type_names(node), fields)
+    return fields
+
+
+def is_connection(graphql_type):
+    while hasattr(graphql_type, 'of_type'):
+        graphql_type = graphql_type.of_type
+    return 'edges' in getattr(graphql_type, 'fields', {})
+
+
+def optimize(queryset, info, node):
+    """``queryset`` of ``node`` objects loading what the field resolved with ``info`` selects"""
+    if isinstance(queryset, Manager):
+        queryset = queryset.all()
+    # lists, and querysets of prefetched objects, are left as they are
+    if not isinstance(queryset, QuerySet) or queryset._result_cache is not None or info is None:
+        return queryset
+    plan = Plan(info)
+    only = plan.walk(node, collect(info, info.field_asts, node, connection=is_connection(info.return_type)))
+    return plan.apply(queryset, only)
+
+
+class QueryOptimizerMixin(object):
+    """``DjangoObjectType`` mixin optimizing the querysets of its connections and of ``node`` lookups"""
+
+    @classmethod
+    def get_queryset(cls, queryset, info):
+        return optimize(super().get_queryset(queryset, info), info, cls)
@@ -0,0 +1,105 @@
+"""
+Connections that do not count: graphene-django runs ``COUNT(*)`` on every connection to build ``pageInfo``, these
+fetch ``first + 1`` rows instead, the extra row telling whether there is a next page. The total is only counted when
+``totalCount`` is selected, and for unfiltered tables bigger than ``GRAPHQL_ESTIMATED_COUNT_MIN`` rows on PostgreSQL,
+it is the planner's estimate rather than an exact count.
+
+Nodes get ``totalCount`` on their connections with ``connection_class = CountableConnection`` in their ``Meta``.
+"""
+import graphene
+from django.conf import settings
+from django.db import connections
+from django.db.models import QuerySet
+from graphene import Connection, PageInfo
+from graphene_django import DjangoConnectionField
+from graphene_django.filter import DjangoFilterConnectionField
+from graphene_django.utils import maybe_queryset
+from graphql_relay.connection.arrayconnection import connection_from_list_slice, get_offset_with_default, \
+    offset_to_cursor, cursor_to_offset
+
+ESTIMATE_SQL = 'SELECT reltuples FROM pg_class WHERE oid = %s::regclass'
+
+
+def estimated_count(queryset):
+    """The planner's estimate of the rows of an unfiltered PostgreSQL queryset, ``None`` when there is none"""
+    query = queryset.query
+    if connections[queryset.db].vendor != 'postgresql' or query.where or query.distinct or query.combinator \
+            or query.low_mark or query.high_mark is not None:
+        return None
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(ESTIMATE_SQL, [queryset.model._meta.db_table])
+        row = cursor.fetchone()
+    # tables never analyzed have no estimate, -1 since PostgreSQL 14
+    return int(row[0]) if row and row[0] > 0 else None
+
+
+def total_count(iterable):
+    if not isinstance(iterable, QuerySet):
+        return len(iterable)
+    minimum = settings.GRAPHQL_ESTIMATED_COUNT_MIN
+    if minimum:
+        estimate = estimated_count(iterable)
+        if estimate is not None and estimate >= minimum:
+            return estimate
+    return iterable.count()
+
+
+class CountableConnection(Connection):
+    """Connection with a ``totalCount``, counted when selected"""
+    total_count = graphene.Int()
+
+    class Meta:
+        abstract = True
+
+    def resolve_total_count(self, info, **kwargs):
+        if self.length is None:
+            self.length = total_count(self.iterable)
+        return self.length
+
+
+class CountFreeMixin(object):
+    """Connection field mixin paginating forward with ``first + 1`` rows instead of counting them"""
+
+    @classmethod
+    def resolve_connection(cls, connection, args, iterable, max_limit=None):
+        iterable = maybe_queryset(iterable)
+        # paginating backwards needs the length, and prefetched rows are counted for free
+        if not isinstance(iterable, QuerySet) or iterable._result_cache is not None or args.get('last') is not None \
+                or args.get('before') is not None:
+            return super().resolve_connection(connection, args, iterable, max_limit=max_limit)
+
+        offset = args.pop('offset', None)
+        if offset:
+            after = args.get('after')
+            if after:
+                offset += cursor_to_offset(after) + 1
+            args['after'] = offset_to_cursor(offset - 1)
+        if max_limit is not None and args.get('first') is None:
+            args['first'] = max_limit
+        first = args.get('first')
+        start = get_offset_with_default(args.get('after'), -1) + 1
+        rows = list(iterable[start:] if first is None else iterable[start:start + first + 1])
+
+        connection = connection_from_list_slice(
+            rows,
+            args,
+            slice_start=start,
+            list_length=start + len(rows),
+            list_slice_length=len(rows),
+            connection_type=connection,
+            edge_type=connection.Edge,
+            pageinfo_type=PageInfo,
+        )
+        connection.iterable = iterable
+        # the rows end the table, unless there are none past a cursor which may point beyond its end
+        exact = (rows or not start) and (first is None or len(rows) <= first)
+        connection.length = start + len(rows) if exact else None
+        return connection
+
+
+class CountFreeConnectionField(CountFreeMixin, DjangoConnectionField):
+    pass
+
+
+class CountFreeFilterConnectionField(CountFreeMixin, DjangoFilterConnectionField):
+    pass
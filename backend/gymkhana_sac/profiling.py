@@ -0,0 +1,214 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+from gymkhana_sac.instrumentation import add_cache_listener
+
+MAX_STATEMENTS = 1000
+MAX_STACKS = 200
+STACK_DEPTH = 60
+PSTATS_LINES = 60
+PROFILE_ID = re.compile(r'[0-9]+-[0-9a-f]+')
+_local = threading.local()
+
+
+class RequestProfile(object):
+    """Everything recorded about one request, written as JSON (and a .prof file when cProfile ran)."""
+
+    def __init__(self, request, sampled):
+        self.id = f'{int(time.time() * 1000000)}-{uuid.uuid4().hex[:8]}'
+        self.method = request.method
+        self.path = request.get_full_path()
+        self.sampled = sampled
+        self.started = timezone.now()
+        self.statements = []
+        self.statement_count = 0
+        self.sql_ms = 0.0
+        self.template_started = None
+        self.template_ms = 0.0
+        self.cache = Counter()
+        self.stacks = Counter()
+        self.profiler = cProfile.Profile() if sampled else None
+
+    def execute(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` timing every statement."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            self.statement_count += 1
+            self.sql_ms += duration
+            if len(self.statements) < MAX_STATEMENTS:
+                self.statements.append({'sql': sql, 'ms': round(duration, 3), 'many': many})
+
+    def template_rendered(self, response):
+        if self.template_started is not None:
+            self.template_ms += (time.perf_counter() - self.template_started) * 1000
+        return response
+
+    def as_dict(self, response, duration):
+        data = {
+            'id': self.id,
+            'method': self.method,
+            'path': self.path,
+            'status': response.status_code,
+            'started': self.started.isoformat(),
+            'duration_ms': round(duration, 3),
+            'reason': 'sampled' if self.sampled else 'slow',
+            'sql_count': self.statement_count,
+            'sql_ms': round(self.sql_ms, 3),
+            'template_ms': round(self.template_ms, 3),
+            'cache_hits': self.cache['hits'],
+            'cache_misses': self.cache['misses'],
+            'statements': self.statements,
+            # folded stacks, the input format of flamegraph tools
+            'stacks': [f'{stack} {count}' for stack, count in self.stacks.most_common(MAX_STACKS)],
+            'profile': None,
+        }
+        if self.profiler is not None:
+            output = io.StringIO()
+            pstats.Stats(self.profiler, stream=output).sort_stats('cumulative').print_stats(PSTATS_LINES)
+            data['profile'] = output.getvalue()
+        return data
+
+
+class StackSampler(threading.Thread):
+    """
+    Daemon thread that periodically records the stack of every thread serving a profiled request. Sampling
+    from outside costs the request nothing, so every request can be sampled and kept if it turns out slow.
+    """
+
+    def __init__(self, interval):
+        super().__init__(name='request-stack-sampler', daemon=True)
+        self.interval = interval
+        self.active = {}
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            if not self.active:
+                continue
+            frames = sys._current_frames()
+            for thread_id, profile in list(self.active.items()):
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None and len(stack) < STACK_DEPTH:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                    frame = frame.f_back
+                if stack:
+                    profile.stacks[';'.join(reversed(stack))] += 1
+
+
+def _count_cache_calls(alias, hits, misses):
+    profile = getattr(_local, 'profile', None)
+    if profile is not None:
+        profile.cache['hits'] += hits
+        profile.cache['misses'] += misses
+
+
+def write_profile(data, profiler=None, directory=None, keep=None):
+    """Writes the artifacts atomically, then drops the oldest ones beyond ``keep``: a ring buffer on disk."""
+    directory = directory or settings.PROFILER_DIR
+    keep = keep or settings.PROFILER_MAX_PROFILES
+    os.makedirs(directory, exist_ok=True)
+    if profiler is not None:
+        profiler.dump_stats(os.path.join(directory, f'{data["id"]}.prof'))
+    temporary = os.path.join(directory, f'.{data["id"]}.json')
+    with open(temporary, 'w') as artifact:
+        json.dump(data, artifact)
+    os.replace(temporary, os.path.join(directory, f'{data["id"]}.json'))
+    for name in list_profiles(directory)[keep:]:
+        for extension in ('json', 'prof'):
+            try:
+                os.remove(os.path.join(directory, f'{name}.{extension}'))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(directory=None):
+    """Profile ids, newest first. Ids start with a microsecond timestamp so they sort by time."""
+    directory = directory or settings.PROFILER_DIR
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return sorted((name[:-5] for name in names if name.endswith('.json') and not name.startswith('.')),
+                  reverse=True)
+
+
+def read_profile(profile_id, directory=None):
+    """The profile as written by ``write_profile``, None when it does not exist (or was rotated out)"""
+    directory = directory or settings.PROFILER_DIR
+    if not PROFILE_ID.fullmatch(profile_id):
+        return None
+    try:
+        with open(os.path.join(directory, f'{profile_id}.json')) as artifact:
+            return json.load(artifact)
+    except FileNotFoundError:
+        return None
+
+
+class RequestProfilerMiddleware:
+    """
+    Keeps a profile of a ``PROFILER_SAMPLE_RATE`` fraction of requests (with cProfile) and of every request
+    slower than ``PROFILER_SLOW_REQUEST_MS`` (with stack samples): SQL statements with timings, template
+    render time and cache hits and misses. Profiles are browsable by superusers at /profiler/. It is sync only,
+    under ASGI enabling it moves every request onto Django's sync thread.
+    """
+    sampler = None
+
+    def __init__(self, get_response):
+        if not settings.PROFILER_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILER_SAMPLE_RATE
+        self.slow_ms = settings.PROFILER_SLOW_REQUEST_MS
+        if RequestProfilerMiddleware.sampler is None:
+            RequestProfilerMiddleware.sampler = StackSampler(settings.PROFILER_STACK_INTERVAL_MS / 1000)
+            RequestProfilerMiddleware.sampler.start()
+        add_cache_listener(_count_cache_calls)
+
+    def __call__(self, request):
+        profile = RequestProfile(request, sampled=random.random() < self.sample_rate)
+        thread_id = threading.get_ident()
+        _local.profile = profile
+        self.sampler.active[thread_id] = profile
+        started = time.perf_counter()
+        try:
+            with connections['default'].execute_wrapper(profile.execute):
+                if profile.profiler is not None:
+                    profile.profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    if profile.profiler is not None:
+                        profile.profiler.disable()
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            self.sampler.active.pop(thread_id, None)
+            _local.profile = None
+        if profile.sampled or duration >= self.slow_ms:
+            write_profile(profile.as_dict(response, duration), profile.profiler)
+        return response
+
+    def process_template_response(self, request, response):
+        profile = getattr(_local, 'profile', None)
+        if profile is not None:
+            profile.template_started = time.perf_counter()
+            response.add_post_render_callback(profile.template_rendered)
+        return response
@@ -0,0 +1,158 @@
+"""
+Publish/subscribe of events between the processes serving the site, for live updates. Every channel numbers its
+events from 1 and keeps the last ``PUBSUB_RETENTION`` of them. Subscribers read the events after the last one they
+saw, waiting for one when there is none::
+
+    get_broker().publish('forum', {'type': 'answer', ...})
+    last_id, events = await get_broker().wait('forum', after=41, timeout=25)   # 42, [(42, {...})]
+
+The broker is the ``PUBSUB_BACKEND`` class:
+
+- ``LocalBroker`` keeps the channels in the process, for deployments with one worker.
+- ``CacheBroker`` keeps them in the ``PUBSUB_CACHE`` cache, standing in for a message broker: when the cache is shared
+  (file based, memcached), so are the events. Waiting subscribers see the events of their own process at once and
+  those of the others within ``PUBSUB_POLL_INTERVAL`` seconds. Ids are allocated with the cache's ``incr``, which
+  the file based cache does not make atomic: processes publishing at the same moment may overwrite one another's
+  event, hence events carrying state (counts) rather than increments.
+"""
+import asyncio
+import threading
+from collections import deque
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+# events of the cache broker outlive their retention by far, the counters of the channels do not expire
+EVENT_TIMEOUT = 3600
+
+
+class Broker(object):
+    # whether read() does I/O, and runs off the event loop
+    blocking = False
+
+    def __init__(self, retention=100, poll_interval=1):
+        self.retention = retention
+        self.poll_interval = poll_interval
+        # (loop, asyncio.Event) of the subscribers waiting in this process
+        self.waiters = set()
+        self.lock = threading.Lock()
+
+    def store(self, channel, event):
+        """Appends ``event`` to ``channel``, returning its id"""
+        raise NotImplementedError
+
+    def read(self, channel, after):
+        """``(last_id, events)`` of ``channel``, ``events`` the retained ``(id, event)`` after the id ``after``"""
+        raise NotImplementedError
+
+    def publish(self, channel, event):
+        event_id = self.store(channel, event)
+        with self.lock:
+            waiters = list(self.waiters)
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(waiter.set)
+            except RuntimeError:
+                # the loop closed
+                pass
+        return event_id
+
+    async def wait(self, channel, after=None, timeout=0):
+        """
+        ``read(channel, after)``, waiting up to ``timeout`` seconds for events, or for one after the current last
+        when ``after`` is ``None``. Returns at once when ``after`` is ahead of the channel, which was reset.
+        """
+        loop = asyncio.get_event_loop()
+        waiter = asyncio.Event()
+        entry = (loop, waiter)
+        with self.lock:
+            self.waiters.add(entry)
+        try:
+            deadline = loop.time() + timeout
+            while True:
+                # cleared before reading, a publish after the read is not missed
+                waiter.clear()
+                if self.blocking:
+                    last_id, events = await loop.run_in_executor(None, self.read, channel, after or 0)
+                else:
+                    last_id, events = self.read(channel, after or 0)
+                if after is None:
+                    after, events = last_id, []
+                if events or after > last_id:
+                    return last_id, events
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return last_id, []
+                try:
+                    await asyncio.wait_for(waiter.wait(), min(remaining, self.poll_interval))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self.lock:
+                self.waiters.discard(entry)
+
+
+class LocalBroker(Broker):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # channel: [last id, deque of (id, event)]
+        self.channels = {}
+
+    def store(self, channel, event):
+        with self.lock:
+            log = self.channels.get(channel)
+            if log is None:
+                log = self.channels[channel] = [0, deque(maxlen=self.retention)]
+            log[0] += 1
+            log[1].append((log[0], event))
+            return log[0]
+
+    def read(self, channel, after):
+        with self.lock:
+            log = self.channels.get(channel)
+            if log is None:
+                return 0, []
+            return log[0], [(event_id, event) for event_id, event in log[1] if event_id > after]
+
+
+class CacheBroker(Broker):
+    blocking = True
+
+    def __init__(self, cache=None, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = caches[cache or settings.PUBSUB_CACHE]
+
+    @staticmethod
+    def key(channel, event_id=None):
+        return f'pubsub:{channel}:last' if event_id is None else f'pubsub:{channel}:{event_id}'
+
+    def store(self, channel, event):
+        self.cache.add(self.key(channel), 0, None)
+        event_id = self.cache.incr(self.key(channel))
+        self.cache.set(self.key(channel, event_id), event, EVENT_TIMEOUT)
+        return event_id
+
+    def read(self, channel, after):
+        last_id = self.cache.get(self.key(channel), 0)
+        event_ids = range(max(after, last_id - self.retention) + 1, last_id + 1)
+        if not event_ids:
+            return last_id, []
+        found = self.cache.get_many([self.key(channel, event_id) for event_id in event_ids])
+        events = [(event_id, found.get(self.key(channel, event_id))) for event_id in event_ids]
+        # an event missing before the last found one has expired, one missing after it is still being written
+        while events and events[-1][1] is None:
+            events.pop()
+            last_id -= 1
+        return last_id, [(event_id, event) for event_id, event in events if event is not None]
+
+
+@lru_cache(maxsize=None)
+def broker(path):
+    return import_string(path)(retention=settings.PUBSUB_RETENTION, poll_interval=settings.PUBSUB_POLL_INTERVAL)
+
+
+def get_broker():
+    """The ``PUBSUB_BACKEND`` broker of this process"""
+    return broker(settings.PUBSUB_BACKEND)
@@ -0,0 +1,218 @@
+import re
+from collections import namedtuple
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+
+from django.db import models
+from django.utils.text import Truncator
+
+EXCERPT_LENGTH = 280
+
+ALLOWED_TAGS = {
+    'a', 'abbr', 'b', 'blockquote', 'br', 'caption', 'code', 'col', 'colgroup', 'del', 'div', 'em', 'figcaption',
+    'figure', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'iframe', 'img', 'ins', 'li', 'ol', 'p', 'pre', 's',
+    'small', 'span', 'strike', 'strong', 'sub', 'sup', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'tr', 'u',
+    'ul',
+}
+ALLOWED_ATTRIBUTES = {
+    '*': {'class', 'style', 'title', 'align', 'dir'},
+    'a': {'href', 'target', 'rel', 'name'},
+    'img': {'src', 'alt', 'width', 'height'},
+    'iframe': {'src', 'width', 'height', 'frameborder', 'allowfullscreen', 'sandbox', 'referrerpolicy'},
+    'table': {'border', 'cellpadding', 'cellspacing'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan', 'scope'},
+    'ol': {'start', 'type'},
+}
+URL_ATTRIBUTES = {'href', 'src'}
+ALLOWED_SCHEMES = {'', 'http', 'https', 'mailto'}
+VOID_TAGS = {'br', 'col', 'hr', 'img'}
+# Content of these tags is dropped together with the tag
+DROP_CONTENT_TAGS = {'script', 'style', 'template', 'noscript'}
+BLOCK_TAGS = {
+    'blockquote', 'br', 'caption', 'div', 'figcaption', 'figure', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'li',
+    'p', 'pre', 'td', 'th', 'tr',
+}
+# Inline CSS properties CKEditor writes, others (position, z-index...) could lay content over the page
+ALLOWED_STYLES = {
+    'background-color', 'border', 'border-collapse', 'border-color', 'border-spacing', 'border-style',
+    'border-width', 'color', 'float', 'font-family', 'font-size', 'font-style', 'font-weight', 'height',
+    'line-height', 'list-style-type', 'margin', 'margin-bottom', 'margin-left', 'margin-right', 'margin-top',
+    'padding', 'padding-bottom', 'padding-left', 'padding-right', 'padding-top', 'text-align', 'text-decoration',
+    'text-indent', 'vertical-align', 'white-space', 'width',
+}
+# Keywords, lengths, colors and font names, no functions but the color ones
+STYLE_VALUE = re.compile(r'^(?:[#\w\s.,%\'"/-]|(?:rgba?|hsla?)\([\d\s.,%]*\))+$', re.IGNORECASE)
+# Iframes only embed players and documents of these hosts, over https, sandboxed and without the page's address
+EMBED_HOSTS = {
+    'www.youtube.com', 'www.youtube-nocookie.com', 'player.vimeo.com', 'docs.google.com', 'drive.google.com',
+    'www.google.com',
+}
+IFRAME_ATTRIBUTES = {
+    'sandbox': 'allow-scripts allow-same-origin allow-presentation allow-popups',
+    'referrerpolicy': 'strict-origin-when-cross-origin',
+}
+
+RichText = namedtuple('RichText', ('html', 'text', 'excerpt', 'images'))
+
+
+def _safe_url(value, tag):
+    url = urlparse(value.strip())
+    if tag == 'iframe':
+        return url.scheme.lower() == 'https' and (url.hostname or '') in EMBED_HOSTS
+    if url.scheme.lower() in ALLOWED_SCHEMES:
+        return True
+    return tag == 'img' and value.strip().lower().startswith('data:image/')
+
+
+def _clean_style(value):
+    declarations = []
+    for declaration in value.split(';'):
+        name, _, style = declaration.partition(':')
+        name, style = name.strip().lower(), style.strip()
+        if name in ALLOWED_STYLES and STYLE_VALUE.match(style):
+            declarations.append(f'{name}: {style}')
+    return '; '.join(declarations)
+
+
+class RichTextParser(HTMLParser):
+    """
+    Single pass over CKEditor HTML that writes an allow-listed copy of the markup while collecting the
+    plain text and the image sources.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.html = []
+        self.text = []
+        self.images = []
+        self.open_tags = []
+        self.dropping = 0
+
+    def _clean_attrs(self, tag, attrs):
+        allowed = ALLOWED_ATTRIBUTES['*'] | ALLOWED_ATTRIBUTES.get(tag, set())
+        for name, value in attrs:
+            name = name.lower()
+            value = value or ''
+            if name not in allowed:
+                continue
+            if name in URL_ATTRIBUTES and not _safe_url(value, tag):
+                continue
+            if name == 'style':
+                value = _clean_style(value)
+                if not value:
+                    continue
+            if tag == 'iframe' and name in IFRAME_ATTRIBUTES:
+                continue
+            yield name, value
+        if tag == 'iframe':
+            yield from IFRAME_ATTRIBUTES.items()
+
+    def _start(self, tag, attrs, closed):
+        if tag in DROP_CONTENT_TAGS:
+            if not closed:
+                self.dropping += 1
+            return
+        if self.dropping:
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append('\n')
+        if tag not in ALLOWED_TAGS:
+            return
+        attrs = list(self._clean_attrs(tag, attrs))
+        if tag == 'iframe' and 'src' not in dict(attrs):
+            # iframes of other pages are dropped, their fallback content is kept as text
+            return
+        if tag == 'img':
+            self.images.extend(value for name, value in attrs if name == 'src')
+        rendered = ''.join(f' {name}="{escape(value)}"' for name, value in attrs)
+        self.html.append(f'<{tag}{rendered}>')
+        if tag not in VOID_TAGS:
+            if closed:
+                self.html.append(f'</{tag}>')
+            else:
+                self.open_tags.append(tag)
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, attrs, closed=False)
+
+    def handle_startendtag(self, tag, attrs):
+        self._start(tag, attrs, closed=True)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping = max(self.dropping - 1, 0)
+            return
+        if self.dropping:
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append('\n')
+        if tag in self.open_tags:
+            # close anything left open inside this tag so the output stays well formed
+            while self.open_tags:
+                open_tag = self.open_tags.pop()
+                self.html.append(f'</{open_tag}>')
+                if open_tag == tag:
+                    break
+
+    def handle_data(self, data):
+        if self.dropping:
+            return
+        self.html.append(escape(data, quote=False))
+        self.text.append(data)
+
+    def close(self):
+        super().close()
+        while self.open_tags:
+            self.html.append(f'</{self.open_tags.pop()}>')
+
+
+def process_rich_text(value, excerpt_length=EXCERPT_LENGTH):
+    parser = RichTextParser()
+    parser.feed(value or '')
+    parser.close()
+    text = '\n'.join(' '.join(line.split()) for line in ''.join(parser.text).splitlines())
+    text = '\n'.join(line for line in text.split('\n') if line)
+    # Truncator walks the whole string, so hand it only what can end up in the excerpt
+    excerpt = Truncator(' '.join(text.split())[:excerpt_length + 1]).chars(excerpt_length)
+    return RichText(html=''.join(parser.html), text=text, excerpt=excerpt, images=parser.images)
+
+
+def sanitize_html(value):
+    return process_rich_text(value).html
+
+
+def html_to_text(value):
+    return process_rich_text(value).text
+
+
+class RichTextModel(models.Model):
+    """
+    Keeps a sanitized copy of ``rich_text_field`` together with its plain text, a short excerpt and the
+    images it embeds, all computed on save so list pages and search never parse HTML at request time.
+    """
+    rich_text_field = 'content'
+    derived_fields = ('plain_text', 'excerpt', 'images')
+
+    plain_text = models.TextField(blank=True, default='', editable=False)
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True, default='', editable=False)
+    images = models.JSONField(blank=True, default=list, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def process_rich_text(self):
+        value = getattr(self, self.rich_text_field)
+        rich_text = process_rich_text(value)
+        if value is not None:
+            setattr(self, self.rich_text_field, rich_text.html)
+        self.plain_text, self.excerpt, self.images = rich_text.text, rich_text.excerpt, rich_text.images
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or self.rich_text_field in update_fields:
+            self.process_rich_text()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | set(self.derived_fields)
+        return super().save(*args, **kwargs)
@@ -2,12 +2,18 @@ import graphene
 import graphql_jwt
 from django.conf import settings
 from graphene import relay, Connection
-from graphene_django import DjangoConnectionField
-from graphene_django.filter import DjangoFilterConnectionField
 from graphene_django.views import GraphQLView
 from graphql_social_auth import SocialAuthJWT
 from photologue.models import Gallery
 from festivals.schema import FestivalNode
+from gymkhana_sac.auth import viewer_profile_id
+from gymkhana_sac.batch import GraphQLBatchMixin
+from gymkhana_sac.cache_control import GraphQLCacheControlMixin, PRIVATE
+from gymkhana_sac.db.replicas import GraphQLReplicaMixin
+from gymkhana_sac.encoding import GraphQLEncoderMixin
+from gymkhana_sac.metrics import GraphQLMetricsMixin
+from gymkhana_sac.nodes import NodesField
+from gymkhana_sac.pagination import CountFreeConnectionField, CountFreeFilterConnectionField
 from forum.models import Topic
 from forum.schema import TopicNode, CreateTopicMutation, AddAnswerMutation, UpvoteMutaiton, DeleteMutation
 from konnekt.schema import Query as KonnektQuery
@@ -41,12 +47,13 @@ class NodeType(graphene.Enum):
 
 class PublicQuery(graphene.ObjectType):
     node = relay.Node.Field()
-    societies = DjangoFilterConnectionField(SocietyNode)
-    committees = DjangoFilterConnectionField(CommitteeNode)
-    membership = DjangoFilterConnectionField(MembershipNode)
-    boards = DjangoFilterConnectionField(BoardNode)
-    sacKeyPeople = DjangoFilterConnectionField(SacKeyPeopleNode)
-    festivals = DjangoFilterConnectionField(FestivalNode)
+    nodes = NodesField()
+    societies = CountFreeFilterConnectionField(SocietyNode)
+    committees = CountFreeFilterConnectionField(CommitteeNode)
+    membership = CountFreeFilterConnectionField(MembershipNode)
+    boards = CountFreeFilterConnectionField(BoardNode)
+    sacKeyPeople = CountFreeFilterConnectionField(SacKeyPeopleNode)
+    festivals = CountFreeFilterConnectionField(FestivalNode)
     home_carousel = graphene.Field(GalleryNode)
     home_gallery = graphene.Field(GalleryNode)
 
@@ -59,14 +66,16 @@ class PublicQuery(graphene.ObjectType):
 
 class PrivateQuery(KonnektQuery, PublicQuery):
     viewer = graphene.Field(UserNode)
+    # nodes is the search in this schema, looking nodes up by their ids is nodesByIds
+    nodes_by_ids = NodesField()
     nodes = graphene.ConnectionField(
         SearchResultConnection,
         query=graphene.String(description='Value to search for'),
         node_type=NodeType(required=True)
     )
-    topic = DjangoFilterConnectionField(TopicNode)
-    profile = DjangoFilterConnectionField(UserProfileNode)
-    topics_by_user = DjangoConnectionField(TopicNode)
+    topic = CountFreeFilterConnectionField(TopicNode)
+    profile = CountFreeFilterConnectionField(UserProfileNode)
+    topics_by_user = CountFreeConnectionField(TopicNode)
 
     def resolve_viewer(self, info, *args):
         user = info.context.user
@@ -77,11 +86,10 @@ class PrivateQuery(KonnektQuery, PublicQuery):
     def resolve_nodes(self, info, query=None, node_type=None, first=None, last=None, before=None, after=None):
         # TODO: Add logic to paginate search based on first, last, before and after params
         node = UserProfileNode if node_type == UserProfileNode else TopicNode
-        return node.search(query, info)
+        return node.get_queryset(node.search(query, info), info)
 
     def resolve_topics_by_user(self, info):
-        user = info.context.user.userprofile
-        topics = Topic.objects.filter(answer__author=user)
+        topics = Topic.objects.filter(answer__author_id=viewer_profile_id(info.context))
         return topics
 
 
@@ -101,12 +109,20 @@ class PublicMutation(graphene.ObjectType):
     refresh_token = graphql_jwt.Refresh.Field()
 
 
-class PrivateGraphQLView(GraphQLView):
+class PrivateGraphQLView(GraphQLCacheControlMixin, GraphQLBatchMixin, GraphQLEncoderMixin, GraphQLMetricsMixin,
+                         GraphQLReplicaMixin, GraphQLView):
     schema = graphene.Schema(PrivateQuery, mutation=PrivateMutation)
+    cache_scope = PRIVATE
 
 
-class PublicGraphQLView(GraphQLView):
+class PublicGraphQLView(GraphQLCacheControlMixin, GraphQLBatchMixin, GraphQLEncoderMixin, GraphQLMetricsMixin,
+                        GraphQLReplicaMixin, GraphQLView):
     pass
 
 
+class ReadOnlyGraphQLView(PublicGraphQLView):
+    """PublicQuery without mutations, served from the ORM thread pool at /agraphql"""
+    schema = graphene.Schema(PublicQuery)
+
+
 schema = graphene.Schema(PublicQuery, mutation=PublicMutation)
@@ -59,21 +59,27 @@ INSTALLED_APPS = [
     'news.apps.NewsConfig',
     'konnekt.apps.KonnektConfig',
     'festivals.apps.FestivalsConfig',
-    'fixture.apps.FixtureConfig'
+    'fixture.apps.FixtureConfig',
+    'benchmark.apps.BenchmarkConfig',
+    'outbox.apps.OutboxConfig'
 ]
 
 MIDDLEWARE = [
+    'gymkhana_sac.metrics.MetricsMiddleware',
+    'gymkhana_sac.profiling.RequestProfilerMiddleware',
+    'gymkhana_sac.db.replicas.ReplicaPinMiddleware',
+    # compresses what the middleware below it wrote
+    'gymkhana_sac.middleware.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'gymkhana_sac.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'htmlmin.middleware.HtmlMinifyMiddleware',
-    'htmlmin.middleware.MarkRequestMiddleware',
+    'gymkhana_sac.middleware.HtmlMinifyMiddleware',
+    'gymkhana_sac.middleware.MarkRequestMiddleware',
     'social_django.middleware.SocialAuthExceptionMiddleware'
 ]
 
@@ -93,10 +99,34 @@ STATIC_ROOT = os.path.join(BASE_DIR, config('STATIC_PATH', default='../staticfil
 
 STATIC_URL = '/static/'
 
+# Content hashed file names, so the serving layer can cache static files forever
+if config('STATIC_MANIFEST', default=False, cast=bool):
+    STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+
 MEDIA_ROOT = os.path.join(BASE_DIR, config('MEDIA_PATH', default='../media', cast=str))
 
 MEDIA_URL = '/media/'
 
+# Threads async views run their ORM work on, see gymkhana_sac/concurrency.py
+ASYNC_ORM_THREADS = config('ASYNC_ORM_THREADS', default=8, cast=int)
+
+# Request profiler, see gymkhana_sac/profiling.py. Profiles are kept in PROFILER_DIR, the newest
+# PROFILER_MAX_PROFILES of them, and browsable by superusers at /profiler/
+PROFILER_ENABLED = config('PROFILER_ENABLED', default=False, cast=bool)
+PROFILER_SAMPLE_RATE = config('PROFILER_SAMPLE_RATE', default=0.0, cast=float)
+PROFILER_SLOW_REQUEST_MS = config('PROFILER_SLOW_REQUEST_MS', default=1000, cast=int)
+PROFILER_STACK_INTERVAL_MS = config('PROFILER_STACK_INTERVAL_MS', default=5, cast=float)
+PROFILER_DIR = os.path.join(BASE_DIR, config('PROFILER_PATH', default='../profiles', cast=str))
+PROFILER_MAX_PROFILES = config('PROFILER_MAX_PROFILES', default=200, cast=int)
+
+# Prometheus metrics at /metrics, see gymkhana_sac/metrics.py. Every process writes its metrics to METRICS_DIR,
+# which has to be shared by (and only by) the workers of one deployment. With METRICS_TOKEN set, scrapers have to
+# send it as a bearer token
+METRICS_ENABLED = config('METRICS_ENABLED', default=False, cast=bool)
+METRICS_DIR = os.path.join(BASE_DIR, config('METRICS_PATH', default='../metrics', cast=str))
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=1.0, cast=float)
+METRICS_TOKEN = config('METRICS_TOKEN', default='', cast=str)
+
 VUE_ROOT = os.path.join(BASE_DIR, config('VUE_PATH', default='../vue', cast=str))
 
 VUE_DIRS = [
@@ -143,17 +173,105 @@ if config('SQLITE_DB', cast=bool):
         }
     }
 else:
+    # Connections persist for DB_CONN_MAX_AGE seconds and are checked once per request before use. With DB_POOL_SIZE,
+    # every process keeps a pool of at most that many connections instead, and requests hand theirs back when they
+    # finish. Behind pgbouncer in transaction pooling mode, set DB_PGBOUNCER
+    DB_POOL_SIZE = config('DB_POOL_SIZE', default=0, cast=int)
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.postgresql_psycopg2',
+            'ENGINE': 'gymkhana_sac.db.postgresql',
             'NAME': config('DB_NAME'),
             'USER': config('DB_USER'),
             'PASSWORD': config('DB_PASSWORD'),
             'HOST': config('DB_HOST', default='localhost'),
             'PORT': config('DB_PORT', cast=int, default=5432),
+            'CONN_MAX_AGE': 0 if DB_POOL_SIZE else config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+            'POOL_SIZE': DB_POOL_SIZE,
+            'POOL_TIMEOUT': config('DB_POOL_TIMEOUT', default=10, cast=float),
+            'POOL_MAX_IDLE': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+            'DISABLE_SERVER_SIDE_CURSORS': config('DB_PGBOUNCER', default=False, cast=bool),
         }
     }
 
+# Read replicas, comma separated: SQLite files with SQLITE_DB, otherwise PostgreSQL standbys as host[:port][/name]
+# using the credentials (and by default the host, port and name) of the primary. Read only views and GraphQL queries
+# read from them, see gymkhana_sac/db/replicas.py
+REPLICA_DATABASES = []
+DB_REPLICAS = config('DB_REPLICAS', default='', cast=lambda v: [s.strip() for s in v.split(',') if s.strip()])
+for index, replica in enumerate(DB_REPLICAS, 1):
+    alias = f'replica{index}'
+    DATABASES[alias] = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+    if config('SQLITE_DB', cast=bool):
+        DATABASES[alias]['NAME'] = os.path.join(BASE_DIR, '..', replica)
+    else:
+        address, _, name = replica.partition('/')
+        host, _, port = address.partition(':')
+        DATABASES[alias].update(HOST=host or DATABASES['default']['HOST'], NAME=name or DATABASES['default']['NAME'],
+                                PORT=int(port) if port else DATABASES['default']['PORT'])
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['gymkhana_sac.db.replicas.ReplicaRouter']
+REPLICA_PIN_SECONDS = config('DB_REPLICA_PIN_SECONDS', default=10, cast=int)
+REPLICA_MAX_LAG = config('DB_REPLICA_MAX_LAG', default=5, cast=float)
+REPLICA_LAG_CHECK_INTERVAL = config('DB_REPLICA_LAG_CHECK_INTERVAL', default=5, cast=float)
+
+# Caches
+# The shared cache is local memory by default. In production, point CACHE_BACKEND and CACHE_LOCATION at a cache all
+# worker processes share, e.g. django.core.cache.backends.filebased.FileBasedCache and a directory. The other aliases
+# keep a small in-process LRU in front of it, see gymkhana_sac/cache.py, except sessions: a logout has to be seen by
+# every process at once.
+CACHE_SHARED = {
+    'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+    'LOCATION': config('CACHE_LOCATION', default='shared'),
+    'TIMEOUT': 300,
+}
+
+
+def tiered_cache(name, timeout, max_entries=1000):
+    return {
+        'BACKEND': 'gymkhana_sac.cache.TieredCache',
+        'LOCATION': name,
+        'KEY_PREFIX': name,
+        'TIMEOUT': timeout,
+        'OPTIONS': {
+            'SHARED': 'default',
+            'LOCAL_MAX_ENTRIES': max_entries,
+            'LOCAL_TIMEOUT': config('CACHE_LOCAL_TIMEOUT', default=5, cast=float),
+        },
+    }
+
+
+CACHES = {
+    'default': CACHE_SHARED,
+    'sessions': dict(CACHE_SHARED, KEY_PREFIX='sessions'),
+    'pages': tiered_cache('pages', 60, max_entries=500),
+    'graphql': tiered_cache('graphql', 30),
+    'navigation': tiered_cache('navigation', 300, max_entries=100),
+    # names of the image renditions already created, see VERSATILEIMAGEFIELD_SETTINGS
+    'renditions': tiered_cache('renditions', 36000, max_entries=5000),
+}
+
+# Sessions: db, cache, cached_db (read from the sessions cache, written through to the database) or signed_cookies
+# (kept by the client, for deployments where API clients authenticate with JWT). cached_db is the default unless the
+# shared cache is local memory, which other processes would not see a logout in
+SESSION_STORE = config('SESSION_STORE',
+                       default='db' if CACHE_SHARED['BACKEND'].endswith('LocMemCache') else 'cached_db')
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_STORE}'
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Live forum events, see gymkhana_sac/pubsub.py and forum/live.py. Events are shared between the workers through the
+# shared cache, unless it is local memory, which they would not see each other's events in
+PUBSUB_BACKEND = config('PUBSUB_BACKEND', default='gymkhana_sac.pubsub.LocalBroker'
+                        if CACHE_SHARED['BACKEND'].endswith('LocMemCache') else 'gymkhana_sac.pubsub.CacheBroker')
+PUBSUB_CACHE = 'default'
+# events kept per channel, clients further behind fetch again
+PUBSUB_RETENTION = config('PUBSUB_RETENTION', default=100, cast=int)
+PUBSUB_POLL_INTERVAL = config('PUBSUB_POLL_INTERVAL', default=1, cast=float)
+# seconds live requests wait for events on ASGI workers, and WSGI clients wait between requests
+LIVE_TIMEOUT = config('LIVE_TIMEOUT', default=25, cast=float)
+LIVE_POLL_INTERVAL = config('LIVE_POLL_INTERVAL', default=5, cast=int)
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -185,7 +303,6 @@ AUTHENTICATION_BACKENDS = [
     'social_core.backends.google.GoogleOAuth2',
     'django.contrib.auth.backends.ModelBackend',
     'graphql_jwt.backends.JSONWebTokenBackend',
-    'django.contrib.auth.backends.ModelBackend',
 ]
 
 # Social Auth settings
@@ -289,7 +406,7 @@ VERSATILEIMAGEFIELD_SETTINGS = {
     # The name of the cache you'd like `django-versatileimagefield` to use.
     # Defaults to 'versatileimagefield_cache'. If no cache exists with the name
     # provided, the 'default' cache will be used instead.
-    'cache_name': 'versatileimagefield_cache',
+    'cache_name': 'renditions',
     # The save quality of modified JPEG images. More info here:
     # https://pillow.readthedocs.io/en/latest/handbook/image-file-formats.html#jpeg
     # Defaults to 70
@@ -347,10 +464,22 @@ GRAPHENE = {
     'SCHEMA_INDENT': 2,
     'RELAY_CONNECTION_MAX_LIMIT': 100,
     'MIDDLEWARE': [
-        'graphql_jwt.middleware.JSONWebTokenMiddleware',
+        'gymkhana_sac.auth.JSONWebTokenMiddleware',
     ],
 }
 
+# totalCount of unfiltered connections over tables with at least this many rows is the PostgreSQL planner's estimate,
+# 0 counts exactly
+GRAPHQL_ESTIMATED_COUNT_MIN = config('GRAPHQL_ESTIMATED_COUNT_MIN', default=0, cast=int)
+# operations a batched GraphQL request may carry
+GRAPHQL_MAX_BATCH_SIZE = config('GRAPHQL_MAX_BATCH_SIZE', default=20, cast=int)
+
+# function encoding GraphQL, REST framework and export responses to JSON bytes, gymkhana_sac.encoding.orjson_dumps
+# or gymkhana_sac.encoding.stdlib_dumps, default_dumps is the first when orjson is installed
+JSON_ENCODER = config('JSON_ENCODER', default='gymkhana_sac.encoding.default_dumps')
+# responses shorter than this many bytes are sent uncompressed
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+
 if not DEBUG:
     REST_FRAMEWORK = {
         # Use Django's standard `django.contrib.auth` permissions.
@@ -358,7 +487,7 @@ if not DEBUG:
             'rest_framework.permissions.IsAuthenticated',
         ),
         'DEFAULT_RENDERER_CLASSES': (
-            'rest_framework.renderers.JSONRenderer',
+            'gymkhana_sac.encoding.JSONRenderer',
         ),
         'DEFAULT_AUTHENTICATION_CLASSES': (
             'rest_framework.authentication.SessionAuthentication',
@@ -369,13 +498,30 @@ PHOTOLOGUE_DIR = 'gallery'
 
 SERVER_EMAIL = 'noreply@localhost.com'
 DEFAULT_FROM_EMAIL = 'noreply@localhost.com'
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend' if DEBUG else \
-    'django.core.mail.backends.smtp.EmailBackend'
-EMAIL_HOST = 'smtp.gmail.com'
-EMAIL_PORT = 465
+# emails are queued in the outbox, and sent with OUTBOX_EMAIL_BACKEND by `manage.py sendmail`
+EMAIL_BACKEND = 'outbox.backends.OutboxBackend'
+OUTBOX_EMAIL_BACKEND = config('OUTBOX_EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend'
+                              if DEBUG else 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
+EMAIL_PORT = config('EMAIL_PORT', default=465, cast=int)
+EMAIL_USE_SSL = config('EMAIL_USE_SSL', default=EMAIL_PORT == 465, cast=bool)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='noreply@localhost.com', cast=str)
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='', cast=str)
+# emails sent per connection, and seconds between looks for new ones
+OUTBOX_BATCH_SIZE = config('OUTBOX_BATCH_SIZE', default=50, cast=int)
+OUTBOX_POLL_INTERVAL = config('OUTBOX_POLL_INTERVAL', default=5, cast=float)
+# an email failing to send is tried again after this many seconds, doubled with every attempt, up to this many times
+OUTBOX_RETRY_DELAY = config('OUTBOX_RETRY_DELAY', default=60, cast=int)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=6, cast=int)
+# emails per recipient domain per OUTBOX_RATE_WINDOW seconds, e.g. gmail.com=20,*=60, * for the other domains
+OUTBOX_RATE_LIMITS = config('OUTBOX_RATE_LIMITS', default='*=60', cast=lambda v: {
+    domain.strip().lower(): int(limit) for domain, limit in (item.split('=') for item in v.split(',') if item.strip())})
+OUTBOX_RATE_WINDOW = config('OUTBOX_RATE_WINDOW', default=60, cast=int)
 
 GRAPHQL_JWT = {
     'JWT_AUTH_HEADER_PREFIX': 'Bearer'
 }
+# verified token payloads are kept this many seconds, up to this many of them per process
+JWT_PAYLOAD_CACHE_TIMEOUT = config('JWT_PAYLOAD_CACHE_TIMEOUT', default=60, cast=int)
+JWT_PAYLOAD_CACHE_MAX_ENTRIES = config('JWT_PAYLOAD_CACHE_MAX_ENTRIES', default=1000, cast=int)
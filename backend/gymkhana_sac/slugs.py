@@ -0,0 +1,119 @@
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, router, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+SLUG_ATTEMPTS = 5
+SUFFIX_LENGTH = 8
+
+
+def _base_slug(value, max_length):
+    # leave room for a "-<n>" suffix so allocated slugs always fit the column
+    base = slugify(value or '')[:max_length - SUFFIX_LENGTH].strip('-')
+    return base or 'item'
+
+
+def _prefix_filter(bases, field):
+    return reduce(or_, (Q(**{field: base}) | Q(**{f'{field}__startswith': base + '-'}) for base in bases))
+
+
+def _taken_slugs(model, bases, field='slug', using=None, exclude_pk=None):
+    """
+    Returns a dict mapping every base slug to the numbers of its slugs already in use: 0 for the bare base, n for
+    ``<base>-<n>``, using one indexed prefix query for the whole batch. Only tails the allocator writes count, so
+    ``fest-07`` is not a number of ``fest``.
+    """
+    taken = {base: set() for base in bases}
+    if not bases:
+        return taken
+    queryset = model._default_manager.using(using).filter(_prefix_filter(bases, field))
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    for slug in queryset.values_list(field, flat=True).iterator():
+        if slug in taken:
+            taken[slug].add(0)
+        head, _, tail = slug.rpartition('-')
+        if head in taken and tail.isdigit() and tail == str(int(tail)):
+            taken[head].add(int(tail))
+    return taken
+
+
+def _numbered(base, suffix):
+    return base if suffix == 0 else f'{base}-{suffix}'
+
+
+def allocate_slugs(model, values, field='slug', reserved=(), using=None, exclude_pk=None):
+    """
+    Allocates a unique slug for every value in ``values`` in one round trip. The bare slug is used when it is free,
+    collisions with existing rows, with each other and with ``reserved`` words get the first free numeric suffix:
+    ``fest-2`` follows ``fest`` even when the slug of "Fest 2021" is taken.
+    """
+    max_length = model._meta.get_field(field).max_length
+    bases = [_base_slug(value, max_length) for value in values]
+    taken = _taken_slugs(model, sorted(set(bases)), field=field, using=using, exclude_pk=exclude_pk)
+    slugs = []
+    for base in bases:
+        suffix = 0
+        # the bare base is never suffixed as 1, so -2 follows it like most slug schemes
+        while suffix in taken[base] or _numbered(base, suffix) in reserved:
+            suffix = 2 if suffix == 0 else suffix + 1
+        taken[base].add(suffix)
+        slugs.append(_numbered(base, suffix))
+    return slugs
+
+
+def allocate_slug(model, value, field='slug', reserved=(), using=None, exclude_pk=None):
+    return allocate_slugs(model, [value], field=field, reserved=reserved, using=using, exclude_pk=exclude_pk)[0]
+
+
+def bulk_create_with_slugs(model, objs, batch_size=200):
+    """
+    ``bulk_create`` counterpart of :class:`UniqueSlugMixin`: instances without a slug get one allocated per
+    batch right before the batch is inserted, since ``bulk_create`` bypasses ``save()``.
+    """
+    using = router.db_for_write(model)
+    field = model.slug_field
+    objs = list(objs)
+    for start in range(0, len(objs), batch_size):
+        batch = objs[start:start + batch_size]
+        pending = [obj for obj in batch if not getattr(obj, field)]
+        slugs = allocate_slugs(model, [obj.get_slug_source() for obj in pending], field=field,
+                               reserved=model.reserved_slugs, using=using)
+        for obj, slug in zip(pending, slugs):
+            setattr(obj, field, slug)
+        model._default_manager.using(using).bulk_create(batch)
+    return objs
+
+
+class UniqueSlugMixin(object):
+    """
+    Fills a blank ``slug`` from ``slug_source`` on save. The slug is allocated with a single prefix query
+    and the insert runs in a savepoint, so a concurrent writer taking the same slug only costs a retry.
+    """
+    slug_field = 'slug'
+    slug_source = 'name'
+    reserved_slugs = ()
+
+    def get_slug_source(self):
+        return getattr(self, self.slug_source)
+
+    def save(self, *args, **kwargs):
+        if getattr(self, self.slug_field):
+            return super().save(*args, **kwargs)
+        using = kwargs.get('using') or router.db_for_write(self.__class__, instance=self)
+        for attempt in range(SLUG_ATTEMPTS):
+            setattr(self, self.slug_field, allocate_slug(self.__class__, self.get_slug_source(),
+                                                         field=self.slug_field, reserved=self.reserved_slugs,
+                                                         using=using, exclude_pk=self.pk))
+            try:
+                with transaction.atomic(using=using):
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                slug = getattr(self, self.slug_field)
+                setattr(self, self.slug_field, '')
+                lost_race = self.__class__._default_manager.using(using).filter(
+                    **{self.slug_field: slug}).exclude(pk=self.pk).exists()
+                if not lost_race or attempt == SLUG_ATTEMPTS - 1:
+                    raise
@@ -22,8 +22,15 @@ from django.conf.urls.static import static
 from django.contrib.auth.views import LogoutView
 from django.views.decorators.csrf import csrf_exempt
 
-from gymkhana_sac.schema import PrivateGraphQLView, PublicGraphQLView
-from gymkhana_sac.views import FrontendUpdateView, VueView
+from forum.api.views import live
+from forum.exports import ForumActivityExport
+from gymkhana_sac.concurrency import pooled
+from gymkhana_sac.exports import ExportView
+from gymkhana_sac.schema import PrivateGraphQLView, PublicGraphQLView, ReadOnlyGraphQLView
+from gymkhana_sac.views import FrontendUpdateView, VueView, ProfileListView, ProfileDetailView, ProfileDownloadView, \
+    MetricsView, HealthView, ReadinessView
+from main.exports import ContactExport, MembershipExport, SenateMembershipExport
+from oauth.exports import UserProfileExport
 from oauth.views import SessionView
 
 admin.site.site_title = 'Gymkhana Administration'
@@ -40,12 +47,40 @@ urlpatterns = [
     url(r'^frontend-upload/',
         user_passes_test(lambda u: u.is_superuser, login_url='admin:login')(FrontendUpdateView.as_view()),
         name='admin-frontend-upload'),
+    path('profiler/', user_passes_test(lambda u: u.is_superuser, login_url='admin:login')(
+        ProfileListView.as_view()), name='admin-profiler'),
+    re_path(r'^profiler/(?P<profile_id>[0-9]+-[0-9a-f]+)/$',
+            user_passes_test(lambda u: u.is_superuser, login_url='admin:login')(ProfileDetailView.as_view()),
+            name='admin-profiler-detail'),
+    re_path(r'^profiler/(?P<profile_id>[0-9]+-[0-9a-f]+)\.prof$',
+            user_passes_test(lambda u: u.is_superuser, login_url='admin:login')(ProfileDownloadView.as_view()),
+            name='admin-profiler-download'),
+    path('metrics', MetricsView.as_view(), name='metrics'),
+    path('healthz', HealthView.as_view(), name='healthz'),
+    path('readyz', ReadinessView.as_view(), name='readyz'),
     path('', include('social_django.urls', namespace='social')),
 ]
 
+# Staff only streaming exports, e.g. /export/contacts.csv or /export/profiles.json
+urlpatterns += [
+    re_path(rf'^export/{export.name}\.(?P<fmt>csv|json)$',
+            user_passes_test(lambda u: u.is_staff, login_url='admin:login')(
+                ExportView.as_view(export_class=export)),
+            name=f'export-{export.name}')
+    for export in (ContactExport, UserProfileExport, MembershipExport, SenateMembershipExport, ForumActivityExport)
+]
+
 urlpatterns += [
     path("graphql", csrf_exempt(PublicGraphQLView.as_view(graphiql=True))),
-    path("pgraphql", csrf_exempt(PrivateGraphQLView.as_view(graphiql=True)))
+    path("pgraphql", csrf_exempt(PrivateGraphQLView.as_view(graphiql=True))),
+    # async, for the ASGI deployment
+    path("agraphql", pooled(csrf_exempt(ReadOnlyGraphQLView.as_view())))
+]
+
+# Live forum events, see forum/live.py
+urlpatterns += [
+    path('live/forum', live, name='live-forum'),
+    path('live/forum/<slug:slug>', live, name='live-topic'),
 ]
 
 if settings.DEBUG:  # pragma: no cover
@@ -1,3 +1,6 @@
+import hmac
+import logging
+import os
 from os import listdir
 from shutil import rmtree, move
 from tarfile import open as tar_open
@@ -6,9 +9,17 @@ from django.conf import settings
 from django.contrib import admin, messages
 from django.core.exceptions import ValidationError
 from django import forms
+from django.core.cache import caches
 from django.core.management import call_command
+from django.db import connections
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
 from django.urls import reverse_lazy
+from django.views import View
 from django.views.generic import FormView, TemplateView
+from gymkhana_sac.metrics import registry, CONTENT_TYPE
+from gymkhana_sac.profiling import list_profiles, read_profile
+
+logger = logging.getLogger(__name__)
 
 
 class UploadForm(forms.Form):
@@ -35,15 +46,14 @@ class UploadForm(forms.Form):
         return self.cleaned_data['file']
 
 
-class FrontendUpdateView(FormView):
-    form_class = UploadForm
-    template_name = 'frontend_update.html'
-    success_url = reverse_lazy('admin:index')
+class AdminPageMixin(object):
+    """Context the admin templates expect, for pages outside the admin site extending admin/base_site.html"""
+    title = None
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context.update({
-            'title': 'Frontend Upload',
+            'title': self.title,
             'site_title': admin.site.site_title,
             'site_header': admin.site.site_header,
             'site_url': admin.site.site_url,
@@ -52,11 +62,104 @@ class FrontendUpdateView(FormView):
         })
         return context
 
+
+class FrontendUpdateView(AdminPageMixin, FormView):
+    form_class = UploadForm
+    template_name = 'frontend_update.html'
+    success_url = reverse_lazy('admin:index')
+    title = 'Frontend Upload'
+
     def form_valid(self, form):
         form.process()
         messages.add_message(self.request, messages.INFO, 'The frontend code deployment has started')
         return super().form_valid(form)
 
 
+class ProfileListView(AdminPageMixin, TemplateView):
+    template_name = 'profiler/list.html'
+    title = 'Request profiles'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        profiles = (read_profile(profile_id) for profile_id in list_profiles())
+        context.update({
+            'profiles': [profile for profile in profiles if profile is not None],
+            'slow_ms': settings.PROFILER_SLOW_REQUEST_MS,
+            'sample_rate': settings.PROFILER_SAMPLE_RATE,
+        })
+        return context
+
+
+class ProfileDetailView(AdminPageMixin, TemplateView):
+    template_name = 'profiler/detail.html'
+    title = 'Request profile'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['profile'] = read_profile(self.kwargs['profile_id'])
+        if context['profile'] is None:
+            raise Http404
+        context['has_prof'] = os.path.exists(join(settings.PROFILER_DIR, f'{self.kwargs["profile_id"]}.prof'))
+        return context
+
+
+class ProfileDownloadView(View):
+    """Raw cProfile stats of a sampled request, for snakeviz or ``python -m pstats``"""
+
+    def get(self, request, profile_id):
+        try:
+            stats = open(join(settings.PROFILER_DIR, f'{profile_id}.prof'), 'rb')
+        except FileNotFoundError:
+            raise Http404
+        return FileResponse(stats, as_attachment=True, filename=f'{profile_id}.prof')
+
+
+class MetricsView(View):
+    """Prometheus scrape endpoint, summing the metrics of every worker process"""
+
+    def get(self, request):
+        if not settings.METRICS_ENABLED:
+            raise Http404
+        expected = f'Bearer {settings.METRICS_TOKEN}'.encode()
+        if settings.METRICS_TOKEN and not hmac.compare_digest(request.headers.get('Authorization', '').encode(),
+                                                              expected):
+            return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+        return HttpResponse(registry.render(registry.collect()), content_type=CONTENT_TYPE)
+
+
+class HealthView(View):
+    """Liveness probe, the process answers requests"""
+
+    def get(self, request):
+        return HttpResponse('ok', content_type='text/plain')
+
+
+class ReadinessView(View):
+    """
+    Readiness probe, every database and cache answers, 503 otherwise. The errors are logged, the public response only
+    tells which check failed.
+    """
+
+    def get(self, request):
+        checks = {}
+        for alias in connections:
+            try:
+                with connections[alias].cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                checks[f'database:{alias}'] = 'ok'
+            except Exception:
+                logger.exception('Readiness check of database %s failed', alias)
+                checks[f'database:{alias}'] = 'error'
+        for alias in caches:
+            try:
+                caches[alias].set('readiness', 'ok', 10)
+                checks[f'cache:{alias}'] = 'ok' if caches[alias].get('readiness') == 'ok' else 'not stored'
+            except Exception:
+                logger.exception('Readiness check of cache %s failed', alias)
+                checks[f'cache:{alias}'] = 'error'
+        ready = all(check == 'ok' for check in checks.values())
+        return JsonResponse(checks, status=200 if ready else 503)
+
+
 class VueView(TemplateView):
     template_name = 'dist/index.html'
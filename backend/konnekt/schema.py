@@ -1,6 +1,6 @@
-from graphene_django.filter import DjangoFilterConnectionField
+from gymkhana_sac.pagination import CountFreeFilterConnectionField
 from oauth.schema import UserProfileNode
 
 
 class Query(object):
-    all_user_profiles = DjangoFilterConnectionField(UserProfileNode)
+    all_user_profiles = CountFreeFilterConnectionField(UserProfileNode)
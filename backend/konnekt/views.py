@@ -1,13 +1,14 @@
 from oauth.models import UserProfile
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import ListView, TemplateView
+from gymkhana_sac.db.replicas import ReplicaReadMixin
 
 
 class HomeView(LoginRequiredMixin, TemplateView):
     template_name = 'konnekt/index.html'
 
 
-class SearchView(LoginRequiredMixin, ListView):
+class SearchView(ReplicaReadMixin, LoginRequiredMixin, ListView):
     model = UserProfile
     template_name = 'konnekt/search.html'
 
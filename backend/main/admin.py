@@ -1,60 +1,97 @@
 from django.contrib import admin
+from gymkhana_sac.admin import SelectRelatedAdminMixin, SelectRelatedInlineMixin
+from gymkhana_sac.exports import ExportAdminMixin
+from .exports import ContactExport, MembershipExport, SenateMembershipExport
 from .models import Society, Board, Committee, Membership, SocialLink, Senate, SenateMembership, Activity, Contact, SacKeyPeople, Faculty
 
 
-class MembershipInline(admin.StackedInline):
+class MembershipInline(SelectRelatedInlineMixin, admin.StackedInline):
     model = SenateMembership
     can_delete = True
     verbose_name_plural = 'Members'
+    autocomplete_fields = ('userprofile',)
 
 
-class CommitteeMembershipInline(admin.StackedInline):
+class CommitteeMembershipInline(SelectRelatedInlineMixin, admin.StackedInline):
     model = Membership
     can_delete = True
     verbose_name_plural = 'Members'
+    autocomplete_fields = ('userprofile',)
 
 
 class FacultyAdmin(admin.ModelAdmin):
     list_display = ('name',)
 
 
-class SenateAdmin(admin.ModelAdmin):
+class SenateAdmin(SelectRelatedAdminMixin, admin.ModelAdmin):
     inlines = (MembershipInline,)
 
 
-class SacKeyPeopleAdmin(admin.ModelAdmin):
+class SacKeyPeopleAdmin(SelectRelatedAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'gen_secy', 'gen_secy_sac')
+    list_select_related = ('gen_secy__user', 'gen_secy_sac__user')
+    autocomplete_fields = ('gen_secy', 'gen_secy_sac')
 
 
-class BoardAdmin(admin.ModelAdmin):
+class BoardAdmin(SelectRelatedAdminMixin, admin.ModelAdmin):
     prepopulated_fields = {"slug": ("name", "year")}
     list_display = ('name', 'is_active', 'year')
     list_filter = ('year', 'is_active')
+    autocomplete_fields = ('vice_president',)
 
 
-class SocietyAdmin(admin.ModelAdmin):
+class SocietyAdmin(SelectRelatedAdminMixin, admin.ModelAdmin):
     prepopulated_fields = {"slug": ("name",)}
     search_fields = ['name', 'board__name']
     list_display = ('__str__', 'board', 'stype', 'published')
     list_filter = ('published', 'stype')
+    list_select_related = ('board',)
+    autocomplete_fields = ('secretary', 'joint_secretary_one', 'joint_secretary_two', 'joint_secretary_three')
 
 
-class CommitteeAdmin(admin.ModelAdmin):
+class CommitteeAdmin(SelectRelatedAdminMixin, admin.ModelAdmin):
     inlines = (CommitteeMembershipInline,)
     prepopulated_fields = {"slug": ("name",)}
     search_fields = ['name', 'board__name']
     list_display = ('__str__', 'board', 'ctype', 'published')
     list_filter = ('published', 'ctype')
+    list_select_related = ('board',)
 
 
-class ActivityAdmin(admin.ModelAdmin):
+class ActivityAdmin(SelectRelatedAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'society', 'committee')
+    list_select_related = ('society__board', 'committee__board')
+    autocomplete_fields = ('society', 'committee')
+
+
+class ContactAdmin(ExportAdminMixin, admin.ModelAdmin):
+    export_class = ContactExport
+    date_hierarchy = 'timestamp'
+    list_display = ('name', 'email', 'phone', 'subject', 'timestamp')
+    search_fields = ['name', 'email', 'subject']
+
+
+class MembershipAdmin(SelectRelatedAdminMixin, ExportAdminMixin, admin.ModelAdmin):
+    export_class = MembershipExport
+    list_display = ('userprofile', 'committee', 'role')
+    list_filter = ('committee__board__year',)
+    list_select_related = ('userprofile__user', 'committee__board')
+    search_fields = ['userprofile__roll', 'committee__name']
+    autocomplete_fields = ('userprofile', 'committee')
+
+
+class SenateMembershipAdmin(SelectRelatedAdminMixin, ExportAdminMixin, admin.ModelAdmin):
+    export_class = SenateMembershipExport
+    list_display = ('userprofile', 'senate', 'role', 'year')
+    list_filter = ('senate__year', 'role')
+    list_select_related = ('userprofile__user', 'senate')
+    search_fields = ['userprofile__roll', 'senate__name']
+    autocomplete_fields = ('userprofile',)
 
 
 # iterable list
 main_models = [
     SocialLink,
-    Contact
 ]
 
 admin.site.register(Society, SocietyAdmin)
@@ -64,4 +101,7 @@ admin.site.register(Committee, CommitteeAdmin)
 admin.site.register(Senate, SenateAdmin)
 admin.site.register(SacKeyPeople, SacKeyPeopleAdmin)
 admin.site.register(Activity, ActivityAdmin)
+admin.site.register(Contact, ContactAdmin)
+admin.site.register(Membership, MembershipAdmin)
+admin.site.register(SenateMembership, SenateMembershipAdmin)
 admin.site.register(main_models)
@@ -0,0 +1,48 @@
+from gymkhana_sac.exports import Export
+from .models import Contact, Membership, SenateMembership
+
+
+class ContactExport(Export):
+    name = 'contacts'
+    model = Contact
+    ordering = ('-timestamp',)
+    columns = (
+        ('name', 'name'),
+        ('email', 'email'),
+        ('phone', 'phone'),
+        ('subject', 'subject'),
+        ('message', 'message'),
+        ('timestamp', 'timestamp'),
+    )
+
+
+class MembershipExport(Export):
+    name = 'memberships'
+    model = Membership
+    ordering = ('committee__board__year', 'committee__name', 'pk')
+    columns = (
+        ('year', 'committee__board__year'),
+        ('board', 'committee__board__name'),
+        ('committee', 'committee__name'),
+        ('roll', 'userprofile__roll'),
+        ('first_name', 'userprofile__user__first_name'),
+        ('last_name', 'userprofile__user__last_name'),
+        ('email', 'userprofile__user__email'),
+        ('role', 'role'),
+    )
+
+
+class SenateMembershipExport(Export):
+    name = 'senate-memberships'
+    model = SenateMembership
+    ordering = ('senate__year', 'senate__name', 'pk')
+    columns = (
+        ('year', 'senate__year'),
+        ('senate', 'senate__name'),
+        ('roll', 'userprofile__roll'),
+        ('first_name', 'userprofile__user__first_name'),
+        ('last_name', 'userprofile__user__last_name'),
+        ('email', 'userprofile__user__email'),
+        ('role', 'role'),
+        ('study_year', 'year'),
+    )
@@ -0,0 +1,35 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from gymkhana_sac.richtext import RichTextModel
+
+
+class Command(BaseCommand):
+    help = 'Sanitizes rich text fields and rebuilds their plain text, excerpt and image columns'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('models', nargs='*', help='app_label.ModelName to process, defaults to all')
+
+    def handle(self, *args, **options):
+        models = [apps.get_model(label) for label in options['models']] or [
+            model for model in apps.get_models() if issubclass(model, RichTextModel)]
+        for model in models:
+            count = self.process_model(model, options['chunk_size'])
+            self.stdout.write(f'{model._meta.label}: {count} rows processed')
+
+    @staticmethod
+    def process_model(model, chunk_size):
+        fields = [model.rich_text_field, *model.derived_fields]
+        batch = []
+        count = 0
+        for obj in model._default_manager.only('pk', *fields).iterator(chunk_size=chunk_size):
+            obj.process_rich_text()
+            batch.append(obj)
+            if len(batch) == chunk_size:
+                model._default_manager.bulk_update(batch, fields)
+                count += len(batch)
+                batch = []
+        if batch:
+            model._default_manager.bulk_update(batch, fields)
+            count += len(batch)
+        return count
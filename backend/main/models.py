@@ -6,6 +6,8 @@ from django.urls import reverse
 from ckeditor_uploader.fields import RichTextUploadingField
 from versatileimagefield.fields import VersatileImageField
 from photologue.models import Gallery
+from gymkhana_sac.richtext import RichTextModel
+from gymkhana_sac.slugs import UniqueSlugMixin
 
 YEAR_CHOICES = []
 for r in range(2008, (datetime.datetime.now().year + 2)):
@@ -41,7 +43,8 @@ class Faculty(models.Model):
         return self.name
 
 
-class Board(models.Model):
+class Board(UniqueSlugMixin, RichTextModel):
+    rich_text_field = 'description'
     valid_year = RegexValidator(r'^[0-9]{4}$', message='Not a valid year!')
     name = models.CharField(max_length=128)
     description = RichTextUploadingField(blank=True)
@@ -63,7 +66,7 @@ class Board(models.Model):
     custom_html = models.TextField(blank=True, null=True, default=None,
                                    help_text="Add custom HTML to view on board page.")
     slug = models.SlugField(
-        unique=True, help_text="This will be used as URL. /board/slug")
+        unique=True, blank=True, help_text="This will be used as URL. /board/slug (generated when left blank)")
     is_active = models.BooleanField(default=False)
     year = models.CharField(
         max_length=4, choices=YEAR_CHOICES, validators=[valid_year])
@@ -72,6 +75,9 @@ class Board(models.Model):
         ordering = ["name"]
         verbose_name_plural = "Boards"
 
+    def get_slug_source(self):
+        return f'{self.name} {self.year}'
+
     def get_absolute_url(self):
         return reverse('main:board-detail', kwargs={'slug': self.slug})
 
@@ -79,7 +85,8 @@ class Board(models.Model):
         return self.name + " - " + str(self.year)
 
 
-class Society(models.Model):
+class Society(UniqueSlugMixin, RichTextModel):
+    rich_text_field = 'description'
     # Choices
     TYPE_CHOICES = (
         ('S', 'Society'),
@@ -115,7 +122,7 @@ class Society(models.Model):
     custom_html = models.TextField(blank=True, null=True, default=None,
                                    help_text="Add custom HTML to view on society page.")
     slug = models.SlugField(
-        unique=True, help_text="This will be used as URL. /society/slug")
+        unique=True, blank=True, help_text="This will be used as URL. /society/slug (generated when left blank)")
     published = models.BooleanField(default=False)
 
     class Meta:
@@ -137,7 +144,8 @@ class Society(models.Model):
         return self.name + " - " + str(self.year)
 
 
-class Committee(models.Model):
+class Committee(UniqueSlugMixin, RichTextModel):
+    rich_text_field = 'description'
     # Choices
     TYPE_CHOICES = (
         ('C', 'Committee'),
@@ -161,7 +169,7 @@ class Committee(models.Model):
     custom_html = models.TextField(blank=True, null=True, default=None,
                                    help_text="Add custom HTML to view on committee page.")
     slug = models.SlugField(
-        unique=True, help_text="This will be used as URL. /committee/slug")
+        unique=True, blank=True, help_text="This will be used as URL. /committee/slug (generated when left blank)")
     published = models.BooleanField(default=False)
 
     class Meta:
@@ -211,7 +219,7 @@ class Activity(models.Model):
         return self.name
 
 
-class Senate(models.Model):
+class Senate(UniqueSlugMixin, models.Model):
     # Validators
     valid_year = RegexValidator(r'^[0-9]{4}$', message='Not a valid year!')
     # Model
@@ -232,7 +240,7 @@ class Senate(models.Model):
     custom_html = models.TextField(blank=True, null=True, default=None,
                                    help_text="Add custom HTML to view on board page.")
     slug = models.SlugField(
-        unique=True, help_text="This will be used as URL. /senate/slug")
+        unique=True, blank=True, help_text="This will be used as URL. /senate/slug (generated when left blank)")
     is_active = models.BooleanField(default=False)
     year = models.CharField(
         max_length=4, choices=YEAR_CHOICES, validators=[valid_year])
@@ -240,6 +248,9 @@ class Senate(models.Model):
     class Meta:
         ordering = ["-id"]
 
+    def get_slug_source(self):
+        return f'{self.name} {self.year}'
+
     def get_absolute_url(self):
         return reverse('main:senate-detail', kwargs={'slug': self.slug})
 
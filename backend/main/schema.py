@@ -5,6 +5,9 @@ from photologue.models import Gallery, Photo
 from events.models import Event
 from events.schema import EventNode
 from gallery.schema import ImageType
+from gymkhana_sac.cache_control import cache_hint
+from gymkhana_sac.optimizer import QueryOptimizerMixin, hints
+from gymkhana_sac.pagination import CountableConnection
 from gymkhana_sac.utils import build_image_types
 from main.models import Society, Board, Activity, Committee, SacKeyPeople, Membership
 from graphene_django import DjangoObjectType, DjangoConnectionField
@@ -13,7 +16,8 @@ from news.models import News
 from news.schema import NewsNode
 
 
-class BoardNode(DjangoObjectType):
+@cache_hint(max_age=300)
+class BoardNode(QueryOptimizerMixin, DjangoObjectType):
     cover = Field(ImageType)
     upcoming_events = DjangoConnectionField(EventNode, max_limit=5)
     past_news = DjangoConnectionField(NewsNode, max_limit=5)
@@ -26,25 +30,34 @@ class BoardNode(DjangoObjectType):
             'gallery', 'custom_html')
         filter_fields = ('slug', 'is_active')
         interfaces = (relay.Node,)
+        connection_class = CountableConnection
 
+    @hints(only=('cover',))
     def resolve_cover(self, info):
         return ImageType(sizes=build_image_types(info.context, self.cover, 'festival'))
 
+    @hints()
     def resolve_committee_set(self, info, *args, **kwargs):
         return self.committee_set.filter(published=True)
 
+    @hints()
     def resolve_society_set(self, info, *args, **kwargs):
         return self.society_set.filter(published=True)
 
+    @cache_hint(max_age=60)
+    @hints()
     def resolve_upcoming_events(self, info, *args, **kwargs):
         return Event.objects.filter(society__board=self).filter(published=True).filter(date__gte=timezone.now())[
                :kwargs.get('first', 5)]
 
+    @cache_hint(max_age=60)
+    @hints()
     def resolve_past_news(self, info, *args, **kwargs):
         return News.objects.filter(society__board=self)[:kwargs.get('first', 5)]
 
 
-class SocietyNode(DjangoObjectType):
+@cache_hint(max_age=300)
+class SocietyNode(QueryOptimizerMixin, DjangoObjectType):
     cover = Field(ImageType)
 
     class Meta:
@@ -52,12 +65,15 @@ class SocietyNode(DjangoObjectType):
         fields = '__all__'
         filter_fields = ('slug', 'published')
         interfaces = (relay.Node,)
+        connection_class = CountableConnection
 
+    @hints(only=('cover',))
     def resolve_cover(self, info):
         return ImageType(sizes=build_image_types(info.context, self.cover, 'festival'))
 
 
-class CommitteeNode(DjangoObjectType):
+@cache_hint(max_age=300)
+class CommitteeNode(QueryOptimizerMixin, DjangoObjectType):
     cover = Field(ImageType)
 
     class Meta:
@@ -65,25 +81,31 @@ class CommitteeNode(DjangoObjectType):
         fields = '__all__'
         filter_fields = ('slug', 'published')
         interfaces = (relay.Node,)
+        connection_class = CountableConnection
 
+    @hints(only=('cover',))
     def resolve_cover(self, info):
         return ImageType(sizes=build_image_types(info.context, self.cover, 'festival'))
 
-class MembershipNode(DjangoObjectType):
+@cache_hint(max_age=300)
+class MembershipNode(QueryOptimizerMixin, DjangoObjectType):
     class Meta:
         model = Membership
         fields = '__all__'
         filter_fields = ('role',)
         interfaces = (relay.Node,)
+        connection_class = CountableConnection
 
-class ActivityNode(DjangoObjectType):
+@cache_hint(max_age=300)
+class ActivityNode(QueryOptimizerMixin, DjangoObjectType):
     class Meta:
         model = Activity
         fields = '__all__'
         interfaces = (relay.Node,)
 
 
-class GalleryNode(DjangoObjectType):
+@cache_hint(max_age=600)
+class GalleryNode(QueryOptimizerMixin, DjangoObjectType):
     class Meta:
         model = Gallery
         exclude = ('board_set', 'society_set', 'committee_set')
@@ -91,7 +113,8 @@ class GalleryNode(DjangoObjectType):
         interfaces = (relay.Node,)
 
 
-class GalleryPhoto(DjangoObjectType):
+@cache_hint(max_age=600)
+class GalleryPhoto(QueryOptimizerMixin, DjangoObjectType):
     image = Field(ImageType)
 
     class Meta:
@@ -99,13 +122,16 @@ class GalleryPhoto(DjangoObjectType):
         exclude = ('galleries',)
         interfaces = (relay.Node,)
 
+    @hints(only=('image',))
     def resolve_image(self, info):
         return ImageType(sizes=build_image_types(request=info.context, image=self.image, key_set='image'))
 
 
-class SacKeyPeopleNode(DjangoObjectType):
+@cache_hint(max_age=300)
+class SacKeyPeopleNode(QueryOptimizerMixin, DjangoObjectType):
     class Meta:
         model = SacKeyPeople
         fields = '__all__'
         filter_fields = ('gen_secy', 'gen_secy_sac')
         interfaces = (relay.Node,)
+        connection_class = CountableConnection
@@ -10,6 +10,7 @@ from events.models import Event
 from news.models import News
 from .utils import MaintenanceMixin
 from decouple import config
+from gymkhana_sac.db.replicas import ReplicaReadMixin
 
 
 class MaintenanceAndNavigationMixin(MaintenanceMixin, NavigationMixin):
@@ -34,7 +35,7 @@ class HomeView(MaintenanceAndNavigationMixin, TemplateView):
         return context
 
 
-class BoardView(MaintenanceAndNavigationMixin, DetailView):
+class BoardView(ReplicaReadMixin, MaintenanceAndNavigationMixin, DetailView):
     template_name = 'main/board.html'
     model = Board
 
@@ -55,7 +56,7 @@ class BoardView(MaintenanceAndNavigationMixin, DetailView):
         return context
 
 
-class SenateView(MaintenanceAndNavigationMixin, DetailView):
+class SenateView(ReplicaReadMixin, MaintenanceAndNavigationMixin, DetailView):
     template_name = 'main/senate.html'
     model = Senate
 
@@ -64,7 +65,7 @@ class SenateView(MaintenanceAndNavigationMixin, DetailView):
         return context
 
 
-class SocietyView(MaintenanceAndNavigationMixin, DetailView):
+class SocietyView(ReplicaReadMixin, MaintenanceAndNavigationMixin, DetailView):
     template_name = 'main/society.html'
     model = Society
 
@@ -81,7 +82,7 @@ class SocietyView(MaintenanceAndNavigationMixin, DetailView):
         return context
 
 
-class CommitteeView(MaintenanceAndNavigationMixin, DetailView):
+class CommitteeView(ReplicaReadMixin, MaintenanceAndNavigationMixin, DetailView):
     template_name = 'main/committee.html'
     model = Committee
 
@@ -1,11 +1,14 @@
 from django.contrib import admin
+from gymkhana_sac.admin import SelectRelatedAdminMixin
 from .models import News
 
 
-class NewsAdmin(admin.ModelAdmin):
+class NewsAdmin(SelectRelatedAdminMixin, admin.ModelAdmin):
     date_hierarchy = 'date'
     list_display = ('title', 'author', 'society', 'committee', 'date')
     list_filter = ('date',)
+    list_select_related = ('author__user', 'society__board', 'committee__board')
+    autocomplete_fields = ('author', 'society', 'committee')
 
     class Meta:
         model = News
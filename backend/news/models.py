@@ -3,9 +3,10 @@ from oauth.models import UserProfile
 from main.models import Society, Committee
 from ckeditor_uploader.fields import RichTextUploadingField
 from versatileimagefield.fields import VersatileImageField
+from gymkhana_sac.richtext import RichTextModel
 
 
-class News(models.Model):
+class News(RichTextModel):
     title = models.CharField(max_length=128)
     cover = VersatileImageField(upload_to='news_%Y', blank=True, null=True,
                                 help_text="Upload high quality image to use as cover photo.")
@@ -3,10 +3,13 @@ from graphene import relay, Field
 from graphene_django import DjangoObjectType
 
 from gallery.schema import ImageType
+from gymkhana_sac.cache_control import cache_hint
+from gymkhana_sac.optimizer import QueryOptimizerMixin, hints
 from news.models import News
 
 
-class NewsNode(DjangoObjectType):
+@cache_hint(max_age=60)
+class NewsNode(QueryOptimizerMixin, DjangoObjectType):
     cover = Field(ImageType)
 
     class Meta:
@@ -14,6 +17,7 @@ class NewsNode(DjangoObjectType):
         fields = '__all__'
         interfaces = (relay.Node,)
 
+    @hints(only=('cover',))
     def resolve_cover(self, info):
         from gymkhana_sac.utils import build_image_types
         return ImageType(sizes=build_image_types(info.context, self.cover, 'festival'))
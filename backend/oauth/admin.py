@@ -1,8 +1,16 @@
+import re
+
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
+from gymkhana_sac.admin import SelectRelatedAdminMixin
+from gymkhana_sac.exports import ExportAdminMixin
+from oauth.exports import UserProfileExport
 from oauth.models import UserProfile, SocialLink
 
+# the start of a roll number like B20CS001, e.g. B20 or B20CS0
+ROLL_PREFIX = re.compile(r'^[A-Z][0-9]{2}[A-Z]{0,2}[0-9]*$', re.IGNORECASE)
+
 
 class UserProfileInline(admin.StackedInline):
     model = UserProfile
@@ -26,6 +34,28 @@ admin.site.register(User, UserAdmin)
 
 class SocialLinkAdmin(admin.ModelAdmin):
     list_display = ('__str__', 'user', 'link')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
 
 
 admin.site.register(SocialLink, SocialLinkAdmin)
+
+
+class UserProfileAdmin(SelectRelatedAdminMixin, ExportAdminMixin, admin.ModelAdmin):
+    export_class = UserProfileExport
+    list_display = ('roll', 'user', 'prog', 'branch', 'year')
+    list_filter = ('prog', 'branch', 'year')
+    list_select_related = ('user',)
+    search_fields = ['roll', 'user__username', 'user__first_name', 'user__last_name']
+    autocomplete_fields = ('user',)
+
+    def get_search_results(self, request, queryset, search_term):
+        # roll numbers, what profiles are mostly looked up by in autocomplete widgets, are matched by prefix, which
+        # the index of the unique roll serves
+        term = search_term.strip()
+        if ROLL_PREFIX.match(term):
+            return queryset.filter(roll__startswith=term.upper()), False
+        return super().get_search_results(request, queryset, search_term)
+
+
+admin.site.register(UserProfile, UserProfileAdmin)
@@ -0,0 +1,22 @@
+from gymkhana_sac.exports import Export
+from .models import UserProfile
+
+
+class UserProfileExport(Export):
+    name = 'profiles'
+    model = UserProfile
+    ordering = ('roll',)
+    columns = (
+        ('roll', 'roll'),
+        ('username', 'user__username'),
+        ('first_name', 'user__first_name'),
+        ('last_name', 'user__last_name'),
+        ('email', 'user__email'),
+        ('gender', 'gender'),
+        ('dob', 'dob'),
+        ('prog', 'prog'),
+        ('year', 'year'),
+        ('branch', 'branch'),
+        ('phone', 'phone'),
+        ('hometown', 'hometown'),
+    )
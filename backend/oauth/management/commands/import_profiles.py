@@ -0,0 +1,140 @@
+import csv
+import json
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from gymkhana_sac.bulk import bulk_upsert
+from oauth.forms import UserProfileForm
+from oauth.models import UserProfile, split_full_name
+
+PROFILE_FIELDS = UserProfileForm._meta.fields
+USER_FIELDS = ('email', 'first_name', 'last_name')
+
+
+class RosterProfileForm(UserProfileForm):
+    """
+    UserProfileForm rules without the per-row uniqueness query, since rows are upserted by roll. One bound
+    form is reused for every row of a roster instead of copying the form fields for each of them.
+    """
+
+    def validate_unique(self):
+        pass
+
+    def validate_row(self, row):
+        self.data, self.instance, self._errors = row, UserProfile(), None
+        return self.is_valid()
+
+
+def read_roster(path, fmt=None):
+    fmt = fmt or ('jsonl' if path.endswith(('.jsonl', '.json')) else 'csv')
+    with open(path, newline='', encoding='utf-8') as roster:
+        if fmt == 'csv':
+            for row in csv.DictReader(roster):
+                yield row
+        else:
+            for line in roster:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class Command(BaseCommand):
+    help = 'Creates or updates users and user profiles from a CSV or JSONL roster, matching rows by roll'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (with a header row) or JSONL roster file')
+        parser.add_argument('--format', choices=('csv', 'jsonl'), help='defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='validate the roster without writing')
+
+    def handle(self, *args, **options):
+        self.created = self.updated = self.failed = 0
+        chunk = []
+        try:
+            for line, row in enumerate(read_roster(options['path'], options['format']), start=1):
+                chunk.append((line, row))
+                if len(chunk) == options['chunk_size']:
+                    self.import_chunk(chunk, options['dry_run'])
+                    chunk = []
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+        if chunk:
+            self.import_chunk(chunk, options['dry_run'])
+        self.stdout.write(f'{self.created} created, {self.updated} updated, {self.failed} failed')
+
+    def report(self, line, roll, errors):
+        self.failed += 1
+        self.stderr.write(f'row {line} ({roll or "no roll"}): {errors}')
+
+    def validate(self, chunk):
+        """Runs the form rules over the whole chunk and drops rows with errors or repeated rolls/usernames."""
+        valid = {}
+        usernames = set()
+        form = RosterProfileForm(data={})
+        for line, row in chunk:
+            row = {key: (value.strip() if isinstance(value, str) else value) for key, value in row.items()}
+            row['roll'] = (row.get('roll') or '').upper()
+            if not form.validate_row(row):
+                self.report(line, row['roll'], '; '.join(
+                    f'{field}: {" ".join(errors)}' for field, errors in form.errors.items()))
+                continue
+            user = self.build_user(row)
+            if row['roll'] in valid or user.username in usernames:
+                self.report(line, row['roll'], 'roll or username repeated in roster')
+                continue
+            usernames.add(user.username)
+            valid[row['roll']] = (line, form.instance, user)
+        return valid
+
+    @staticmethod
+    def build_user(row):
+        email = row.get('email') or ''
+        username = row.get('username') or (email.split('@')[0] if email else row['roll'].lower())
+        user = User(username=username, email=email,
+                    first_name=row.get('name') or ' '.join(filter(None, (row.get('first_name'),
+                                                                         row.get('last_name')))))
+        split_full_name(user)
+        return user
+
+    def import_chunk(self, chunk, dry_run=False):
+        valid = self.validate(chunk)
+        if dry_run or not valid:
+            return
+        with transaction.atomic():
+            existing = {row[0]: row[1:] for row in UserProfile.objects.select_for_update().filter(
+                roll__in=valid.keys()).values_list('roll', 'user_id', 'user__username', *[
+                    f'user__{field}' for field in USER_FIELDS])}
+            # users updated in this chunk keep their usernames, which new rows may not take either
+            taken = set(User.objects.filter(username__in=[user.username for _, _, user in valid.values()]).values_list(
+                'username', flat=True))
+            new_users, changed_users, new_profiles, changed_profiles = [], [], [], []
+            # profiles sign in through Google, one unusable password per chunk saves hashing for every row
+            password = make_password(None)
+            for roll, (line, profile, user) in valid.items():
+                if roll in existing:
+                    user_id, username, *current = existing[roll]
+                    # usernames of existing accounts are kept, blank roster values do not erase data
+                    user.id = profile.user_id = user_id
+                    user.username = username
+                    for field, value in zip(USER_FIELDS, current):
+                        setattr(user, field, getattr(user, field) or value)
+                    changed_users.append(user)
+                    changed_profiles.append(profile)
+                elif user.username in taken:
+                    self.report(line, roll, f'username {user.username} belongs to another user')
+                else:
+                    new_users.append(user)
+                    new_profiles.append(profile)
+                user.password = password
+            User.objects.bulk_create(new_users)
+            # bulk_create does not return primary keys on every backend, so look them up by username
+            user_ids = dict(User.objects.filter(username__in=[user.username for user in new_users]).values_list(
+                'username', 'id'))
+            for user, profile in zip(new_users, new_profiles):
+                profile.user_id = user_ids[user.username]
+            UserProfile.objects.bulk_create(new_profiles)
+            # rows of existing users are only ever updated, so the insert half of the upsert never applies
+            bulk_upsert(User, changed_users, unique_fields=('id',), update_fields=USER_FIELDS)
+            bulk_upsert(UserProfile, changed_profiles, unique_fields=('roll',), update_fields=PROFILE_FIELDS)
+        self.created += len(new_profiles)
+        self.updated += len(changed_profiles)
@@ -191,11 +191,15 @@ class SocialLink(models.Model):
         return ''
 
 
+def split_full_name(user):
+    name = user.first_name.split(' ')
+    user.first_name = name[0].title()
+    user.last_name = ' '.join([x.title() for x in name[1:len(name)]])
+
+
 def topic_pre_save_receiver(sender, instance, *args, **kwargs):
     if instance._state.adding is True:
-        name = instance.first_name.split(' ')
-        instance.first_name = name[0].title()
-        instance.last_name = ' '.join([x.title() for x in name[1:len(name)]])
+        split_full_name(instance)
 
 
 pre_save.connect(topic_pre_save_receiver, sender=User)
@@ -4,20 +4,25 @@ from graphene import relay, Field
 from graphene_django import DjangoObjectType, DjangoConnectionField
 from graphene_django.forms.mutation import DjangoModelFormMutation
 from graphql_jwt.decorators import login_required
+from gymkhana_sac.cache_control import cache_hint
+from gymkhana_sac.optimizer import QueryOptimizerMixin, hints
+from gymkhana_sac.pagination import CountableConnection
 from main.schema import ImageType
 from oauth.forms import UserProfileUpdateForm, UserProfileForm
 from oauth.models import UserProfile, SocialLink
 from main.models import Faculty
 
 
-class SocialLinks(DjangoObjectType):
+@cache_hint(max_age=60)
+class SocialLinks(QueryOptimizerMixin, DjangoObjectType):
     class Meta:
         model = SocialLink
         fields = ('__all__')
         interfaces = (relay.Node,)
 
 
-class UserNode(DjangoObjectType):
+@cache_hint(max_age=60)
+class UserNode(QueryOptimizerMixin, DjangoObjectType):
     id = graphene.ID(required=True)
 
     class Meta:
@@ -30,7 +35,8 @@ class UserNode(DjangoObjectType):
         return self.id
 
 
-class UserProfileNode(DjangoObjectType):
+@cache_hint(max_age=60)
+class UserProfileNode(QueryOptimizerMixin, DjangoObjectType):
     user = UserNode()
     cover = Field(ImageType)
     avatar = Field(ImageType)
@@ -49,29 +55,37 @@ class UserProfileNode(DjangoObjectType):
             'skills',
             'about')
         interfaces = (relay.Node,)
+        connection_class = CountableConnection
 
+    @hints(only=('cover',))
     def resolve_cover(self, info):
         from gymkhana_sac.utils import build_image_types
         return ImageType(sizes=build_image_types(info.context, self.cover, 'festival'))
 
+    @hints(only=('avatar',))
     def resolve_avatar(self, info):
         from gymkhana_sac.utils import build_image_types
         return ImageType(sizes=build_image_types(info.context, self.avatar, 'festival'))
 
+    @hints(only=('user',))
     def resolve_social_links(self, info):
-        return SocialLink.objects.filter(user=self.user)
+        return SocialLink.objects.filter(user_id=self.user_id)
 
+    @hints(only=('gender',))
     def resolve_gender(self, info):
-        return self.user.userprofile.get_gender_display()
+        return self.get_gender_display()
 
+    @hints(only=('prog',))
     def resolve_prog(self, info):
-        return self.user.userprofile.get_prog_display()
+        return self.get_prog_display()
 
+    @hints(only=('branch',))
     def resolve_branch(self, info):
-        return self.user.userprofile.get_branch_display()
+        return self.get_branch_display()
 
+    @hints(only=('year',))
     def resolve_year(self, info):
-        return self.user.userprofile.get_year_display()
+        return self.get_year_display()
 
     def resolve_id(self, info):
         return self.id
@@ -83,7 +97,8 @@ class UserProfileNode(DjangoObjectType):
         return nodes.all()
 
 
-class FacultyProfileNode(DjangoObjectType):
+@cache_hint(max_age=300)
+class FacultyProfileNode(QueryOptimizerMixin, DjangoObjectType):
     name = graphene.String()
     email = graphene.String()
     phone = graphene.String()
@@ -97,10 +112,12 @@ class FacultyProfileNode(DjangoObjectType):
         fields = ('__all__')
         interfaces = (relay.Node,)
 
+    @hints(only=('cover',))
     def resolve_cover(self, info):
         from gymkhana_sac.utils import build_image_types
         return ImageType(sizes=build_image_types(info.context, self.cover, 'festival'))
 
+    @hints(only=('avatar',))
     def resolve_avatar(self, info):
         from gymkhana_sac.utils import build_image_types
         return ImageType(sizes=build_image_types(info.context, self.avatar, 'festival'))
@@ -1,4 +1,10 @@
+import csv
+import json
+import os
+from io import StringIO
+from tempfile import NamedTemporaryFile
 from django.contrib.auth.models import User
+from django.core.management import call_command
 from django.test import TestCase
 from django.test.client import Client
 from django.urls import reverse
@@ -314,3 +320,57 @@ class OauthURLsTestCase(TestCase):
     # self.assertRedirects(response, reverse('oauth:detail', kwargs={'roll': self.user_profile_1.roll}))
     # self.assertEqual(UserProfile.objects.get(user=self.user_1).phone, '0987654321')
     # self.client.logout()
+
+
+class ImportProfilesTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='existing', first_name='old name')
+        cls.user_profile = UserProfile.objects.create(user=cls.user, roll='B17CS014', dob=get_random_date(),
+                                                      phone='1234567890', branch='CSE')
+
+    def import_rows(self, rows, suffix='.csv'):
+        with NamedTemporaryFile('w', suffix=suffix, delete=False) as roster:
+            if suffix == '.csv':
+                writer = csv.DictWriter(roster, fieldnames=sorted(rows[0].keys()))
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                roster.writelines(json.dumps(row) + '\n' for row in rows)
+        out, err = StringIO(), StringIO()
+        call_command('import_profiles', roster.name, '--chunk-size=2', stdout=out, stderr=err)
+        os.unlink(roster.name)
+        return out.getvalue(), err.getvalue()
+
+    def row(self, roll, **kwargs):
+        row = {'roll': roll, 'name': 'new student', 'email': f'{roll.lower()}@iitj.ac.in', 'gender': 'M',
+               'dob': '2000-01-01', 'prog': 'BT', 'year': '1', 'phone': '9876543210', 'branch': 'EE'}
+        row.update(kwargs)
+        return row
+
+    def test_import_creates_and_updates(self):
+        """New rolls are created with a user, known rolls are updated in place"""
+        out, err = self.import_rows([self.row('b21ee001'), self.row('B21EE002'), self.row('B17CS014', year='4')])
+        self.assertIn('2 created, 1 updated, 0 failed', out)
+        created = UserProfile.objects.get(roll='B21EE001')
+        self.assertEqual((created.user.username, created.user.first_name, created.user.last_name),
+                         ('b21ee001', 'New', 'Student'))
+        self.user_profile.refresh_from_db()
+        self.assertEqual((self.user_profile.year, self.user_profile.branch), ('4', 'EE'))
+        self.assertEqual(self.user_profile.user.username, 'existing')
+
+    def test_import_reports_invalid_rows(self):
+        """Rows failing the profile form rules are reported and skipped"""
+        out, err = self.import_rows([self.row('B21EE004'), self.row('B21EE004'),
+                                     self.row('B21EE003', phone='12')], suffix='.jsonl')
+        self.assertIn('1 created, 0 updated, 2 failed', out)
+        self.assertIn('row 2 (B21EE004): roll or username repeated', err)
+        self.assertIn('row 3 (B21EE003): phone', err)
+        self.assertFalse(UserProfile.objects.filter(roll='B21EE003').exists())
+
+    def test_import_reports_taken_usernames(self):
+        """New rows taking the username of a user updated in the same chunk are reported"""
+        out, err = self.import_rows([self.row('B17CS014'), self.row('B21EE005', email='existing@iitj.ac.in')])
+        self.assertIn('0 created, 1 updated, 1 failed', out)
+        self.assertIn('row 2 (B21EE005): username existing belongs to another user', err)
+        self.assertFalse(UserProfile.objects.filter(roll='B21EE005').exists())
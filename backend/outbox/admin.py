@@ -0,0 +1,24 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Email
+
+
+class EmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipients', 'status', 'attempts', 'created', 'sent')
+    list_filter = ('status',)
+    search_fields = ('subject', 'recipients')
+    exclude = ('message',)
+    readonly_fields = ('from_email', 'recipients', 'domain', 'subject', 'status', 'attempts', 'last_error', 'created',
+                       'next_attempt', 'sent')
+    actions = ('send_again',)
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Send again')
+    def send_again(self, request, queryset):
+        count = queryset.update(status=Email.QUEUED, attempts=0, next_attempt=timezone.now())
+        self.message_user(request, f'{count} emails queued.')
+
+
+admin.site.register(Email, EmailAdmin)
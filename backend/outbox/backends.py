@@ -0,0 +1,21 @@
+from django.core.mail.backends.base import BaseEmailBackend
+from outbox.models import Email
+
+
+class OutboxBackend(BaseEmailBackend):
+    """
+    Email backend queueing messages in the outbox, for ``manage.py sendmail`` to send with ``OUTBOX_EMAIL_BACKEND``.
+    Sending mail costs the request an insert instead of an SMTP conversation.
+    """
+
+    def send_messages(self, email_messages):
+        emails = [Email.from_message(message) for message in email_messages if message.recipients()]
+        if not emails:
+            return 0
+        try:
+            Email.objects.bulk_create(emails)
+        except Exception:
+            if not self.fail_silently:
+                raise
+            return 0
+        return len(emails)
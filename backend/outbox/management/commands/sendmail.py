@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from outbox.sender import send_batch
+
+
+class Command(BaseCommand):
+    help = 'Sends the emails queued in the outbox, looking for new ones every OUTBOX_POLL_INTERVAL seconds'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='send the emails due now and exit')
+
+    def handle(self, *args, **options):
+        while True:
+            outcomes = send_batch()
+            if outcomes:
+                self.stdout.write(', '.join(f'{count} {outcome}' for outcome, count in sorted(outcomes.items())))
+            # a full batch leaves more due emails behind
+            if sum(outcomes.values()) < settings.OUTBOX_BATCH_SIZE:
+                if options['once']:
+                    return
+                close_old_connections()
+                time.sleep(settings.OUTBOX_POLL_INTERVAL)
@@ -0,0 +1,71 @@
+from email import message_from_bytes
+from email.message import Message
+from email.utils import parseaddr
+
+from django.core.mail import EmailMessage
+from django.core.mail.message import MIMEMixin
+from django.db import models
+from django.utils import timezone
+
+
+class StoredMIMEMessage(MIMEMixin, Message):
+    """A MIME message parsed back from the outbox, written out like the ones Django builds"""
+
+
+class QueuedEmailMessage(EmailMessage):
+    """``EmailMessage`` sending the MIME message an outbox ``Email`` was queued with, as is"""
+
+    def __init__(self, email):
+        super().__init__(subject=email.subject, from_email=email.from_email, to=email.recipients.split('\n'))
+        self.mime = message_from_bytes(bytes(email.message), _class=StoredMIMEMessage)
+
+    def message(self):
+        return self.mime
+
+
+class Email(models.Model):
+    """An outgoing email, queued by ``outbox.backends.OutboxBackend`` and sent by ``manage.py sendmail``"""
+    QUEUED = 'Q'
+    SENT = 'S'
+    FAILED = 'F'
+    STATUS_CHOICES = (
+        (QUEUED, 'Queued'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    )
+    from_email = models.CharField(max_length=320)
+    # envelope recipients, one per line, bcc included
+    recipients = models.TextField()
+    # domain of the first recipient, which the rate limits of OUTBOX_RATE_LIMITS apply to
+    domain = models.CharField(max_length=255)
+    subject = models.TextField(blank=True)
+    # the MIME message, built when queued
+    message = models.BinaryField()
+    status = models.CharField(max_length=1, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    next_attempt = models.DateTimeField(default=timezone.now)
+    sent = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created']
+        indexes = [
+            # the due emails
+            models.Index(fields=['status', 'next_attempt']),
+            # the emails sent to each domain lately
+            models.Index(fields=['sent', 'domain']),
+        ]
+
+    def __str__(self):
+        return self.subject + ' - ' + self.recipients.partition('\n')[0]
+
+    @classmethod
+    def from_message(cls, message):
+        recipients = message.recipients()
+        return cls(from_email=message.from_email, recipients='\n'.join(recipients),
+                   domain=parseaddr(recipients[0])[1].rpartition('@')[2].lower(), subject=str(message.subject),
+                   message=message.message().as_bytes())
+
+    def to_message(self):
+        return QueuedEmailMessage(self)
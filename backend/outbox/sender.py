@@ -0,0 +1,85 @@
+"""
+Sending of the outbox. ``send_batch`` sends the due emails, oldest first, over a single connection of the
+``OUTBOX_EMAIL_BACKEND``:
+
+- an email failing to send is tried again ``OUTBOX_RETRY_DELAY`` seconds later, the delay doubling with every attempt,
+  and is marked failed after ``OUTBOX_MAX_ATTEMPTS`` attempts;
+- at most ``OUTBOX_RATE_LIMITS[domain]`` emails (``'*'`` for the domains not listed) go to a recipient domain within
+  ``OUTBOX_RATE_WINDOW`` seconds, the others wait for the next window.
+
+The emails of a batch stay locked until their outcome is saved, other senders skip them on PostgreSQL. An email is
+sent at least once: twice when the sender dies between sending it and saving that it did.
+"""
+import contextlib
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from outbox.models import Email
+
+
+def rate_limit(domain):
+    """Emails ``domain`` may get per window, ``None`` when unlimited"""
+    limits = settings.OUTBOX_RATE_LIMITS
+    return limits.get(domain, limits.get('*'))
+
+
+def retry_delay(attempts):
+    """Delay between the ``attempts``-th attempt to send an email and the next"""
+    return timedelta(seconds=settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def send_batch():
+    """Sends up to ``OUTBOX_BATCH_SIZE`` due emails, returning how many were sent, retried, failed and throttled"""
+    now = timezone.now()
+    window = timedelta(seconds=settings.OUTBOX_RATE_WINDOW)
+    outcomes = Counter()
+    with transaction.atomic():
+        # emails the domains sent to within the window may still get, None when unlimited
+        budgets = {}
+        for row in Email.objects.filter(sent__gt=now - window).order_by().values('domain').annotate(count=Count('id')):
+            limit = rate_limit(row['domain'])
+            budgets[row['domain']] = None if limit is None else limit - row['count']
+        exhausted = [domain for domain, budget in budgets.items() if budget is not None and budget <= 0]
+        emails = list(Email.objects.select_for_update(skip_locked=True)
+                      .filter(status=Email.QUEUED, next_attempt__lte=now).exclude(domain__in=exhausted)
+                      .order_by('next_attempt', 'id')[:settings.OUTBOX_BATCH_SIZE])
+        connection = get_connection(settings.OUTBOX_EMAIL_BACKEND)
+        opened = False
+        for email in emails:
+            budget = budgets.get(email.domain, rate_limit(email.domain))
+            if budget is not None and budget <= 0:
+                email.next_attempt = now + window
+                outcomes['throttled'] += 1
+                continue
+            budgets[email.domain] = None if budget is None else budget - 1
+            email.attempts += 1
+            try:
+                if not opened:
+                    connection.open()
+                    opened = True
+                connection.send_messages([email.to_message()])
+            except Exception as error:
+                # the connection may be left mid conversation, the next email opens another
+                with contextlib.suppress(Exception):
+                    connection.close()
+                opened = False
+                email.last_error = f'{type(error).__name__}: {error}'
+                if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                    email.status = Email.FAILED
+                    outcomes['failed'] += 1
+                else:
+                    email.next_attempt = timezone.now() + retry_delay(email.attempts)
+                    outcomes['retried'] += 1
+            else:
+                email.status, email.sent, email.last_error = Email.SENT, timezone.now(), ''
+                outcomes['sent'] += 1
+        if opened:
+            with contextlib.suppress(Exception):
+                connection.close()
+        Email.objects.bulk_update(emails, ['status', 'attempts', 'last_error', 'next_attempt', 'sent'])
+    return outcomes
@@ -0,0 +1,93 @@
+import re
+from collections import Counter
+from contextlib import ContextDecorator
+
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.test.utils import CaptureQueriesContext
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_LIST = re.compile(r'\((?:\s*\?\s*,)*\s*\?\s*\)')
+WHITESPACE = re.compile(r'\s+')
+# How many shapes the failure report lists
+REPORT_SHAPES = 10
+
+
+def normalize_sql(sql):
+    """Reduces a statement to its shape: literals become ``?`` and ``IN`` lists of any length look the same."""
+    sql = STRING_LITERAL.sub('?', sql)
+    sql = NUMBER_LITERAL.sub('?', sql)
+    sql = PLACEHOLDER_LIST.sub('(...)', sql.replace('%s', '?'))
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryBudget(CaptureQueriesContext, ContextDecorator):
+    """
+    Records the statements run inside the block and fails with a report when there are more than ``queries``
+    of them, or when one statement shape repeats more than ``repeats`` times (the N+1 pattern).
+
+        with QueryBudget(queries=5, repeats=1):
+            client.get('/')
+
+        @QueryBudget(queries=5)
+        def test_home(self):
+            ...
+    """
+
+    def __init__(self, queries=None, repeats=None, label=None, using=DEFAULT_DB_ALIAS):
+        super().__init__(connections[using])
+        self.queries = queries
+        self.repeats = repeats
+        self.label = label
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            self.check()
+
+    @property
+    def shapes(self):
+        return Counter(normalize_sql(query['sql']) for query in self.captured_queries)
+
+    def repeated(self):
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > 1]
+
+    def problems(self):
+        problems = []
+        if self.queries is not None and len(self) > self.queries:
+            problems.append(f'{len(self)} queries, budget is {self.queries}')
+        if self.repeats is not None:
+            problems.extend(f'shape repeated {count} times, budget is {self.repeats} (N+1?)'
+                            for shape, count in self.repeated() if count > self.repeats)
+        return problems
+
+    def report(self):
+        lines = [f'{self.label or "Query budget"} exceeded:']
+        lines.extend(f'  {problem}' for problem in self.problems())
+        lines.append('Statements by shape:')
+        for shape, count in self.shapes.most_common(REPORT_SHAPES):
+            lines.append(f'  {count:>4} x {shape[:300]}')
+        return '\n'.join(lines)
+
+    def check(self):
+        if self.problems():
+            raise AssertionError(self.report())
+
+
+class QueryBudgetMixin(object):
+    """``TestCase`` mixin offering ``self.assertQueryBudget(queries, repeats)`` as a context manager."""
+
+    def assertQueryBudget(self, queries=None, repeats=None, label=None, using=DEFAULT_DB_ALIAS):
+        return QueryBudget(queries=queries, repeats=repeats, label=label, using=using)
+
+
+try:
+    import pytest
+except ImportError:  # pragma: no cover
+    pytest = None
+
+if pytest is not None:  # pragma: no cover
+    @pytest.fixture
+    def query_budget():
+        """pytest fixture handing out QueryBudget, e.g. ``with query_budget(queries=3): ...``"""
+        return QueryBudget
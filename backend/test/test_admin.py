@@ -0,0 +1,120 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from events.models import Event
+from forum.models import Topic, Answer
+from main.models import Faculty, Board, Society, Committee, Membership, Senate, SenateMembership, SacKeyPeople, \
+    Activity
+from news.models import News
+from oauth.models import UserProfile
+from test.test_assets import get_random_date
+
+
+class AdminQueriesTestCase(TestCase):
+    """Admin pages run as many queries whatever the number of profiles, members, upvotes and rows"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = User.objects.create_superuser(username='admin', password='password')
+        cls.board = Board.objects.create(name='board', slug='board', year='2020',
+                                         president=Faculty.objects.create(name='faculty'))
+        cls.senate = Senate.objects.create(name='senate', slug='senate', year='2020')
+        cls.profiles = []
+        cls.society = cls.committee = cls.topic = cls.answer = None
+        cls.add_rows(3)
+        cls.key_people = SacKeyPeople.objects.create(gen_secy=cls.profiles[0], gen_secy_sac=cls.profiles[1])
+        Society.objects.filter(pk=cls.society.pk).update(
+            secretary=cls.profiles[0], joint_secretary_one=cls.profiles[1], joint_secretary_two=cls.profiles[2])
+
+    @classmethod
+    def add_rows(cls, count):
+        for _ in range(count):
+            index = len(cls.profiles)
+            user = User.objects.create_user(username=f'user_{index}', first_name=f'First Last {index}',
+                                            is_staff=True)
+            profile = UserProfile.objects.create(user=user, roll=f'B20CS{index:03}', dob=get_random_date(),
+                                                 phone='9999999999')
+            cls.profiles.append(profile)
+            society = Society.objects.create(name=f'society {index}', slug=f'society-{index}', board=cls.board,
+                                             description='description', published=True)
+            committee = Committee.objects.create(name=f'committee {index}', slug=f'committee-{index}',
+                                                 board=cls.board, description='description', published=True)
+            cls.society, cls.committee = cls.society or society, cls.committee or committee
+            Membership.objects.create(committee=cls.committee, userprofile=profile, role='member')
+            SenateMembership.objects.create(senate=cls.senate, userprofile=profile, role='SER', year='1')
+            Activity.objects.create(name=f'activity {index}', society=society, committee=committee,
+                                    description='description')
+            Event.objects.create(name=f'event {index}', society=society, committee=committee,
+                                 date=timezone.now())
+            News.objects.create(title=f'news {index}', author=profile, society=society, committee=committee,
+                                content='<p>news</p>', date=timezone.now())
+            topic = Topic.objects.create(author=profile, title=f'topic {index}', content='<p>topic</p>')
+            answer = Answer.objects.create(topic=topic, author=profile, content='<p>answer</p>')
+            cls.topic, cls.answer = cls.topic or topic, cls.answer or answer
+            cls.topic.upvotes.add(profile)
+            cls.answer.upvotes.add(profile)
+
+    def setUp(self):
+        self.client.force_login(self.superuser)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return len(queries)
+
+    def test_pages(self):
+        """Change lists and change forms with profile widgets and member inlines"""
+        urls = [reverse(f'admin:{name}_changelist') for name in (
+            'main_society', 'main_committee', 'main_sackeypeople', 'main_activity', 'main_membership',
+            'main_senatemembership', 'forum_topic', 'forum_answer', 'events_event', 'news_news',
+            'oauth_userprofile')]
+        urls += [
+            reverse('admin:main_society_change', args=(self.society.pk,)),
+            reverse('admin:main_society_add'),
+            reverse('admin:main_board_change', args=(self.board.pk,)),
+            reverse('admin:main_committee_change', args=(self.committee.pk,)),
+            reverse('admin:main_senate_change', args=(self.senate.pk,)),
+            reverse('admin:main_sackeypeople_change', args=(self.key_people.pk,)),
+            reverse('admin:forum_topic_change', args=(self.topic.pk,)),
+            reverse('admin:forum_answer_change', args=(self.answer.pk,)),
+        ]
+        # the first requests fill the caches of content types and permissions
+        for url in urls:
+            self.count_queries(url)
+        before = [self.count_queries(url) for url in urls]
+        self.add_rows(10)
+        self.assertEqual([self.count_queries(url) for url in urls], before)
+
+    def test_inline_labels(self):
+        """Member rows are labelled with the profiles they were loaded with"""
+        response = self.client.get(reverse('admin:main_committee_change', args=(self.committee.pk,)))
+        for profile in self.profiles:
+            self.assertContains(response, f'<option value="{profile.pk}" selected>{profile}</option>', html=True)
+
+    def test_autocomplete(self):
+        """Profiles are searched by roll number prefix, among those the field may point to"""
+        User.objects.filter(username='user_2').update(is_staff=False)
+        url = reverse('admin:autocomplete')
+        params = {'app_label': 'main', 'model_name': 'society', 'field_name': 'secretary', 'term': 'b20cs00'}
+        with self.assertNumQueries(4):
+            results = self.client.get(url, params).json()['results']
+        self.assertEqual(results, [
+            {'id': str(self.profiles[0].pk), 'text': 'B20CS000 (First Last 0)'},
+            {'id': str(self.profiles[1].pk), 'text': 'B20CS001 (First Last 1)'},
+        ])
+        params['term'] = 'Last 1'
+        results = self.client.get(url, params).json()['results']
+        self.assertEqual([result['id'] for result in results], [str(self.profiles[1].pk)])
+
+    def test_search_usernames(self):
+        """Terms that are not the start of a roll number search usernames and names"""
+        User.objects.filter(username='user_1').update(username='john2')
+        response = self.client.get(reverse('admin:oauth_userprofile_changelist'), {'q': 'john2'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.profiles[1]])
+        params = {'app_label': 'main', 'model_name': 'society', 'field_name': 'secretary', 'term': 'john2'}
+        results = self.client.get(reverse('admin:autocomplete'), params).json()['results']
+        self.assertEqual([result['id'] for result in results], [str(self.profiles[1].pk)])
@@ -0,0 +1,64 @@
+import json
+import threading
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from forum.models import Topic
+from gymkhana_sac.concurrency import run_sync
+from main.models import Board, Faculty
+from oauth.models import UserProfile
+from test.test_assets import get_random_date
+
+
+# The ORM work of async views runs on pool threads with their own connections, which only see committed data
+@override_settings(ROOT_URLCONF='benchmark.urls')
+class AsyncViewsTestCase(TransactionTestCase):
+    def setUp(self):
+        self.profile = UserProfile.objects.create(
+            user=User.objects.create_user(username='user', password='password'), roll='B20CS001',
+            dob=get_random_date(), phone='9999999999')
+        self.topic = Topic.objects.create(author=self.profile, title='Topic', content='<p>content</p>')
+        Board.objects.create(name='board', slug='board', year='2000', president=Faculty.objects.create(name='f'))
+
+    def test_run_sync_uses_pool(self):
+        """Sync work runs on the ORM pool, not on the event loop thread"""
+        name = async_to_sync(run_sync)(lambda: threading.current_thread().name)
+        self.assertTrue(name.startswith('orm'))
+
+    async def test_read_only_graphql(self):
+        """The async GraphQL endpoint answers queries"""
+        query = '{ boards { edges { node { name } } } }'
+        response = await self.async_client.post('/agraphql', json.dumps({'query': query}),
+                                                content_type='application/json')
+        self.assertEqual(response.json()['data']['boards']['edges'][0]['node']['name'], 'board')
+
+    async def test_read_only_graphql_rejects_mutations(self):
+        """The async GraphQL endpoint has no mutations"""
+        response = await self.async_client.post('/agraphql', json.dumps({'query': 'mutation { verifyToken(token: "") '
+                                                                                  '{ payload } }'}),
+                                                content_type='application/json')
+        self.assertIn('errors', response.json())
+
+    def test_topic_upvote_toggle(self):
+        """Upvoting through the async forum API toggles"""
+        self.client.force_login(self.profile.user)
+        url = reverse('forum_api:topic-upvote-toggle', kwargs={'slug': self.topic.slug})
+        self.assertEqual(self.client.get(url).json(), {'updated': True, 'upvoted': True})
+        self.assertTrue(self.topic.upvotes.filter(pk=self.profile.pk).exists())
+        self.assertEqual(self.client.get(url).json(), {'updated': True, 'upvoted': False})
+
+    def test_upvote_anonymous(self):
+        """Anonymous users can not upvote, and are refused like by REST framework's IsAuthenticated"""
+        response = self.client.get(reverse('forum_api:topic-upvote-toggle', kwargs={'slug': self.topic.slug}))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {'detail': 'Authentication credentials were not provided.'})
+        response = self.client.get(reverse('forum_api:answer-upvote-toggle', kwargs={'id': 0}))
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(self.topic.upvotes.exists())
+
+    def test_upvote_missing(self):
+        """Unknown answers are 404"""
+        self.client.force_login(self.profile.user)
+        response = self.client.get(reverse('forum_api:answer-upvote-toggle', kwargs={'id': 0}))
+        self.assertEqual(response.status_code, 404)
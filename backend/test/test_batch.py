@@ -0,0 +1,58 @@
+import json
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from main.models import Faculty, Board
+
+
+class GraphQLBatchTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='user', password='password')
+        Board.objects.create(name='board', slug='board', year='2000', president=Faculty.objects.create(name='faculty'))
+
+    def post(self, body, path='graphql'):
+        return self.client.post(f'/{path}', json.dumps(body), content_type='application/json')
+
+    def test_results_in_order(self):
+        """Every operation gets its result, in the order they were sent"""
+        response = self.post([
+            {'id': 1, 'query': '{ boards { edges { node { name } } } }'},
+            {'id': 2, 'query': 'query Board($slug: String) { boards(slug: $slug) { edges { node { slug } } } }',
+             'variables': {'slug': 'board'}, 'operationName': 'Board'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [
+            {'id': 1, 'status': 200, 'data': {'boards': {'edges': [{'node': {'name': 'board'}}]}}},
+            {'id': 2, 'status': 200, 'data': {'boards': {'edges': [{'node': {'slug': 'board'}}]}}},
+        ])
+
+    def test_errors_per_operation(self):
+        """Operations that fail do not fail the batch"""
+        response = self.post([{'id': 1, 'query': '{ boards {'}, {'id': 2}, {'id': 3, 'query': '{ __typename }'}])
+        self.assertEqual(response.status_code, 200)
+        invalid, missing, valid = response.json()
+        self.assertEqual((invalid['status'], missing['status']), (400, 400))
+        self.assertIn('errors', invalid)
+        self.assertEqual(missing['errors'][0]['message'], 'Must provide query string.')
+        self.assertEqual(valid, {'id': 3, 'status': 200, 'data': {'__typename': 'PublicQuery'}})
+
+    def test_single_operation(self):
+        """Single operations are answered as before"""
+        self.assertEqual(self.post({'query': '{ __typename }'}).json(), {'data': {'__typename': 'PublicQuery'}})
+
+    @override_settings(GRAPHQL_MAX_BATCH_SIZE=2)
+    def test_bad_batches(self):
+        """Empty batches, batches that are too large and batches of anything but operations are refused"""
+        for body in ([], [{'query': '{ __typename }'}] * 3, ['{ __typename }']):
+            with self.subTest(body=body):
+                self.assertEqual(self.post(body).status_code, 400)
+
+    def test_shared_request(self):
+        """The operations of a batch share the session and the logged in user"""
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post([{'query': '{ viewer { username } }'}] * 3, path='pgraphql')
+        self.assertEqual([result['data'] for result in response.json()], [{'viewer': {'username': 'user'}}] * 3)
+        self.assertEqual(sum('django_session' in query['sql'] for query in queries.captured_queries), 1)
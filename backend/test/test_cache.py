@@ -0,0 +1,125 @@
+import threading
+import time
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from gymkhana_sac import cache, metrics
+
+
+def tiered(**options):
+    return {
+        'BACKEND': 'gymkhana_sac.cache.TieredCache',
+        'LOCATION': 'test-tiered',
+        'TIMEOUT': 60,
+        'OPTIONS': dict({'SHARED': 'default', 'LOCAL_TIMEOUT': 60, 'STALE_TIMEOUT': 60, 'LOCK_TIMEOUT': 5}, **options),
+    }
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-shared'},
+    'tiered': tiered(),
+})
+class TieredCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.cache = caches['tiered']
+        self.cache.local.clear()
+        self.cache.stats.clear()
+
+    def stats(self):
+        return cache.tiered_stats()['test-tiered']
+
+    def test_tiers(self):
+        """Values are read from the local tier first, the shared tier fills it"""
+        self.cache.set('key', 'value')
+        self.cache.local.clear()
+        self.assertEqual(self.cache.get('key'), 'value')
+        self.assertEqual(self.cache.get('key'), 'value')
+        self.assertEqual(self.cache.get('other'), None)
+        stats = self.stats()
+        self.assertEqual((stats['shared_hits'], stats['local_hits'], stats['misses']), (1, 1, 1))
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-shared'},
+        'tiered': tiered(LOCAL_TIMEOUT=0.05),
+    })
+    def test_local_timeout(self):
+        """Changes made by other processes show after LOCAL_TIMEOUT"""
+        tiered_cache = caches['tiered']
+        tiered_cache.set('key', 'old')
+        caches['default'].set(tiered_cache.make_key('key'), ('new', None))
+        self.assertEqual(tiered_cache.get('key'), 'old')
+        time.sleep(0.06)
+        self.assertEqual(tiered_cache.get('key'), 'new')
+
+    def test_versions(self):
+        """Keys are versioned per key, a new version is not served from the local tier"""
+        self.cache.set('key', 'first')
+        self.cache.incr_version('key')
+        self.assertIsNone(self.cache.get('key'))
+        self.assertEqual(self.cache.get('key', version=2), 'first')
+        self.cache.set('key', 'second', version=3)
+        self.assertEqual(self.cache.get('key', version=2), 'first')
+        self.assertTrue(self.cache.delete('key', version=2))
+        self.assertIsNone(self.cache.get('key', version=2))
+
+    def test_add(self):
+        """add only stores missing or expired keys"""
+        self.assertTrue(self.cache.add('key', 'first'))
+        self.assertFalse(self.cache.add('key', 'second'))
+        self.cache.set('expired', 'old', timeout=0.01)
+        time.sleep(0.02)
+        self.assertTrue(self.cache.add('expired', 'new'))
+        self.assertEqual(self.cache.get_many(['key', 'expired']), {'key': 'first', 'expired': 'new'})
+
+    def test_stale_while_recomputing(self):
+        """Expired values are served by get_or_set while another caller recomputes them"""
+        self.cache.set('key', 'stale', timeout=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(self.cache.get('key'))
+        lock = f"{self.cache.make_key('key')}:lock"
+        caches['default'].add(lock, True)
+        self.assertEqual(self.cache.get_or_set('key', 'fresh'), 'stale')
+        caches['default'].delete(lock)
+        self.assertEqual(self.cache.get_or_set('key', lambda: 'fresh'), 'fresh')
+        self.assertEqual(self.cache.get('key'), 'fresh')
+        stats = self.stats()
+        self.assertEqual((stats['stale_hits'], stats['recomputes']), (1, 1))
+
+    def test_stampede(self):
+        """Concurrent misses compute the value once, the other callers wait for it"""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return 'value'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(caches['tiered'].get_or_set('key', compute)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ['value'] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.stats()['lock_waits'], 4)
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-shared'},
+        'tiered': tiered(LOCK_TIMEOUT=0.05),
+    })
+    def test_lock_timeout(self):
+        """A caller giving up waiting computes the value, and leaves the lock to the caller holding it"""
+        tiered_cache = caches['tiered']
+        lock = f"{tiered_cache.make_key('key')}:lock"
+        caches['default'].add(lock, 'holder')
+        self.assertEqual(tiered_cache.get_or_set('key', lambda: 'value'), 'value')
+        self.assertEqual(caches['default'].get(lock), 'holder')
+        self.assertEqual(self.stats()['lock_waits'], 1)
+
+    def test_metrics(self):
+        """Tier statistics are exported as metrics"""
+        self.cache.get('key')
+        snapshot = metrics.registry.snapshot()
+        self.assertEqual(snapshot['cache_tier_lookups_total'][('test-tiered', 'misses')], 1)
@@ -0,0 +1,80 @@
+import json
+from django.contrib.auth.models import User
+from django.test import TestCase
+from gymkhana_sac.cache_control import PUBLIC, cache_policy
+from gymkhana_sac.schema import PublicGraphQLView
+from main.models import Faculty, Board, Society
+
+BOARDS = '{ boards(first: 5) { edges { node { name cover { sizes { name url } } } } pageInfo { hasNextPage } } }'
+
+
+class CacheControlTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.board = Board.objects.create(name='board', slug='board', year='2000',
+                                         president=Faculty.objects.create(name='faculty'))
+        Society.objects.create(name='society', slug='society', board=cls.board, description='description',
+                               published=True)
+
+    def get(self, query, path='graphql', **headers):
+        return self.client.get(f'/{path}', {'query': query}, **headers)
+
+    def test_max_age(self):
+        """GET queries may be cached as long as the shortest hint of their fields"""
+        response = self.get(BOARDS)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'max-age=300, public')
+        response = self.get('{ boards { edges { node { name upcomingEvents { edges { node { name } } } } } } }')
+        self.assertEqual(response['Cache-Control'], 'max-age=60, public')
+
+    def test_no_cache(self):
+        """Queries selecting a type without a hint, and failed queries, are not cached"""
+        self.client.force_login(User.objects.create_user(username='user', password='password'))
+        response = self.get('{ topic(first: 5) { edges { node { title } } } }', 'pgraphql')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        response = self.get('{ boards { invalid } }')
+        self.assertNotIn('Cache-Control', response)
+        self.assertNotIn('ETag', response)
+
+    def test_etag(self):
+        """Responses matching If-None-Match are answered 304"""
+        response = self.get(BOARDS)
+        self.assertIn('ETag', response)
+        response = self.get(BOARDS, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.board.name = 'renamed'
+        self.board.save()
+        response = self.get(BOARDS, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_post(self):
+        """Responses to POST requests are left alone"""
+        response = self.client.post('/graphql', json.dumps({'query': BOARDS}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Cache-Control', response)
+        self.assertNotIn('ETag', response)
+
+    def test_private(self):
+        """Responses of the private schema are only cached by the browser"""
+        self.client.force_login(User.objects.create_user(username='user', password='password'))
+        response = self.get(BOARDS, 'pgraphql')
+        self.assertEqual(response['Cache-Control'], 'max-age=300, private')
+        self.assertIn('Authorization', response['Vary'])
+
+    def test_policy(self):
+        """Fragments, operation names and mutations are accounted for"""
+        schema = PublicGraphQLView().schema
+        query = '''
+            query boards { ...boards }
+            query node { node(id: "id") { id } }
+            fragment boards on PublicQuery { boards { edges { node { ...board } } } }
+            fragment board on BoardNode { name societySet { edges { node { name } } } }
+        '''
+        self.assertEqual(cache_policy(schema, query, 'boards'), (300, PUBLIC))
+        self.assertEqual(cache_policy(schema, query, 'node'), (0, PUBLIC))
+        self.assertEqual(cache_policy(schema, query), (0, PUBLIC))
+        self.assertEqual(cache_policy(schema, '{ festivals { edges { node { name } } } }'), (600, PUBLIC))
+        self.assertEqual(cache_policy(schema, '{ __schema { types { name } } }'), (0, PUBLIC))
+        self.assertEqual(cache_policy(schema, 'mutation { tokenAuth { token } }'), (0, PUBLIC))
+        self.assertEqual(cache_policy(schema, '{'), (0, PUBLIC))
@@ -0,0 +1,98 @@
+import datetime
+import gzip
+import json
+import uuid
+from decimal import Decimal
+from unittest import skipIf, skipUnless
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils.translation import gettext_lazy
+from gymkhana_sac import encoding, middleware
+from main.models import Faculty, Board, Society
+
+BOARDS = '{ boards(first: 5) { edges { node { name slug description societySet { edges { node { name } } } } } } }'
+
+
+class EncodingTestCase(TestCase):
+    value = {
+        'datetime': datetime.datetime(2020, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+        'date': datetime.date(2020, 1, 2),
+        'decimal': Decimal('1.50'),
+        'uuid': uuid.UUID(int=1),
+        'lazy': gettext_lazy('text'),
+        'text': 'ज्ञान',
+        'list': [1, 2.5, None, True],
+    }
+
+    def assertEncodes(self, dumps):
+        self.assertEqual(json.loads(dumps(self.value)), json.loads(json.dumps(self.value, cls=DjangoJSONEncoder)))
+
+    def test_stdlib(self):
+        """The standard library encoder encodes what DjangoJSONEncoder does"""
+        self.assertEncodes(encoding.stdlib_dumps)
+
+    @skipIf(encoding.orjson is None, 'orjson is not installed')
+    def test_orjson(self):
+        """orjson encodes what DjangoJSONEncoder does, dates and times included"""
+        self.assertEncodes(encoding.orjson_dumps)
+        self.assertEqual(encoding.orjson_dumps({1: 'a'}), b'{"1":"a"}')
+
+    @override_settings(JSON_ENCODER='gymkhana_sac.encoding.stdlib_dumps')
+    def test_setting(self):
+        """dumps encodes with the JSON_ENCODER"""
+        self.assertEqual(encoding.dumps({'a': [1]}), b'{"a":[1]}')
+        self.assertEqual(b''.join(encoding.iter_json_list([{'a': 1}, 2])), b'[\n{"a":1},\n2\n]\n')
+
+
+class CompressionTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        board = Board.objects.create(name='board', slug='board', year='2000', description='description ' * 100,
+                                     president=Faculty.objects.create(name='faculty'))
+        for index in range(10):
+            Society.objects.create(name=f'society {index}', slug=f'society-{index}', board=board,
+                                   description='description', published=True)
+
+    def get(self, accept_encoding='gzip, deflate', **headers):
+        return self.client.get('/graphql', {'query': BOARDS}, HTTP_ACCEPT_ENCODING=accept_encoding, **headers)
+
+    def test_gzip(self):
+        """Responses are gzipped when the client accepts it, with a weak ETag still matching"""
+        response = self.get()
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        data = json.loads(gzip.decompress(response.content))
+        self.assertEqual(len(data['data']['boards']['edges'][0]['node']['societySet']['edges']), 10)
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_not_accepted(self):
+        """Clients not accepting compression get the JSON as is"""
+        response = self.get('identity')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertIn('data', response.json())
+
+    @override_settings(COMPRESSION_MIN_SIZE=100000)
+    def test_min_size(self):
+        """Short responses are not compressed"""
+        self.assertNotIn('Content-Encoding', self.get())
+
+    @skipUnless(middleware.brotli, 'brotli is not installed')
+    def test_brotli(self):
+        """Brotli is preferred when accepted"""
+        response = self.get('gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertIn('data', json.loads(middleware.brotli.decompress(response.content)))
+
+    def test_streaming(self):
+        """Streamed responses are compressed as they stream, event streams are left alone"""
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        compression = middleware.CompressionMiddleware(lambda request: None)
+        response = compression.process_response(request, StreamingHttpResponse(
+            encoding.iter_json_list(range(1000)), content_type='application/json'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(b''.join(response.streaming_content))), list(range(1000)))
+        response = compression.process_response(request, StreamingHttpResponse(
+            iter([b'data: 1\n\n']), content_type='text/event-stream'))
+        self.assertNotIn('Content-Encoding', response)
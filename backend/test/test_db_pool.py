@@ -0,0 +1,150 @@
+import os
+import tempfile
+import threading
+from django.db import connection
+from django.db.backends.sqlite3 import base
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase
+from gymkhana_sac import metrics
+from gymkhana_sac.db import pool
+from gymkhana_sac.db.mixins import HealthCheckMixin, PoolMixin
+from gymkhana_sac.db.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection(object):
+    def __init__(self, usable=True):
+        self.usable = usable
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTestCase(SimpleTestCase):
+    def test_reuse(self):
+        """Returned connections are handed out again instead of opening new ones"""
+        connections = ConnectionPool(2)
+        first, reused = connections.get(FakeConnection)
+        self.assertFalse(reused)
+        connections.put(first)
+        self.assertEqual(connections.get(FakeConnection), (first, True))
+        self.assertEqual(connections.stats(), {'size': 2, 'in_use': 1, 'idle': 0, 'opened': 1, 'waits': 0,
+                                               'timeouts': 0})
+
+    def test_check(self):
+        """Idle connections failing the check, or idle for too long, are closed and replaced"""
+        connections = ConnectionPool(2, max_idle=60)
+        broken, _ = connections.get(lambda: FakeConnection(usable=False))
+        connections.put(broken)
+        connection, reused = connections.get(FakeConnection, check=lambda c: c.usable)
+        self.assertFalse(reused)
+        self.assertTrue(broken.closed)
+        connections.max_idle = -1
+        connections.put(connection)
+        self.assertFalse(connections.get(FakeConnection)[1])
+        self.assertTrue(connection.closed)
+
+    def test_timeout(self):
+        """Checkouts wait for a free connection and give up after the timeout"""
+        connections = ConnectionPool(1, timeout=0.05)
+        connection, _ = connections.get(FakeConnection)
+        with self.assertRaises(PoolTimeout):
+            connections.get(FakeConnection)
+        threading.Timer(0.01, connections.put, (connection,)).start()
+        connections.timeout = 5
+        self.assertEqual(connections.get(FakeConnection), (connection, True))
+        stats = connections.stats()
+        self.assertEqual((stats['waits'], stats['timeouts']), (2, 1))
+
+    def test_discard(self):
+        """Discarded connections are closed and free their slot"""
+        connections = ConnectionPool(1, timeout=0)
+        connection, _ = connections.get(FakeConnection)
+        connections.discard(connection)
+        self.assertTrue(connection.closed)
+        self.assertFalse(connections.get(FakeConnection)[1])
+
+    def test_failed_connect(self):
+        """A connection that fails to open does not take a slot"""
+        connections = ConnectionPool(1, timeout=0)
+
+        def connect():
+            raise OSError
+
+        with self.assertRaises(OSError):
+            connections.get(connect)
+        self.assertEqual(connections.stats()['in_use'], 0)
+        connections.get(FakeConnection)
+
+
+class PooledDatabaseWrapper(HealthCheckMixin, PoolMixin, base.DatabaseWrapper):
+    # SQLite connections are always usable, unlike PostgreSQL ones the server closed
+    def is_usable(self):
+        return pool.ping(self.connection)
+
+
+class DatabaseWrapperTestCase(SimpleTestCase):
+    def setUp(self):
+        descriptor, self.path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descriptor)
+        self.alias = f'pooled-{id(self)}'
+
+    def tearDown(self):
+        pool._pools.pop((self.alias, os.getpid()), None)
+        os.remove(self.path)
+
+    def wrapper(self, **options):
+        settings_dict = dict(connection.settings_dict, NAME=self.path, **options)
+        return PooledDatabaseWrapper(settings_dict, self.alias)
+
+    def test_pooled_connections(self):
+        """Closing a pooled connection hands it back, the next one reuses it"""
+        first = self.wrapper(POOL_SIZE=1, POOL_TIMEOUT=0)
+        first.ensure_connection()
+        raw = first.connection
+        self.assertFalse(first.reused_connection)
+        second = self.wrapper(POOL_SIZE=1, POOL_TIMEOUT=0)
+        with self.assertRaises(OperationalError):
+            second.ensure_connection()
+        first.close()
+        second.ensure_connection()
+        self.assertIs(second.connection, raw)
+        self.assertTrue(second.reused_connection)
+        with second.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            self.assertEqual(cursor.fetchone(), (1,))
+        second.close()
+        self.assertEqual(pool.pool_stats()[self.alias], {'size': 1, 'in_use': 0, 'idle': 1, 'opened': 1,
+                                                         'waits': 1, 'timeouts': 1})
+
+    def test_health_check(self):
+        """A persistent connection that broke between requests is reopened on first use"""
+        wrapper = self.wrapper(CONN_MAX_AGE=None, CONN_HEALTH_CHECKS=True)
+        wrapper.ensure_connection()
+        broken = wrapper.connection
+        wrapper.close_if_unusable_or_obsolete()
+        broken.close()
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.assertIsNot(wrapper.connection, broken)
+        wrapper.close()
+
+    def test_without_health_check(self):
+        """Without CONN_HEALTH_CHECKS, the connection is used as it is"""
+        wrapper = self.wrapper(CONN_MAX_AGE=None, CONN_HEALTH_CHECKS=False)
+        wrapper.ensure_connection()
+        kept = wrapper.connection
+        wrapper.close_if_unusable_or_obsolete()
+        wrapper.ensure_connection()
+        self.assertIs(wrapper.connection, kept)
+        wrapper.close()
+
+    def test_pool_metrics(self):
+        """The pool gauges are read from the pools when metrics are snapshotted"""
+        wrapper = self.wrapper(POOL_SIZE=2)
+        wrapper.ensure_connection()
+        snapshot = metrics.registry.snapshot()
+        wrapper.close()
+        self.assertEqual(snapshot['db_pool_size'][(self.alias,)], 2)
+        self.assertEqual(snapshot['db_pool_connections'][(self.alias, 'in_use')], 1)
+        self.assertEqual(snapshot['db_pool_connections'][(self.alias, 'idle')], 0)
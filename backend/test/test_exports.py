@@ -0,0 +1,90 @@
+import csv
+import json
+from io import StringIO
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.auth.models import Permission, User
+from django.test import TestCase
+from django.urls import reverse
+from forum.models import Topic, Answer
+from main.models import Contact
+from oauth.models import UserProfile
+from test.test_assets import get_random_date
+
+
+def streamed(response):
+    return b''.join(response.streaming_content).decode()
+
+
+class ExportTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username='staff', password='password', is_staff=True)
+        cls.superuser = User.objects.create_superuser(username='admin', password='password')
+        cls.profile = UserProfile.objects.create(user=User.objects.create(username='user_1', first_name='First'),
+                                                 dob=get_random_date(), roll='B20CS001', phone='9999999999')
+        Contact.objects.create(name='contact_1', email='a@b.com', phone='9999999999', subject='subject',
+                               message='line one, "quoted"\nline two')
+        Contact.objects.create(name='contact_2', email='c@d.com', phone='8888888888', subject='other', message='')
+        cls.topic = Topic.objects.create(author=cls.profile, title='Topic', content='<p>content</p>')
+        cls.topic.upvotes.add(cls.profile)
+        Answer.objects.create(topic=cls.topic, author=cls.profile, content='<p>answer</p>')
+
+    def test_contacts_csv(self):
+        """Contacts stream as CSV with a header row and quoted fields"""
+        self.client.force_login(self.superuser)
+        response = self.client.get(reverse('export-contacts', kwargs={'fmt': 'csv'}))
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="contacts-', response['Content-Disposition'])
+        rows = list(csv.reader(StringIO(streamed(response))))
+        self.assertEqual(rows[0], ['name', 'email', 'phone', 'subject', 'message', 'timestamp'])
+        self.assertEqual([row[0] for row in rows[1:]], ['contact_2', 'contact_1'])
+        self.assertEqual(rows[2][4], 'line one, "quoted"\nline two')
+
+    def test_csv_formulas_escaped(self):
+        """CSV cells a spreadsheet would run as formulas are quoted, JSON keeps them as is"""
+        formula = '=HYPERLINK("https://example.com", "click")'
+        Contact.objects.create(name='-contact_3', email='e@f.com', phone='7777777777', subject='subject',
+                               message=formula)
+        self.client.force_login(self.superuser)
+        rows = list(csv.reader(StringIO(streamed(self.client.get(reverse('export-contacts', kwargs={'fmt': 'csv'}))))))
+        self.assertEqual(rows[1][0], "'-contact_3")
+        self.assertEqual(rows[1][4], "'" + formula)
+        self.assertEqual(rows[2][0], 'contact_2')
+        data = json.loads(streamed(self.client.get(reverse('export-contacts', kwargs={'fmt': 'json'}))))
+        self.assertEqual(data[0]['message'], formula)
+
+    def test_profiles_json(self):
+        """Profiles stream as a JSON array of objects keyed by header"""
+        self.client.force_login(self.superuser)
+        response = self.client.get(reverse('export-profiles', kwargs={'fmt': 'json'}))
+        data = json.loads(streamed(response))
+        self.assertEqual(len(data), 1)
+        self.assertEqual(data[0]['roll'], 'B20CS001')
+        self.assertEqual(data[0]['first_name'], 'First')
+
+    def test_forum_activity(self):
+        """Forum activity chains topic and answer rows"""
+        self.client.force_login(self.superuser)
+        data = json.loads(streamed(self.client.get(reverse('export-forum-activity', kwargs={'fmt': 'json'}))))
+        self.assertEqual([(row['kind'], row['upvotes']) for row in data], [('topic', 1), ('answer', 0)])
+        self.assertEqual(data[1]['topic'], self.topic.slug)
+
+    def test_permissions(self):
+        """Exports need staff status and the view permission of the exported model"""
+        response = self.client.get(reverse('export-contacts', kwargs={'fmt': 'csv'}))
+        self.assertEqual(response.status_code, 302)
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('export-contacts', kwargs={'fmt': 'csv'}))
+        self.assertEqual(response.status_code, 403)
+        self.staff.user_permissions.add(Permission.objects.get(codename='view_contact'))
+        response = self.client.get(reverse('export-contacts', kwargs={'fmt': 'csv'}))
+        self.assertEqual(response.status_code, 200)
+
+    def test_admin_action(self):
+        """The admin action exports only the selected rows"""
+        self.client.force_login(self.superuser)
+        contact = Contact.objects.get(name='contact_1')
+        response = self.client.post(reverse('admin:main_contact_changelist'), {
+            'action': 'export_csv', ACTION_CHECKBOX_NAME: [contact.pk]})
+        rows = list(csv.reader(StringIO(streamed(response))))
+        self.assertEqual([row[0] for row in rows[1:]], ['contact_1'])
@@ -0,0 +1,76 @@
+import json
+from unittest import mock
+from django.contrib.auth.models import AnonymousUser, User
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from forum.models import Topic, Answer
+from graphql_jwt.shortcuts import get_token
+from gymkhana_sac import auth
+from oauth.models import UserProfile
+from test.test_assets import get_random_date
+
+QUERY = '{ topic(first: 10) { edges { node { isAuthor isUpvoted answerSet { edges { node { isAuthor } } } } } } }'
+
+
+class JSONWebTokenTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='user', password='password')
+        cls.profile = UserProfile.objects.create(user=cls.user, roll='B20CS001', dob=get_random_date(),
+                                                 phone='9999999999')
+        for index in range(3):
+            topic = Topic.objects.create(author=cls.profile, title=f'topic {index}', slug=f'topic-{index}',
+                                         content='<p>topic</p>')
+            topic.upvotes.add(cls.profile)
+            Answer.objects.create(topic=topic, author=cls.profile, content='<p>answer</p>')
+
+    def setUp(self):
+        auth._payloads.clear()
+
+    def post(self, token, query=QUERY):
+        return self.client.post('/pgraphql', json.dumps({'query': query}), content_type='application/json',
+                                HTTP_AUTHORIZATION=f'Bearer {token}').json()
+
+    def test_authenticated_once(self):
+        """The token is verified and the user loaded with its profile once per request"""
+        with mock.patch.object(auth, 'get_payload', wraps=auth.get_payload) as get_payload:
+            with CaptureQueriesContext(connection) as queries:
+                body = self.post(get_token(self.user))
+        self.assertEqual(get_payload.call_count, 1)
+        node = body['data']['topic']['edges'][0]['node']
+        self.assertEqual((node['isAuthor'], node['isUpvoted']), (True, True))
+        self.assertEqual(node['answerSet']['edges'], [{'node': {'isAuthor': True}}])
+        user_queries = [query['sql'] for query in queries.captured_queries if 'FROM "auth_user"' in query['sql']]
+        self.assertEqual(len(user_queries), 1)
+        self.assertIn('"oauth_userprofile"', user_queries[0])
+        # profiles are only read by the prefetch of the upvoters, never one by one
+        self.assertFalse(any('FROM "oauth_userprofile" WHERE' in query['sql'] for query in queries.captured_queries))
+
+    def test_payload_cache(self):
+        """Verified payloads are reused by later requests with the same token"""
+        token = get_token(self.user)
+        with mock.patch.object(auth, 'get_payload', wraps=auth.get_payload) as get_payload:
+            self.post(token)
+            self.post(token)
+        self.assertEqual(get_payload.call_count, 1)
+
+    def test_invalid_token(self):
+        """Invalid tokens fail the top level fields"""
+        body = self.post('invalid', '{ viewer { username } }')
+        self.assertEqual(body['errors'][0]['message'], 'Error decoding signature')
+
+    def test_inactive_user(self):
+        """Tokens of inactive users are refused"""
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        body = self.post(get_token(self.user), '{ viewer { username } }')
+        self.assertEqual(body['errors'][0]['message'], 'User is disabled')
+
+    def test_viewer_profile_id(self):
+        """The viewer's profile id is read from the user loaded with it"""
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        self.assertIsNone(auth.viewer_profile_id(request))
+        request.user = User.objects.select_related('userprofile').get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(auth.viewer_profile_id(request), self.profile.id)
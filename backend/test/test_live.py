@@ -0,0 +1,124 @@
+import asyncio
+import json
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from forum.live import FORUM_CHANNEL, topic_channel
+from forum.models import Topic, Answer
+from gymkhana_sac.pubsub import CacheBroker, LocalBroker, get_broker
+from oauth.models import UserProfile
+from test.test_assets import get_random_date
+
+
+def sse_messages(response):
+    return [dict(line.split(': ', 1) for line in message.split('\n'))
+            for message in response.content.decode().split('\n\n') if message]
+
+
+class BrokerTestCase(SimpleTestCase):
+    def check_broker(self, broker):
+        self.assertEqual(broker.read('channel', 0), (0, []))
+        self.assertEqual([broker.publish('channel', {'index': index}) for index in range(5)], [1, 2, 3, 4, 5])
+        self.assertEqual(broker.read('channel', 3), (5, [(4, {'index': 3}), (5, {'index': 4})]))
+        # only the last events are kept
+        self.assertEqual(broker.read('channel', 0),
+                         (5, [(event_id, {'index': event_id - 1}) for event_id in (3, 4, 5)]))
+        self.assertEqual(broker.read('other', 0), (0, []))
+
+        wait = async_to_sync(broker.wait)
+        self.assertEqual(wait('channel', 4, 0), (5, [(5, {'index': 4})]))
+        self.assertEqual(wait('channel', 5, 0), (5, []))
+        self.assertEqual(wait('channel', None, 0), (5, []))
+        self.assertEqual(wait('channel', 9, 10), (5, []))
+
+        async def publish_later():
+            asyncio.get_event_loop().call_later(0.05, broker.publish, 'channel', {'index': 5})
+            return await broker.wait('channel', None, 10)
+        self.assertEqual(async_to_sync(publish_later)(), (6, [(6, {'index': 5})]))
+        self.assertEqual(broker.waiters, set())
+
+    def test_local(self):
+        """The local broker keeps the last events of its channels and wakes up waiting subscribers"""
+        self.check_broker(LocalBroker(retention=3, poll_interval=5))
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                           'LOCATION': 'pubsub'}})
+    def test_cache(self):
+        """The cache broker does the same through the cache"""
+        broker = CacheBroker(retention=3, poll_interval=5)
+        self.check_broker(broker)
+        # events published by other processes are seen when polling, missing ones are skipped
+        broker.cache.incr(broker.key('channel'), 2)
+        broker.cache.set(broker.key('channel', 8), {'index': 7})
+        self.assertEqual(broker.read('channel', 6), (8, [(8, {'index': 7})]))
+        # the last event is still being written
+        broker.cache.incr(broker.key('channel'))
+        self.assertEqual(broker.read('channel', 8), (8, []))
+
+
+class LiveTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = UserProfile.objects.create(user=User.objects.create_user(username='user', password='password'),
+                                                 roll='B20CS001', dob=get_random_date(), phone='9999999999')
+        cls.topic = Topic.objects.create(author=cls.profile, title='Topic', slug='topic', content='<p>content</p>')
+
+    def last_id(self, channel=FORUM_CHANNEL):
+        return get_broker().read(channel, 0)[0]
+
+    def events(self, channel, after):
+        return [event for _, event in get_broker().read(channel, after)[1]]
+
+    def test_events(self):
+        """Answers, upvotes and topic edits are published to the forum and to their topic once committed"""
+        after, topic_after = self.last_id(), self.last_id(topic_channel('topic'))
+        with self.captureOnCommitCallbacks(execute=True):
+            answer = Answer.objects.create(topic=self.topic, author=self.profile, content='<p>answer</p>')
+            self.assertEqual(self.last_id(), after)
+        with self.captureOnCommitCallbacks(execute=True):
+            answer.upvotes.add(self.profile)
+            self.profile.topic_upvotes.add(self.topic)
+            self.topic.title = 'Edited'
+            self.topic.save()
+        expected = [
+            {'type': 'answer', 'topic': 'topic', 'id': answer.id, 'topicId': self.topic.id},
+            {'type': 'upvotes', 'topic': 'topic', 'id': answer.id, 'isTopic': False, 'count': 1},
+            {'type': 'upvotes', 'topic': 'topic', 'id': self.topic.id, 'isTopic': True, 'count': 1},
+            {'type': 'topic', 'topic': 'topic', 'id': self.topic.id, 'title': 'Edited', 'created': False},
+        ]
+        self.assertEqual(self.events(FORUM_CHANNEL, after), expected)
+        self.assertEqual(self.events(topic_channel('topic'), topic_after), expected)
+
+    def test_event_stream(self):
+        """EventSource clients get the events after their Last-Event-ID, or just the id to start from"""
+        response = self.client.get('/live/forum/topic', HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        message = sse_messages(response)[0]
+        self.assertEqual(message['retry'], '5000')
+        start = message['id']
+        get_broker().publish(topic_channel('topic'), {'type': 'answer', 'id': 1})
+        response = self.client.get('/live/forum/topic', HTTP_ACCEPT='text/event-stream', HTTP_LAST_EVENT_ID=start)
+        message = sse_messages(response)[0]
+        self.assertEqual(int(message['id']), int(start) + 1)
+        self.assertEqual(json.loads(message['data']), {'type': 'answer', 'id': 1})
+
+    def test_long_poll(self):
+        """Other clients get the events as JSON, and are told to fetch again when they missed some"""
+        after = self.last_id()
+        get_broker().publish(FORUM_CHANNEL, {'type': 'topic', 'id': 1})
+        body = self.client.get('/live/forum', {'after': after}).json()
+        self.assertEqual(body, {'lastEventId': after + 1, 'retry': 5000,
+                                'events': [{'eventId': after + 1, 'type': 'topic', 'id': 1}]})
+        body = self.client.get('/live/forum', {'after': after + 100}).json()
+        self.assertEqual(body['events'], [{'eventId': after + 1, 'type': 'reset'}])
+        self.assertEqual(self.client.get('/live/forum', {'after': 'last'}).status_code, 400)
+        self.assertEqual(self.client.post('/live/forum').status_code, 405)
+
+    @override_settings(LIVE_TIMEOUT=10)
+    async def test_wait(self):
+        """ASGI requests wait for the next event"""
+        asyncio.get_event_loop().call_later(0.05, get_broker().publish, topic_channel('waiting'), {'type': 'answer'})
+        response = await self.async_client.get('/live/forum/waiting')
+        self.assertEqual(response.json()['events'], [{'eventId': 1, 'type': 'answer'}])
+        self.assertEqual(response.json()['retry'], 1000)
@@ -0,0 +1,124 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from gymkhana_sac.metrics import registry, Counter, Histogram, Registry, REQUESTS
+
+METRICS_DIR = tempfile.mkdtemp()
+
+
+def sample(text, name, **labels):
+    """Value of the sample with exactly these labels in the exposition text"""
+    formatted = ','.join(f'{label}="{value}"' for label, value in labels.items())
+    name = f'{name}{{{formatted}}}' if formatted else name
+    match = re.search(rf'^{re.escape(name)} (\S+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+# benchmark.urls mounts the app namespaces the 404 page links to
+@override_settings(ROOT_URLCONF='benchmark.urls', METRICS_ENABLED=True, METRICS_DIR=METRICS_DIR)
+class MetricsTestCase(TestCase):
+    def setUp(self):
+        registry.reset()
+        shutil.rmtree(METRICS_DIR, ignore_errors=True)
+
+    def scrape(self, **headers):
+        return self.client.get('/metrics', **headers)
+
+    def test_request_metrics(self):
+        """Requests are counted per view with their SQL statements"""
+        self.client.post('/graphql', json.dumps({'query': 'query Boards { boards { edges { node { name } } } }',
+                                                 'operationName': 'Boards'}), content_type='application/json')
+        text = self.scrape().content.decode()
+        view = 'gymkhana_sac.schema.PublicGraphQLView'
+        self.assertEqual(sample(text, 'http_requests_total', view=view, method='POST', status='200'), 1)
+        self.assertEqual(sample(text, 'http_request_duration_seconds_count', view=view, method='POST'), 1)
+        self.assertGreater(sample(text, 'db_queries_per_request_sum', view=view), 0)
+        self.assertEqual(sample(text, 'graphql_operation_duration_seconds_count', endpoint='/graphql',
+                                operation='Boards'), 1)
+
+    def test_graphql_errors(self):
+        """GraphQL errors are counted by operation and top level field"""
+        self.client.post('/pgraphql', json.dumps({'query': '{ viewer { username } }'}),
+                         content_type='application/json')
+        text = self.scrape().content.decode()
+        self.assertEqual(sample(text, 'graphql_errors_total', endpoint='/pgraphql', operation='anonymous',
+                                field='viewer'), 1)
+
+    def test_cache_metrics(self):
+        """Cache lookups are counted per alias as hits and misses"""
+        self.scrape()
+        cache.set('metrics', 1)
+        cache.get('metrics')
+        cache.get('missing')
+        cache.get_many(['metrics', 'missing'])
+        text = self.scrape().content.decode()
+        self.assertEqual(sample(text, 'cache_requests_total', cache='default', result='hit'), 2)
+        self.assertEqual(sample(text, 'cache_requests_total', cache='default', result='miss'), 2)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token(self):
+        """With a token configured, scrapes have to send it"""
+        self.assertEqual(self.scrape().status_code, 401)
+        response = self.scrape(HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        """The endpoint does not exist unless metrics are enabled"""
+        self.assertEqual(self.scrape().status_code, 404)
+
+
+class RegistryTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.registry = Registry()
+        self.counter = Counter('test_total', 'Test counter', ('kind',))
+        self.histogram = Histogram('test_seconds', 'Test histogram', buckets=(0.1, 1))
+        for metric in (self.counter, self.histogram):
+            self.registry.register(metric)
+            metric.values = {}
+
+    def tearDown(self):
+        # the metrics register themselves with the global registry as well
+        for name in ('test_total', 'test_seconds'):
+            registry.metrics.pop(name)
+
+    def test_histogram_exposition(self):
+        """Histogram buckets are cumulative, with sum and count"""
+        for value in (0.05, 0.1, 0.5, 5):
+            self.histogram.observe(value)
+        text = self.registry.render(self.registry.collect(self.directory))
+        self.assertIn('# TYPE test_seconds histogram', text)
+        self.assertEqual(sample(text, 'test_seconds_bucket', le='0.1'), 2)
+        self.assertEqual(sample(text, 'test_seconds_bucket', le='1'), 3)
+        self.assertEqual(sample(text, 'test_seconds_bucket', le='+Inf'), 4)
+        self.assertEqual(sample(text, 'test_seconds_sum'), 5.65)
+        self.assertEqual(sample(text, 'test_seconds_count'), 4)
+
+    def test_processes_aggregate(self):
+        """Files of other workers add up, and those of dead workers are folded into the archive"""
+        self.counter.inc(kind='a')
+        other_worker = os.path.join(self.directory, f'{os.getppid()}-worker.json')
+        dead_worker = os.path.join(self.directory, '999999999-dead.json')
+        for path, value in ((other_worker, 2), (dead_worker, 4)):
+            Registry.dump({'test_total': {('a',): value}, 'unknown_total': {(): 1}}, path)
+        merged = self.registry.collect(self.directory)
+        self.assertEqual(merged['test_total'], {('a',): 7})
+        self.assertFalse(os.path.exists(dead_worker))
+        self.assertEqual(self.registry.collect(self.directory)['test_total'], {('a',): 7})
+
+    def test_label_escaping(self):
+        """Label values are escaped"""
+        self.counter.inc(kind='say "hi"\n')
+        text = self.registry.render(self.registry.collect(self.directory))
+        self.assertIn(r'test_total{kind="say \"hi\"\n"} 1', text)
+
+    def test_global_metrics_registered(self):
+        """The request metrics belong to the global registry"""
+        self.assertIs(registry.metrics['http_requests_total'], REQUESTS)
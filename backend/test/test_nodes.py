@@ -0,0 +1,71 @@
+import json
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from graphql_relay import to_global_id
+from main.models import Faculty, Board, Society
+from oauth.models import UserProfile
+from test.test_assets import get_random_date
+
+QUERY = 'query ($ids: [ID!]!) { nodes(ids: $ids) { id ... on SocietyNode { name } ... on BoardNode { slug } } }'
+
+
+class NodesTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.board = Board.objects.create(name='board', slug='board', year='2000',
+                                         president=Faculty.objects.create(name='faculty'))
+        cls.societies = [Society.objects.create(name=f'society {index}', slug=f'society-{index}', board=cls.board,
+                                                description='description', published=True) for index in range(3)]
+
+    def query(self, ids, path='graphql', query=QUERY):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f'/{path}', json.dumps({'query': query, 'variables': {'ids': ids}}),
+                                        content_type='application/json')
+        return response.json(), [query['sql'] for query in queries.captured_queries]
+
+    def test_input_order(self):
+        """Nodes come back in the order of the ids, one query per type"""
+        ids = [to_global_id('SocietyNode', society.pk) for society in reversed(self.societies)]
+        ids.insert(1, to_global_id('BoardNode', self.board.pk))
+        body, queries = self.query(ids)
+        self.assertEqual(body['data']['nodes'], [
+            {'id': ids[0], 'name': 'society 2'},
+            {'id': ids[1], 'slug': 'board'},
+            {'id': ids[2], 'name': 'society 1'},
+            {'id': ids[3], 'name': 'society 0'},
+        ])
+        society_queries = [sql for sql in queries if 'FROM "main_society"' in sql]
+        self.assertEqual(len(society_queries), 1)
+        self.assertIn(' IN (', society_queries[0])
+        self.assertNotIn('"main_society"."description"', society_queries[0])
+        self.assertEqual(len(queries), 2)
+
+    def test_misses(self):
+        """Ids that do not resolve to a node are null"""
+        ids = [to_global_id('SocietyNode', 0), 'invalid', to_global_id('SocietyNode', 'abc'),
+               to_global_id('ImageType', 1), to_global_id('SocietyNode', self.societies[0].pk)]
+        body, _ = self.query(ids)
+        self.assertEqual(body['data']['nodes'], [None, None, None, None, {'id': ids[-1], 'name': 'society 0'}])
+
+    def test_repeated_ids(self):
+        """An id given twice resolves twice"""
+        society_id = to_global_id('SocietyNode', self.societies[0].pk)
+        body, _ = self.query([society_id, society_id])
+        self.assertEqual(body['data']['nodes'], [{'id': society_id, 'name': 'society 0'}] * 2)
+
+    def test_limit(self):
+        """Lookups take at most as many ids as a connection page has nodes"""
+        body, _ = self.query([to_global_id('SocietyNode', 1)] * 101)
+        self.assertIn('exceeds the limit of 100', body['errors'][0]['message'])
+
+    def test_private_schema(self):
+        """The private schema looks nodes up with nodesByIds, its nodes field is the search"""
+        user = User.objects.create_user(username='user', password='password')
+        profile = UserProfile.objects.create(user=user, roll='B20CS001', dob=get_random_date(), phone='9999999999')
+        self.client.force_login(user)
+        profile_id = to_global_id('UserProfileNode', profile.pk)
+        body, _ = self.query([profile_id], 'pgraphql',
+                             'query ($ids: [ID!]!) { nodesByIds(ids: $ids) { ... on UserProfileNode { roll } } }')
+        self.assertEqual(body['data']['nodesByIds'], [{'roll': 'B20CS001'}])
@@ -0,0 +1,99 @@
+import json
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from forum.models import Topic, Answer
+from graphql_relay import to_global_id
+from gymkhana_sac.optimizer import Plan, hints
+from main.models import Faculty, Board, Society
+from main.schema import SocietyNode
+from oauth.models import UserProfile
+from test.test_assets import get_random_date
+
+
+class QueryOptimizerTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profiles = []
+        for index in range(3):
+            user = User.objects.create_user(username=f'user_{index}', password='password', first_name='First')
+            cls.profiles.append(UserProfile.objects.create(user=user, roll=f'B20CS00{index}', dob=get_random_date(),
+                                                           phone='9999999999', about='about'))
+        board = Board.objects.create(name='board', slug='board', year='2000',
+                                     president=Faculty.objects.create(name='faculty'))
+        for index, profile in enumerate(cls.profiles):
+            Society.objects.create(name=f'society {index}', slug=f'society-{index}', board=board, secretary=profile,
+                                   description='description', custom_html='<p>html</p>', published=True)
+            topic = Topic.objects.create(author=profile, title=f'topic {index}', slug=f'topic-{index}',
+                                         content='<p>topic</p>')
+            topic.upvotes.add(*cls.profiles)
+            for author in cls.profiles:
+                Answer.objects.create(topic=topic, author=author, content='<p>answer</p>').upvotes.add(profile)
+
+    def query(self, query, path='graphql', **variables):
+        """Runs ``query``, returning its data and the SQL it ran"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f'/{path}', json.dumps({'query': query, 'variables': variables}),
+                                        content_type='application/json')
+        body = response.json()
+        self.assertNotIn('errors', body)
+        return body['data'], ' '.join(query['sql'] for query in queries.captured_queries)
+
+    def test_only_selected_fields(self):
+        """Columns that are not selected are not loaded"""
+        data, sql = self.query('{ societies { edges { node { name secretary { roll } } } } }')
+        self.assertEqual(data['societies']['edges'][0]['node']['secretary']['roll'], 'B20CS000')
+        self.assertIn('"main_society"."name"', sql)
+        self.assertIn('"oauth_userprofile"."roll"', sql)
+        for column in ('"main_society"."description"', '"main_society"."custom_html"', '"oauth_userprofile"."about"'):
+            self.assertNotIn(column, sql)
+
+    def test_fragments_and_directives(self):
+        """Fields of fragments are loaded, fields skipped by directives are not"""
+        data, sql = self.query('query ($about: Boolean!) { societies { edges { node { ...Society '
+                               'description @include(if: $about) } } } } fragment Society on SocietyNode { slug }',
+                               about=False)
+        self.assertEqual(data['societies']['edges'][0]['node'], {'slug': 'society-0'})
+        self.assertIn('"main_society"."slug"', sql)
+        self.assertNotIn('"main_society"."description"', sql)
+
+    def test_resolver_without_hints(self):
+        """Fields whose resolvers do not declare what they read load the whole model"""
+        self.assertEqual(Plan(None).walk(SocietyNode, {'name': [], 'cover': []}), {'name', 'cover'})
+        self.assertIsNone(Plan(None).walk(SocietyNode, {'name': [], 'computed': []}))
+
+    def test_nested_connections_prefetched(self):
+        """Connections of related objects and counts are prefetched, the queries do not grow with the objects"""
+        query = ('{ topic(first: 10) { edges { node { title upvotesCount answersCount answerSet { edges { node { '
+                 'content upvotesCount isUpvoted author { roll } } } } } } } }')
+        self.client.force_login(self.profiles[0].user)
+        with CaptureQueriesContext(connection) as few:
+            self.query(query, path='pgraphql')
+        topic = Topic.objects.create(author=self.profiles[0], title='topic', slug='topic', content='<p>topic</p>')
+        topic.upvotes.add(*self.profiles)
+        for author in self.profiles:
+            Answer.objects.create(topic=topic, author=author, content='<p>answer</p>').upvotes.add(author)
+        with CaptureQueriesContext(connection) as many:
+            data, sql = self.query(query, path='pgraphql')
+        self.assertEqual(len(few), len(many))
+        node = data['topic']['edges'][0]['node']
+        self.assertEqual((node['upvotesCount'], node['answersCount']), (3, 3))
+        self.assertEqual(len(node['answerSet']['edges']), 3)
+        self.assertNotIn('"forum_topic"."content"', sql)
+
+    def test_node(self):
+        """Node lookups load the fields of inline fragments on their type"""
+        node_id = to_global_id('SocietyNode', Society.objects.first().pk)
+        _, sql = self.query('query ($id: ID!) { node(id: $id) { ... on SocietyNode { name } } }', id=node_id)
+        self.assertIn('"main_society"."name"', sql)
+        self.assertNotIn('"main_society"."description"', sql)
+
+    def test_hints(self):
+        """hints marks the resolver with what it reads"""
+        @hints(only=('cover',), prefetch_related=('upvotes',))
+        def resolve_cover(self, info):
+            pass
+
+        self.assertEqual(resolve_cover.optimizer_hints.only, ('cover',))
+        self.assertEqual(resolve_cover.optimizer_hints.prefetch_related, ('upvotes',))
@@ -0,0 +1,139 @@
+import socketserver
+import threading
+from datetime import timedelta
+from email import message_from_bytes, policy
+from io import StringIO
+
+from django.core.mail import send_mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from outbox.models import Email
+from outbox.sender import send_batch
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 localhost')
+        sender, recipients = None, []
+        for line in self.rfile:
+            command = line.decode().rstrip('\r\n')
+            verb = command[:4].upper()
+            if verb in ('HELO', 'EHLO'):
+                self.reply('250 localhost')
+            elif verb == 'MAIL':
+                sender, recipients = command[10:].strip('<>'), []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipient = command[8:].strip('<>')
+                if recipient in self.server.refused:
+                    self.reply('550 No such user')
+                else:
+                    recipients.append(recipient)
+                    self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                for data_line in self.rfile:
+                    if data_line == b'.\r\n':
+                        break
+                    data.append(data_line[1:] if data_line.startswith(b'.') else data_line)
+                self.server.messages.append((sender, recipients, b''.join(data)))
+                self.reply('250 OK')
+            elif verb in ('RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Local SMTP server keeping the messages it accepts, and refusing the recipients of ``refused``"""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+        self.connections = 0
+        self.messages = []
+        self.refused = set()
+
+
+@override_settings(EMAIL_BACKEND='outbox.backends.OutboxBackend',
+                   OUTBOX_EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend', EMAIL_HOST='127.0.0.1',
+                   EMAIL_USE_SSL=False, EMAIL_USE_TLS=False, EMAIL_HOST_USER='', EMAIL_TIMEOUT=5,
+                   OUTBOX_BATCH_SIZE=10, OUTBOX_RETRY_DELAY=60, OUTBOX_MAX_ATTEMPTS=2, OUTBOX_RATE_LIMITS={'*': 100},
+                   OUTBOX_RATE_WINDOW=60)
+class OutboxTestCase(TestCase):
+    def setUp(self):
+        self.server = SMTPStandIn()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        smtp_settings = self.settings(EMAIL_PORT=self.server.server_address[1])
+        smtp_settings.enable()
+        self.addCleanup(smtp_settings.disable)
+
+    @staticmethod
+    def queue(*recipients):
+        for recipient in recipients:
+            send_mail('Réinitialisation du mot de passe', f'Bonjour {recipient}, voici le lien…',
+                      'noreply@localhost.com', [recipient])
+
+    def test_queue(self):
+        """Sending mail inserts a row, the sender sends the due emails over one connection"""
+        with self.assertNumQueries(1):
+            self.queue('Student <B20CS001@IITJ.ac.in>')
+        self.assertEqual(self.server.connections, 0)
+        email = Email.objects.get()
+        self.assertEqual((email.status, email.domain, email.recipients),
+                         (Email.QUEUED, 'iitj.ac.in', 'Student <B20CS001@IITJ.ac.in>'))
+        self.queue('b20cs002@gmail.com', 'b20cs003@iitj.ac.in')
+        stdout = StringIO()
+        call_command('sendmail', '--once', stdout=stdout)
+        self.assertEqual(stdout.getvalue(), '3 sent\n')
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual([recipients for _, recipients, _ in self.server.messages],
+                         [['B20CS001@IITJ.ac.in'], ['b20cs002@gmail.com'], ['b20cs003@iitj.ac.in']])
+        sender, _, data = self.server.messages[0]
+        message = message_from_bytes(data, policy=policy.default)
+        self.assertEqual(sender, 'noreply@localhost.com')
+        self.assertEqual(message['Subject'], 'Réinitialisation du mot de passe')
+        self.assertEqual(message.get_content().rstrip(), 'Bonjour Student <B20CS001@IITJ.ac.in>, voici le lien…')
+        self.assertEqual(set(Email.objects.values_list('status', 'attempts')), {(Email.SENT, 1)})
+        self.assertEqual(send_batch(), {})
+
+    def test_retry(self):
+        """Emails failing to send are tried again later, then marked failed"""
+        self.server.refused.add('bounce@example.com')
+        self.queue('bounce@example.com', 'b20cs001@iitj.ac.in')
+        self.assertEqual(send_batch(), {'retried': 1, 'sent': 1})
+        # the connection is not reused after a failure
+        self.assertEqual(self.server.connections, 2)
+        email = Email.objects.get(recipients='bounce@example.com')
+        self.assertEqual((email.status, email.attempts), (Email.QUEUED, 1))
+        self.assertTrue(email.last_error.startswith('SMTPRecipientsRefused'))
+        self.assertAlmostEqual(email.next_attempt, timezone.now() + timedelta(seconds=60), delta=timedelta(seconds=5))
+        self.assertEqual(send_batch(), {})
+        Email.objects.filter(pk=email.pk).update(next_attempt=timezone.now())
+        self.assertEqual(send_batch(), {'failed': 1})
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (Email.FAILED, 2))
+
+    @override_settings(OUTBOX_RATE_LIMITS={'gmail.com': 2, '*': 100})
+    def test_rate_limits(self):
+        """Domains get at most their rate limit of emails per window"""
+        self.queue('a@gmail.com', 'b@gmail.com', 'c@gmail.com', 'd@iitj.ac.in')
+        self.assertEqual(send_batch(), {'sent': 3, 'throttled': 1})
+        email = Email.objects.get(recipients='c@gmail.com')
+        self.assertEqual((email.status, email.attempts), (Email.QUEUED, 0))
+        self.assertGreater(email.next_attempt, timezone.now())
+        Email.objects.filter(pk=email.pk).update(next_attempt=timezone.now())
+        self.queue('e@iitj.ac.in')
+        self.assertEqual(send_batch(), {'sent': 1})
+        self.assertEqual([recipients for _, recipients, _ in self.server.messages][-1], ['e@iitj.ac.in'])
@@ -0,0 +1,89 @@
+import json
+from unittest import mock
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from graphql_relay.connection.arrayconnection import offset_to_cursor
+from gymkhana_sac import pagination
+from main.models import Faculty, Board, Society
+
+
+class CountFreeConnectionTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        board = Board.objects.create(name='board', slug='board', year='2000',
+                                     president=Faculty.objects.create(name='faculty'))
+        for index in range(5):
+            Society.objects.create(name=f'society {index}', slug=f'society-{index}', board=board, published=True)
+
+    def query(self, arguments, fields='pageInfo { hasNextPage hasPreviousPage endCursor } edges { node { name } }'):
+        """The ``societies`` connection and the SQL it ran"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/graphql', json.dumps({'query': f'{{ societies{arguments} {{ {fields} }} }}'}),
+                                        content_type='application/json')
+        body = response.json()
+        self.assertNotIn('errors', body)
+        return body['data']['societies'], [query['sql'] for query in queries.captured_queries]
+
+    def names(self, societies):
+        return [edge['node']['name'] for edge in societies['edges']]
+
+    def test_no_count(self):
+        """Pages are fetched with one more row than asked for, and without a count"""
+        societies, queries = self.query('(first: 2)')
+        self.assertEqual(self.names(societies), ['society 0', 'society 1'])
+        self.assertTrue(societies['pageInfo']['hasNextPage'])
+        self.assertFalse(any('COUNT(' in sql for sql in queries))
+        self.assertIn('LIMIT 3', queries[-1])
+
+    def test_pages(self):
+        """Following endCursor walks every row, the last page has no next page"""
+        names, after = [], ''
+        while True:
+            societies, _ = self.query(f'(first: 2{after})')
+            names.extend(self.names(societies))
+            if not societies['pageInfo']['hasNextPage']:
+                break
+            after = f', after: "{societies["pageInfo"]["endCursor"]}"'
+        self.assertEqual(names, [f'society {index}' for index in range(5)])
+
+    def test_offset(self):
+        """offset skips rows like after does"""
+        societies, _ = self.query('(first: 2, offset: 4)')
+        self.assertEqual(self.names(societies), ['society 4'])
+        self.assertFalse(societies['pageInfo']['hasNextPage'])
+
+    def test_total_count(self):
+        """totalCount is counted when selected"""
+        societies, queries = self.query('(first: 2)', 'totalCount edges { node { name } }')
+        self.assertEqual(societies['totalCount'], 5)
+        self.assertEqual(sum('COUNT(' in sql for sql in queries), 1)
+
+    def test_total_count_past_end(self):
+        """totalCount is counted when the cursor points past the last row"""
+        after = offset_to_cursor(50)
+        societies, _ = self.query(f'(first: 2, after: "{after}")', 'totalCount edges { node { name } }')
+        self.assertEqual((self.names(societies), societies['totalCount']), ([], 5))
+
+    def test_last(self):
+        """Paginating backwards counts the rows"""
+        societies, _ = self.query('(last: 2)', 'pageInfo { hasPreviousPage } totalCount edges { node { name } }')
+        self.assertEqual(self.names(societies), ['society 3', 'society 4'])
+        self.assertTrue(societies['pageInfo']['hasPreviousPage'])
+        self.assertEqual(societies['totalCount'], 5)
+
+    def test_filtered(self):
+        """Filters apply to the rows and to the count"""
+        societies, _ = self.query('(slug: "society-1")', 'totalCount edges { node { name } }')
+        self.assertEqual((self.names(societies), societies['totalCount']), (['society 1'], 1))
+
+    @override_settings(GRAPHQL_ESTIMATED_COUNT_MIN=1000)
+    def test_estimated_count(self):
+        """Tables at least GRAPHQL_ESTIMATED_COUNT_MIN rows large are not counted exactly"""
+        queryset = Society.objects.all()
+        with mock.patch.object(pagination, 'estimated_count', return_value=5000):
+            self.assertEqual(pagination.total_count(queryset), 5000)
+        with mock.patch.object(pagination, 'estimated_count', return_value=500):
+            self.assertEqual(pagination.total_count(queryset), 5)
+        # there are no estimates on SQLite
+        self.assertIsNone(pagination.estimated_count(queryset))
@@ -0,0 +1,81 @@
+import json
+import shutil
+import tempfile
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from gymkhana_sac.profiling import list_profiles, read_profile, write_profile
+
+PROFILER_DIR = tempfile.mkdtemp()
+
+
+# benchmark.urls mounts the app namespaces the admin index links to
+@override_settings(ROOT_URLCONF='benchmark.urls', PROFILER_ENABLED=True, PROFILER_SAMPLE_RATE=1.0,
+                   PROFILER_DIR=PROFILER_DIR, PROFILER_MAX_PROFILES=3)
+class RequestProfilerTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = User.objects.create_superuser(username='admin', password='password')
+        cls.staff = User.objects.create_user(username='staff', password='password', is_staff=True)
+
+    def tearDown(self):
+        shutil.rmtree(PROFILER_DIR, ignore_errors=True)
+
+    def query(self):
+        return self.client.post('/graphql', json.dumps({'query': '{ boards { edges { node { name } } } }'}),
+                                content_type='application/json')
+
+    def test_sampled_request(self):
+        """A sampled request keeps SQL timings and a cProfile report"""
+        self.query()
+        profile = read_profile(list_profiles()[0])
+        self.assertEqual((profile['method'], profile['path'], profile['status']), ('POST', '/graphql', 200))
+        self.assertEqual(profile['reason'], 'sampled')
+        self.assertGreater(profile['sql_count'], 0)
+        self.assertEqual(len(profile['statements']), profile['sql_count'])
+        self.assertIn('function calls', profile['profile'])
+
+    def test_template_time(self):
+        """Template responses record their render time"""
+        self.client.force_login(self.superuser)
+        self.client.get(reverse('admin:index'))
+        profile = read_profile(list_profiles()[0])
+        self.assertGreater(profile['template_ms'], 0)
+
+    @override_settings(PROFILER_SAMPLE_RATE=0.0, PROFILER_SLOW_REQUEST_MS=0)
+    def test_slow_request(self):
+        """Requests over the threshold are kept without cProfile"""
+        self.query()
+        profile = read_profile(list_profiles()[0])
+        self.assertEqual(profile['reason'], 'slow')
+        self.assertIsNone(profile['profile'])
+
+    @override_settings(PROFILER_SAMPLE_RATE=0.0)
+    def test_fast_request_not_kept(self):
+        """Fast, unsampled requests leave nothing behind"""
+        self.query()
+        self.assertEqual(list_profiles(), [])
+
+    def test_ring_buffer(self):
+        """Only the newest PROFILER_MAX_PROFILES profiles are kept"""
+        for index, path in enumerate(('a', 'b', 'c', 'd', 'e'), 1):
+            write_profile({'id': f'{index}000-{path}', 'path': path})
+        self.assertEqual(len(list_profiles()), 3)
+        self.assertEqual(read_profile(list_profiles()[0])['path'], 'e')
+
+    @override_settings(PROFILER_MAX_PROFILES=100)
+    def test_admin_pages(self):
+        """Profiles are browsable, and downloadable, by superusers only"""
+        self.query()
+        profile_id = list_profiles()[0]
+        detail = reverse('admin-profiler-detail', kwargs={'profile_id': profile_id})
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(reverse('admin-profiler')).status_code, 302)
+        self.assertEqual(self.client.get(detail).status_code, 302)
+        self.client.force_login(self.superuser)
+        self.assertContains(self.client.get(reverse('admin-profiler')), detail)
+        self.assertContains(self.client.get(detail), '/graphql')
+        response = self.client.get(reverse('admin-profiler-download', kwargs={'profile_id': profile_id}))
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="{profile_id}.prof"')
+        self.assertEqual(self.client.get(reverse('admin-profiler-detail', kwargs={'profile_id': '1-a'})).status_code,
+                         404)
@@ -0,0 +1,215 @@
+import json
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from festivals.models import Festival, EventCategory, Event as FestivalEvent
+from forum.models import Topic, Answer
+from gymkhana_sac.schema import PrivateQuery, PublicQuery
+from main.models import Faculty, Board, Society, Committee, Senate, SenateMembership, Activity, Contact
+from oauth.models import UserProfile, SocialLink
+from social_django.models import UserSocialAuth
+from test.query_budget import QueryBudget, QueryBudgetMixin, normalize_sql
+from test.test_assets import get_random_date, get_temporary_image, TEST_MEDIA_ROOT
+
+APPS = ('main', 'forum', 'oauth', 'konnekt', 'festivals')
+
+# url name: (kwargs, expected status, query budget, repeated shape budget). The data below has three of everything,
+# so a view with an N+1 pattern shows it as a shape repeated three times or more. Budgets record what the views run
+# today, lower them together with the fix when removing an N+1.
+VIEW_BUDGETS = {
+    'main:index': ({}, 200, 6, 2),
+    'main:contact': ({}, 200, 1, 1),
+    'main:contact_list': ({}, 200, 3, 1),
+    'main:senate-detail': ({'slug': 'senate'}, 200, 2, 1),
+    'main:committee-detail': ({'slug': 'committee-0'}, 200, 8, 1),
+    'forum:index': ({}, 200, 56, 12),
+    'forum:answered-by-user': ({}, 200, 21, 4),
+    'forum:add_topic': ({}, 200, 2, 1),
+    'forum:detail': ({'slug': 'topic-0'}, 200, 38, 6),
+    'forum:update_topic': ({'slug': 'topic-0'}, 200, 6, 2),
+    'forum:delete_topic': ({'slug': 'topic-0'}, 302, 11, 2),
+    'forum:delete_answer': ({'pk': 'answer'}, 302, 10, 3),
+    'oauth:session': ({}, 302, 3, 1),
+    'oauth:register': ({}, 302, 2, 1),
+    'oauth:activate': ({'uidb64': 'uid', 'token': 'set-password'}, 200, 6, 1),
+    'oauth:link-add': ({}, 200, 3, 1),
+    'oauth:detail': ({'roll': 'B20CS000'}, 200, 8, 2),
+    'oauth:edit': ({'roll': 'B20CS000'}, 200, 6, 2),
+    'oauth:link-edit': ({'username': 'user_0', 'social_media': 'FB'}, 200, 6, 2),
+    'oauth:password_reset': ({}, 200, 0, 1),
+    'oauth:password_reset_confirm': ({'uidb64': 'uid', 'token': 'set-password'}, 200, 2, 1),
+    'oauth:password_change': ({}, 200, 2, 1),
+    'konnekt:index': ({}, 200, 2, 1),
+    'konnekt:search': ({}, 200, 2, 1),
+    'festivals:detail': ({'slug': 'festival'}, 200, 9, 3),
+}
+# Views deleting on POST, their GET answers 404
+POST_VIEWS = {'forum:delete_topic', 'forum:delete_answer'}
+
+# url name: (kwargs, status the view fails with, why). These views are broken whatever the data, they get a budget
+# once fixed.
+BROKEN_VIEWS = {
+    'main:office-bearers': ({}, 500, 'filters societies by year, which they no longer have'),
+    'main:board-detail': ({'slug': 'board'}, 500, 'filters societies by ctype, which they no longer have'),
+    'main:soc-detail': ({'slug': 'society-0'}, 500, 'reads Society.core_members, which no longer exists'),
+    'forum:test': ({}, 404, 'its url is taken by forum:detail, as the topic "test"'),
+    'oauth:get-act-link': ({'roll': 'B20CS000'}, 500, 'the activate url is too short for current tokens'),
+    'oauth:link-delete': ({'username': 'user_0', 'social_media': 'FB'}, 500,
+                          'oauth/sociallink_confirm_delete.html does not exist'),
+    'oauth:password_reset_done': ({}, 500, 'the template links to the undefined login url'),
+    'oauth:password_reset_complete': ({}, 500, 'the template links to the undefined login url'),
+    'oauth:password_change_done': ({}, 500, 'the template links to the undefined login url'),
+}
+
+NODES = 'edges { node { id } }'
+
+# top level field: (schema, query, query budget, repeated shape budget)
+GRAPHQL_BUDGETS = {
+    'node': ('graphql', '{ node(id: "Qm9hcmROb2RlOjE=") { id } }', 3, 1),
+    'nodesByIds': ('pgraphql', '{ nodesByIds(ids: ["Qm9hcmROb2RlOjE=", "Qm9hcmROb2RlOjI="]) { id '
+                               '... on BoardNode { name } } }', 3, 1),
+    'societies': ('graphql', '{ societies { edges { node { name secretary { roll } activitySet { edges { node '
+                             '{ name } } } } } } }', 4, 1),
+    'committees': ('graphql', '{ committees { edges { node { name board { name } } } } }', 3, 1),
+    'membership': ('graphql', '{ membership { edges { node { role userprofile { roll } } } } }', 3, 1),
+    'boards': ('graphql', '{ boards { edges { node { name societySet { edges { node { name } } } '
+                          'committeeSet { edges { node { name } } } } } } }', 7, 1),
+    'sacKeyPeople': ('graphql', '{ sacKeyPeople { edges { node { genSecy { roll } } } } }', 3, 1),
+    'festivals': ('graphql', f'{{ festivals {{ {NODES} }} }}', 3, 1),
+    'homeCarousel': ('graphql', '{ homeCarousel { title } }', 3, 1),
+    'homeGallery': ('graphql', '{ homeGallery { title } }', 3, 1),
+    'viewer': ('pgraphql', '{ viewer { username userprofile { roll } } }', 3, 1),
+    'nodes': ('pgraphql', '{ nodes(nodeType: TOPIC, first: 10) { edges { node { ... on TopicNode { title '
+                          'upvotesCount answersCount author { user { firstName } } } } } } }', 5, 1),
+    'topic': ('pgraphql', '{ topic(first: 10) { edges { node { title answerSet { edges { node { content '
+                          'upvotesCount author { roll } } } } } } } }', 5, 1),
+    'profile': ('pgraphql', '{ profile(first: 10) { edges { node { roll user { firstName } } } } }', 3, 1),
+    'topicsByUser': ('pgraphql', '{ topicsByUser { edges { node { title } } } }', 3, 1),
+    'allUserProfiles': ('pgraphql', '{ allUserProfiles(first: 10) { edges { node { roll skills } } } }',
+                        3, 1),
+}
+
+
+def url_names(app):
+    urls = __import__(f'{app}.urls', fromlist=['urlpatterns'])
+    return {f'{urls.app_name}:{pattern.name}' for pattern in urls.urlpatterns}
+
+
+class NormalizeSQLTestCase(TestCase):
+    def test_literals_and_in_lists(self):
+        """Literals and IN lists of any length normalize to the same shape"""
+        self.assertEqual(normalize_sql("SELECT * FROM a WHERE b = 'x' AND c IN (1, 2, 3)"),
+                         normalize_sql("SELECT  * FROM a WHERE b = 'it''s' AND c IN (4)"))
+
+    def test_repeats_reported(self):
+        """Repeated shapes fail the repeat budget with a report"""
+        with self.assertRaisesRegex(AssertionError, r'shape repeated 3 times, budget is 1 \(N\+1\?\)'):
+            with QueryBudget(repeats=1):
+                for pk in range(3):
+                    list(User.objects.filter(pk=pk))
+
+    def test_decorator(self):
+        """The budget works as a decorator"""
+        @QueryBudget(queries=1)
+        def two_queries():
+            User.objects.count()
+            User.objects.count()
+
+        with self.assertRaisesRegex(AssertionError, '2 queries, budget is 1'):
+            two_queries()
+
+
+@override_settings(ROOT_URLCONF='benchmark.urls', MEDIA_ROOT=TEST_MEDIA_ROOT)
+class QueryBudgetsTestCase(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        profiles = []
+        for index in range(3):
+            user = User.objects.create_user(username=f'user_{index}', password='password', first_name='First')
+            profiles.append(UserProfile.objects.create(user=user, roll=f'B20CS00{index}', dob=get_random_date(),
+                                                       phone='9999999999', skills='django'))
+            SocialLink.objects.create(user=user, social_media='FB', link='https://facebook.com')
+        cls.user = profiles[0].user
+        UserSocialAuth.objects.create(user=cls.user, provider='google-oauth2', uid='user_0@iitj.ac.in',
+                                      extra_data={'access_token': 'token'})
+        # image fields the pages render, kept open for the duration of the tests
+        cls.image = get_temporary_image()
+        faculty = Faculty.objects.create(name='faculty', avatar=cls.image.name)
+        board = Board.objects.create(name='board', slug='board', year='2000', president=faculty,
+                                     cover=cls.image.name)
+        senate = Senate.objects.create(name='senate', slug='senate', year='2000')
+        festival = Festival.objects.create(name='festival', slug='festival', published=True, photo=cls.image.name)
+        festival.board.add(board)
+        category = EventCategory.objects.create(name='category', slug='category', festival=festival,
+                                                about='<p>category</p>')
+        for index, profile in enumerate(profiles):
+            society = Society.objects.create(name=f'society {index}', slug=f'society-{index}', board=board,
+                                             secretary=profile, published=True)
+            committee = Committee.objects.create(name=f'committee {index}', slug=f'committee-{index}', board=board,
+                                                 published=True)
+            committee.members.add(profile, through_defaults={'role': 'member'})
+            Activity.objects.create(name=f'activity {index}', society=society, description='activity')
+            FestivalEvent.objects.create(event_category=category, name=f'event {index}', slug=f'event-{index}',
+                                         unique_id=f'event-{index}')
+            SenateMembership.objects.create(senate=senate, userprofile=profile, role='SER', year='1')
+            Contact.objects.create(name=f'contact {index}', email='a@b.com', phone='9999999999', subject='subject',
+                                   message='message')
+            topic = Topic.objects.create(author=profile, title=f'topic {index}', slug=f'topic-{index}',
+                                         content='<p>topic</p>')
+            topic.upvotes.add(*profiles)
+            for answer_author in profiles:
+                answer = Answer.objects.create(topic=topic, author=answer_author, content='<p>answer</p>')
+                answer.upvotes.add(*profiles)
+        cls.answer = Answer.objects.filter(author=profiles[0]).first()
+
+    def setUp(self):
+        self.client = Client(raise_request_exception=False)
+        self.client.force_login(self.user)
+
+    def resolve_kwargs(self, kwargs):
+        values = {'answer': self.answer.pk, 'uid': urlsafe_base64_encode(force_bytes(self.user.pk))}
+        return {key: values.get(value, value) for key, value in kwargs.items()}
+
+    def test_every_view_has_a_budget(self):
+        """Every view of the server rendered apps declares a budget, or is known to be broken"""
+        self.assertEqual(set().union(*map(url_names, APPS)), set(VIEW_BUDGETS) | set(BROKEN_VIEWS))
+        self.assertFalse(set(VIEW_BUDGETS) & set(BROKEN_VIEWS))
+
+    def test_every_graphql_field_has_a_budget(self):
+        """Every top level GraphQL query field declares a budget"""
+        fields = {name for schema in (PublicQuery, PrivateQuery) for name in schema._meta.fields}
+        self.assertEqual({name.replace('_', '').lower() for name in fields},
+                         {name.lower() for name in GRAPHQL_BUDGETS})
+
+    def test_view_budgets(self):
+        """Views answer and stay within their query budgets"""
+        for name, (kwargs, status, queries, repeats) in VIEW_BUDGETS.items():
+            with self.subTest(view=name):
+                # some views log the user out or delete rows, every one starts from a fresh session and data
+                self.client.force_login(self.user)
+                send = self.client.post if name in POST_VIEWS else self.client.get
+                with transaction.atomic():
+                    with self.assertQueryBudget(queries, repeats, label=name):
+                        response = send(reverse(name, kwargs=self.resolve_kwargs(kwargs)))
+                        self.assertEqual(response.status_code, status)
+                    transaction.set_rollback(True)
+
+    def test_broken_views(self):
+        """Views known to be broken still fail, move the ones that answer to VIEW_BUDGETS"""
+        for name, (kwargs, status, reason) in BROKEN_VIEWS.items():
+            with self.subTest(view=name, reason=reason):
+                self.client.force_login(self.user)
+                response = self.client.get(reverse(name, kwargs=self.resolve_kwargs(kwargs)))
+                self.assertEqual(response.status_code, status)
+
+    def test_graphql_budgets(self):
+        """Top level GraphQL fields stay within their query budgets"""
+        for name, (path, query, queries, repeats) in GRAPHQL_BUDGETS.items():
+            with self.subTest(field=name):
+                with self.assertQueryBudget(queries, repeats, label=name):
+                    response = self.client.post(f'/{path}', json.dumps({'query': query}),
+                                                content_type='application/json')
+                self.assertNotIn('errors', response.json())
@@ -0,0 +1,98 @@
+from unittest import mock
+
+import graphene
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from graphql.backend import GraphQLCoreBackend
+from forum.models import Topic
+from gymkhana_sac.db import replicas
+from gymkhana_sac.db.replicas import ReplicaBackend, ReplicaPinMiddleware, ReplicaRouter, PIN_COOKIE
+
+
+class Query(graphene.ObjectType):
+    read_only = graphene.Boolean()
+
+    def resolve_read_only(self, info):
+        return replicas.current().read_only
+
+
+class Mutation(graphene.ObjectType):
+    read_only = graphene.Boolean()
+
+    def resolve_read_only(self, info):
+        state = replicas.current()
+        return state is not None and state.read_only
+
+
+@override_settings(REPLICA_DATABASES=['replica1', 'replica2'], REPLICA_MAX_LAG=5, REPLICA_LAG_CHECK_INTERVAL=60)
+@mock.patch('gymkhana_sac.db.replicas.replica_lag', return_value=0)
+class ReplicaRouterTestCase(SimpleTestCase):
+    def setUp(self):
+        replicas._checks.clear()
+        self.router = ReplicaRouter()
+
+    def test_read_only_code(self, lag):
+        """Only reads of read only code go to a replica, the same one for the whole request"""
+        self.assertEqual(self.router.db_for_read(Topic), 'default')
+        with replicas.replica_reads():
+            replica = self.router.db_for_read(Topic)
+            self.assertIn(replica, ('replica1', 'replica2'))
+            self.assertEqual(self.router.db_for_read(Topic), replica)
+            self.assertEqual(self.router.db_for_write(Topic), 'default')
+        self.assertEqual(self.router.db_for_read(Topic), 'default')
+
+    def test_writes(self, lag):
+        """Once a request wrote, or when the client wrote recently, it reads from the primary"""
+        with replicas.bind(replicas.RoutingState()), replicas.replica_reads():
+            self.router.db_for_write(Topic)
+            self.assertEqual(self.router.db_for_read(Topic), 'default')
+        with replicas.bind(replicas.RoutingState(pinned=True)), replicas.replica_reads():
+            self.assertEqual(self.router.db_for_read(Topic), 'default')
+
+    def test_lag(self, lag):
+        """Lagging replicas are skipped, the primary is used when all of them lag"""
+        lag.side_effect = lambda alias: 60 if alias == 'replica1' else 0
+        with replicas.replica_reads():
+            self.assertEqual(self.router.db_for_read(Topic), 'replica2')
+        replicas._checks.clear()
+        lag.side_effect = None
+        lag.return_value = 60
+        with replicas.replica_reads():
+            self.assertEqual(self.router.db_for_read(Topic), 'default')
+
+    def test_lag_checks_cached(self, lag):
+        """Replicas are checked once per REPLICA_LAG_CHECK_INTERVAL"""
+        for _ in range(3):
+            with replicas.replica_reads():
+                self.router.db_for_read(Topic)
+        self.assertEqual(lag.call_count, 2)
+
+    def test_pin_cookie(self, lag):
+        """A request that wrote pins the client to the primary for REPLICA_PIN_SECONDS"""
+        def write(request):
+            self.router.db_for_write(Topic)
+            return HttpResponse()
+
+        def read(request):
+            with replicas.replica_reads():
+                return HttpResponse(self.router.db_for_read(Topic))
+
+        request = RequestFactory().post('/')
+        response = ReplicaPinMiddleware(write)(request)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        request = RequestFactory().get('/')
+        request.COOKIES[PIN_COOKIE] = response.cookies[PIN_COOKIE].value
+        self.assertEqual(ReplicaPinMiddleware(read)(request).content, b'default')
+        request.COOKIES[PIN_COOKIE] = 'stale'
+        response = ReplicaPinMiddleware(read)(request)
+        self.assertNotEqual(response.content, b'default')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_graphql_queries(self, lag):
+        """GraphQL queries read from replicas, mutations do not"""
+        schema = graphene.Schema(Query, mutation=Mutation)
+        backend = ReplicaBackend(GraphQLCoreBackend())
+        query = backend.document_from_string(schema, 'query { readOnly }').execute(operation_name=None)
+        self.assertEqual(query.data, {'readOnly': True})
+        mutation = backend.document_from_string(schema, 'mutation { readOnly }').execute(operation_name=None)
+        self.assertEqual(mutation.data, {'readOnly': False})
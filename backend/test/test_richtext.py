@@ -0,0 +1,85 @@
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from forum.models import Topic, Answer
+from gymkhana_sac.richtext import process_rich_text, html_to_text
+from oauth.models import UserProfile
+
+
+class RichTextProcessingTestCase(TestCase):
+    def test_script_and_event_handlers_removed(self):
+        """Scripts, event handler attributes and javascript URLs are stripped"""
+        html = process_rich_text('<p onclick="x()">Hi<script>alert(1)</script></p><a href="javascript:x()">a</a>').html
+        self.assertEqual(html, '<p>Hi</p><a>a</a>')
+
+    def test_allowed_markup_kept(self):
+        """Allowed tags and attributes survive sanitization"""
+        html = '<p><strong>bold</strong> <a href="https://iitj.ac.in" target="_blank">link</a></p>'
+        self.assertEqual(process_rich_text(html).html, html)
+
+    def test_iframes_restricted(self):
+        """Only https iframes of embed hosts are kept, sandboxed and without the referrer's path"""
+        html = process_rich_text('<iframe src="https://www.youtube.com/embed/id" sandbox="allow-top-navigation" '
+                                 'width="560"></iframe><iframe src="//example.com/login">login</iframe>'
+                                 '<iframe src="http://player.vimeo.com/video/1"></iframe>').html
+        self.assertEqual(html, '<iframe src="https://www.youtube.com/embed/id" width="560" '
+                               'sandbox="allow-scripts allow-same-origin allow-presentation allow-popups" '
+                               'referrerpolicy="strict-origin-when-cross-origin"></iframe>login')
+
+    def test_styles_allow_listed(self):
+        """Only allow-listed CSS properties with plain values are kept"""
+        html = process_rich_text('<p style="color:red; position:fixed; z-index:9; top:0; font-size: 12px; '
+                                 'background-color: rgb(1, 2, 3); background: url(x); width: expression(x)">a</p>'
+                                 '<div style="position: fixed">b</div>').html
+        self.assertEqual(html, '<p style="color: red; font-size: 12px; background-color: rgb(1, 2, 3)">a</p>'
+                               '<div>b</div>')
+
+    def test_unclosed_tags_closed(self):
+        """Unclosed tags are closed so the output stays well formed"""
+        self.assertEqual(process_rich_text('<p><em>text').html, '<p><em>text</em></p>')
+
+    def test_plain_text_and_images(self):
+        """Plain text collapses whitespace and images are collected"""
+        rich_text = process_rich_text('<p>Hello&nbsp; <b>world</b></p><p><img src="/media/a.png"></p><p>Bye</p>')
+        self.assertEqual(rich_text.text, 'Hello world\nBye')
+        self.assertEqual(rich_text.images, ['/media/a.png'])
+
+    def test_excerpt_truncated(self):
+        """Excerpt is truncated to the requested length"""
+        self.assertEqual(process_rich_text('<p>' + 'word ' * 100 + '</p>', excerpt_length=20).excerpt,
+                         'word word word word…')
+
+    def test_empty_content(self):
+        """Only whitespace and entities count as empty text"""
+        self.assertEqual(html_to_text('<p>&nbsp;</p>'), '')
+        self.assertEqual(html_to_text(None), '')
+
+
+class RichTextModelTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='test_user')
+        cls.user_profile = UserProfile.objects.create(user=cls.user, roll='B00CS000', dob=timezone.now())
+        cls.topic = Topic.objects.create(author=cls.user_profile, title='abc',
+                                         content='<p>Find <i>me</i></p><script>x</script>')
+
+    def test_columns_filled_on_save(self):
+        """Sanitized html, plain text and excerpt are stored on save"""
+        self.assertEqual(self.topic.content, '<p>Find <i>me</i></p>')
+        self.assertEqual(self.topic.plain_text, 'Find me')
+        self.assertEqual(self.topic.excerpt, 'Find me')
+
+    def test_search_uses_plain_text(self):
+        """Search matches text, not markup"""
+        Answer.objects.create(topic=self.topic, author=self.user_profile, content='<p>an answer</p>')
+        self.assertEqual(Topic.objects.search('find me').count(), 1)
+        self.assertEqual(Topic.objects.search('an answer').count(), 1)
+        self.assertEqual(Topic.objects.search('<i>').count(), 0)
+
+    def test_processrichtext_command(self):
+        """The backfill command rebuilds stale derived columns"""
+        Topic.objects.filter(pk=self.topic.pk).update(plain_text='', content='<p>new</p>')
+        call_command('processrichtext', 'forum.Topic', stdout=StringIO())
+        self.assertEqual(Topic.objects.get(pk=self.topic.pk).plain_text, 'new')
@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from gymkhana_sac.middleware import AuthenticationMiddleware
+from oauth.models import UserProfile
+from test.test_assets import get_random_date
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cache')
+class AuthenticationMiddlewareTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='user', password='password')
+        cls.profile = UserProfile.objects.create(user=cls.user, roll='B20CS001', dob=get_random_date(),
+                                                 phone='9999999999')
+
+    def request(self):
+        """A request carrying the session of a logged in client"""
+        request = RequestFactory().get('/')
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = self.client.session.session_key
+        SessionMiddleware(lambda request: HttpResponse()).process_request(request)
+        AuthenticationMiddleware(lambda request: HttpResponse()).process_request(request)
+        return request
+
+    def test_user_with_profile(self):
+        """The user and its profile are loaded in one query, once per request"""
+        self.client.force_login(self.user)
+        request = self.request()
+        with self.assertNumQueries(1):
+            self.assertEqual(request.user.userprofile.roll, 'B20CS001')
+            self.assertEqual(request.user.username, 'user')
+
+    def test_anonymous(self):
+        """Requests without a session are anonymous without a query"""
+        request = self.request()
+        with self.assertNumQueries(0):
+            self.assertFalse(request.user.is_authenticated)
+
+    def test_password_change(self):
+        """Changing the password ends other sessions"""
+        self.client.force_login(self.user)
+        self.user.set_password('changed')
+        self.user.save()
+        request = self.request()
+        self.assertFalse(request.user.is_authenticated)
+        self.assertIsNone(request.session.session_key)
+
+    def test_inactive_user(self):
+        """Users the model backend would not authenticate are anonymous"""
+        self.client.force_login(self.user, backend='django.contrib.auth.backends.ModelBackend')
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertFalse(self.request().user.is_authenticated)
+
+    def test_middleware_once(self):
+        """The authentication middleware runs once"""
+        self.assertEqual(sum('AuthenticationMiddleware' in middleware for middleware in settings.MIDDLEWARE), 1)
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_signed_cookies(self):
+        """With signed cookie sessions, loading the user is the only query"""
+        self.client.force_login(self.user)
+        request = self.request()
+        with self.assertNumQueries(1):
+            self.assertTrue(request.user.is_authenticated)
@@ -1,3 +1,5 @@
+from unittest import mock
+from django.conf import settings
 from django.test import TestCase, RequestFactory, override_settings
 from django.urls import reverse
 from gymkhana_sac.wsgi import application
@@ -13,3 +15,42 @@ class WSGITestCase(TestCase):
         request = self.request.get(reverse('main:index'))
         response = application.get_response(request)
         self.assertEqual(response.status_code, 200)
+
+
+class ProbeTestCase(TestCase):
+    def test_health(self):
+        """The liveness probe answers without touching the database"""
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('healthz'))
+        self.assertEqual(response.content, b'ok')
+
+    def test_ready(self):
+        """The readiness probe checks every database and cache"""
+        response = self.client.get(reverse('readyz'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), dict({'database:default': 'ok'}, **{
+            f'cache:{alias}': 'ok' for alias in settings.CACHES}))
+
+    def test_not_ready(self):
+        """A failing check makes the readiness probe answer 503"""
+        with mock.patch('django.core.cache.backends.locmem.LocMemCache.get', return_value=None):
+            response = self.client.get(reverse('readyz'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['cache:default'], 'not stored')
+
+    def test_errors_not_exposed(self):
+        """Errors of the checks are logged, not returned"""
+        error = Exception('could not connect to server at db.internal as gymkhanauser')
+        with mock.patch('django.core.cache.backends.locmem.LocMemCache.set', side_effect=error), \
+                self.assertLogs('gymkhana_sac.views', 'ERROR') as logs:
+            response = self.client.get(reverse('readyz'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['cache:default'], 'error')
+        self.assertNotIn(b'db.internal', response.content)
+        self.assertIn('db.internal', logs.output[0])
+
+
+class ASGITestCase(TestCase):
+    def test_asgi_application(self):
+        from gymkhana_sac.asgi import application
+        self.assertTrue(callable(application))